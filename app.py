@@ -1,17 +1,31 @@
 from flask import Flask, render_template, request, jsonify, send_file, Response, redirect, url_for
-import time
 import json
 import os
 import logging
 from datetime import datetime
 from sitemap_generator import SitemapGenerator  
+from jobs import JobConflict, JobManager, JobQueueFull, COMPLETED, FAILED, FINISHED_STATES
+from events import EventHub
+import events
+from metrics import CrawlMetrics
+from sitemap_catalog import SORT_COLUMNS, SitemapCatalog
+from sitemap_diff import SitemapDiff
+from sitemap_reader import read_urls
+from sitemap_seeds import previous_sitemaps
 from urllib.parse import urlparse
-import re
+from werkzeug.security import safe_join
 from util import format_creation_date 
 import gzip
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'last_work'
+app.config['STATE_FOLDER'] = 'crawl_state'
+# JSON file with URL filters and priority rules (default: url_rules.DEFAULT_RULES)
+app.config['URL_RULES'] = os.environ.get('SITEMAP_URL_RULES')
+# Processes each crawl uses for HTML parsing (0: parse on the crawl's own threads)
+app.config['PARSE_WORKERS'] = int(os.environ.get('SITEMAP_PARSE_WORKERS', 0))
+# Record crawl metrics for /metrics (set SITEMAP_METRICS=0 to turn instrumentation off)
+app.config['METRICS'] = os.environ.get('SITEMAP_METRICS', '1') != '0'
 LOG_FILE = 'app.log'
 
 # Set up logging
@@ -42,193 +56,411 @@ try:
 except Exception as e:
     logger.error(f"Failed to create test file: {str(e)}")
 
-# Global variable for URL count
-current_url_count = 0
+def state_db_path(root_url):
+    """Return the crawl state database used for incremental recrawls of a site."""
+    os.makedirs(app.config['STATE_FOLDER'], exist_ok=True)
+    domain = urlparse(root_url).netloc.replace('.', '_').replace(':', '_')
+    return os.path.join(app.config['STATE_FOLDER'], f"{domain}.sqlite")
+
+def checkpoint_path(root_url):
+    """Return the checkpoint journal used to resume an interrupted crawl of a site."""
+    os.makedirs(app.config['STATE_FOLDER'], exist_ok=True)
+    domain = urlparse(root_url).netloc.replace('.', '_').replace(':', '_')
+    return os.path.join(app.config['STATE_FOLDER'], f"{domain}.journal")
+
+# Generated sitemaps, listed by /sitemaps and /api/sitemaps without rescanning the folder
+os.makedirs(app.config['STATE_FOLDER'], exist_ok=True)
+sitemap_catalog = SitemapCatalog(app.config['UPLOAD_FOLDER'],
+                                 os.path.join(app.config['STATE_FOLDER'], 'sitemaps.sqlite'))
+
+# Progress events, published per job id
+event_hub = EventHub()
+crawl_metrics = CrawlMetrics() if app.config['METRICS'] else None
+
+def publish_job_status(job):
+    event_hub.publish(job.id, events.JOB_STATUS, job.to_dict())
+    if job.status in FINISHED_STATES:
+        event_hub.close_topic(job.id)
+
+# Background crawl jobs
+job_manager = JobManager(
+    max_concurrent=int(os.environ.get('SITEMAP_MAX_CONCURRENT_JOBS', 2)),
+    max_queued=int(os.environ.get('SITEMAP_MAX_QUEUED_JOBS', 20)),
+    status_listener=publish_job_status,
+    discard_listener=lambda job: event_hub.discard(job.id)
+)
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def run_sitemap_job(job):
+    """Crawl the site for a job and write its sitemap. Runs on a job worker thread."""
+    data = job.params
+    root_url = data['root_url']
+    generator = SitemapGenerator(
+        **data['generator'],
+        event_sink=lambda event_type, event_data: event_hub.publish(job.id, event_type, event_data),
+        metrics=crawl_metrics
+    )
+    job.generator = generator
+    if job.cancelled:
+        generator.cancel()
+    
+    logger.info(f"[{job.id}] Starting crawl...")
+    urls = generator.crawl_site()
+    
+    if job.cancelled:
+        return {"url_count": len(urls)}
+    
+    if not urls:
+        raise ValueError("No URLs found during crawling")
+    
+    logger.debug(f"URLs to include in sitemap: {urls}")
+    
+    # Generate filename from root URL and timestamp
+    parsed_url = urlparse(root_url)
+    domain = parsed_url.netloc.replace('.', '_')
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"{domain}_{timestamp}.xml"
+    if data.get('compress', False):
+        filename += '.gz'
+    output_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    
+    logger.info(f"Generating sitemap: {output_path}")
+    try:
+        # Stream entries with changefreq and priority from the URL rules; large
+        # sites are split into parts plus a sitemap index at output_path
+        logger.info(f"Writing sitemap to: {output_path}")
+        with generator.sitemap_writer(output_path, data.get('compress', False)) as writer:
+            for url in urls:
+                generator.add_to_sitemap(writer, url)
+    except Exception as e:
+        logger.error(f"Error writing sitemap file: {str(e)}")
+        raise RuntimeError(f"Failed to write sitemap file: {str(e)}")
+    finally:
+        generator.close()
+    
+    if not os.path.exists(output_path):
+        logger.error(f"Sitemap file not created: {output_path}")
+        raise RuntimeError(f"Failed to create sitemap file: {output_path}")
+    logger.info(f"Sitemap file created successfully: {output_path}")
+    
+    logger.info(f"Sitemap generated with {len(urls)} URLs")
+    sitemap_catalog.record(filename, parsed_url.netloc, timestamp, len(urls), parts=len(writer.parts))
+    # The crawl is saved; a later resume should start a fresh crawl
+    generator.clear_checkpoint()
+    return {
+        "filename": filename,
+        "url_count": len(urls),
+        "parts": len(writer.parts),
+    }
+
 @app.route('/generate', methods=['POST'])
 def generate_sitemap():
-    global current_url_count
-    current_url_count = 0
-    data = request.json
+    data = request.json or {}
     root_url = data.get('root_url')
+    if not root_url:
+        return jsonify({"error": "root_url is required"}), 400
     logger.info(f"Received request to generate sitemap for {root_url}")
 
     try:
-        generator = SitemapGenerator(
-            root_url=root_url,
-            max_urls=int(data.get('max_urls', 1000)),
-            delay=float(data.get('delay', 1.0)),
-            user_agent=data.get('user_agent', "CustomCrawler/1.0"),
-            max_workers=int(data.get('max_workers', 5))
-        )
-        
-        logger.info("Starting crawl...")
-        urls = generator.crawl_site()
-        
-        if not urls:
-            logger.error("No URLs found during crawling")
-            return jsonify({"error": "No URLs found during crawling"}), 400
-        
-        logger.debug(f"URLs to include in sitemap: {urls}")
-        
-        # Generate filename from root URL and timestamp
-        parsed_url = urlparse(root_url)
-        domain = parsed_url.netloc.replace('.', '_')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{domain}_{timestamp}.xml"
-        if data.get('compress', False):
-            filename += '.gz'
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        
-        logger.info(f"Generating sitemap: {output_path}")
-        try:
-            # Generate XML with dynamic changefreq and priority
-            xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-            xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-            for url in urls:
-                url_lower = url.lower()
-                if url == root_url:
-                    priority = '1.0'
-                    changefreq = 'daily'
-                    logger.debug(f"URL {url}: Root URL (priority={priority}, changefreq={changefreq})")
-                elif 'sub-category' in url_lower:
-                    priority = '0.9'
-                    changefreq = 'weekly'
-                    logger.debug(f"URL {url}: Sub-category (priority={priority}, changefreq={changefreq})")
-                elif 'product' in url_lower:
-                    priority = '0.8'
-                    changefreq = 'weekly'
-                    logger.debug(f"URL {url}: Product (priority={priority}, changefreq={changefreq})")
-                else:
-                    priority = '0.6'
-                    changefreq = 'weekly'
-                    logger.debug(f"URL {url}: Default (priority={priority}, changefreq={changefreq})")
-                
-                xml_content += '  <url>\n'
-                xml_content += f'    <loc>{url}</loc>\n'
-                xml_content += f'    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n'
-                xml_content += f'    <changefreq>{changefreq}</changefreq>\n'
-                xml_content += f'    <priority>{priority}</priority>\n'
-                xml_content += '  </url>\n'
-            xml_content += '</urlset>'
-            
-            # Write file
-            logger.info(f"Writing sitemap to: {output_path}")
-            if data.get('compress', False):
-                import gzip
-                with gzip.open(output_path, 'wt', encoding='utf-8') as f:
-                    f.write(xml_content)
-            else:
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(xml_content)
-            
-            if not os.path.exists(output_path):
-                logger.error(f"Sitemap file not created: {output_path}")
-                return jsonify({"error": f"Failed to create sitemap file: {output_path}"}), 500
-            logger.info(f"Sitemap file created successfully: {output_path}")
-        except Exception as e:
-            logger.error(f"Error writing sitemap file: {str(e)}")
-            return jsonify({"error": f"Failed to write sitemap file: {str(e)}"}), 500
-        
-        current_url_count = len(urls)
-        logger.info(f"Sitemap generated with {current_url_count} URLs")
-        return jsonify({
-            "message": "Sitemap generated successfully",
-            "filename": filename,
-            "url_count": current_url_count,
-            "redirect": url_for('sitemaps')
-        })
-    
-    except Exception as e:
-        logger.error(f"Error generating sitemap: {str(e)}")
-        return jsonify({"error": str(e)}), 500
+        params = {
+            "root_url": root_url,
+            "compress": bool(data.get('compress', False)),
+            "generator": {
+                "root_url": root_url,
+                "max_urls": int(data.get('max_urls', 1000)),
+                "delay": float(data.get('delay', 1.0)),
+                "user_agent": data.get('user_agent', "CustomCrawler/1.0"),
+                "max_workers": int(data.get('max_workers', 5)),
+                "max_retries": int(data.get('max_retries', 3)),
+                "adaptive_rate": bool(data.get('adaptive_rate', True)),
+                "max_rate": float(data['max_rate']) if data.get('max_rate') else None,
+                "state_db": state_db_path(root_url) if data.get('incremental', False) else None,
+                "rules": app.config['URL_RULES'],
+                "checkpoint_file": checkpoint_path(root_url),
+                "resume": bool(data.get('resume', False)),
+                "parse_workers": app.config['PARSE_WORKERS'],
+                "canonical": bool(data.get('canonical', True)),
+                "dedupe_content": bool(data.get('dedupe_content', False)),
+                # <image:image> and hreflang <xhtml:link> entries, collected in the same parse
+                "extensions": bool(data.get('extensions', False)),
+                "seed_sitemaps": bool(data.get('seed_sitemaps', True)),
+                # The newest sitemap of an earlier crawl of this site, to find its pages again
+                "seed_files": previous_sitemaps(app.config['UPLOAD_FOLDER'], root_url)[:1]
+                              if data.get('seed_previous', True) else [],
+            },
+        }
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
+
+    try:
+        # Jobs of one site share its checkpoint journal, so only one may be queued or running
+        job = job_manager.submit(params, run_sitemap_job, key=params['generator']['checkpoint_file'])
+    except JobConflict as e:
+        logger.warning(str(e))
+        return jsonify({"error": f"A crawl of this site is already {e.job.status}",
+                        "job_id": e.job.id,
+                        "status_url": url_for('job_status', job_id=e.job.id)}), 409
+    except JobQueueFull as e:
+        logger.warning(str(e))
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({
+        "message": "Sitemap generation started",
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": url_for('job_status', job_id=job.id),
+        "redirect": url_for('sitemaps')
+    }), 202
+
+@app.route('/jobs')
+def list_jobs():
+    return jsonify({"jobs": [job.to_dict() for job in job_manager.list()]})
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    logger.info(f"Cancellation requested for job {job_id}")
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status == FAILED:
+        return jsonify({"error": job.error, "status": job.status}), 500
+    if job.status != COMPLETED:
+        return jsonify({"error": f"Job is {job.status}", "status": job.status}), 409
+    return jsonify(dict(job.result, status=job.status,
+                        download_url=url_for('download_sitemap', filename=job.result['filename'])))
+
+def sitemap_file(filename):
+    """Return the path of a saved sitemap, or None if there is no such file in the upload folder."""
+    if not filename.endswith(('.xml', '.xml.gz')):
+        return None
+    file_path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+    if file_path is None or not os.path.isfile(file_path):
+        return None
+    return file_path
+
+def iter_gunzipped(file_path, chunk_size=64 * 1024):
+    with gzip.open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
 
 @app.route('/download/<filename>')
 def download_sitemap(filename):
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    logger.info(f"Attempting to download file: {file_path}")
-    if not os.path.exists(file_path):
-        logger.error(f"Download failed: File {file_path} not found")
+    file_path = sitemap_file(filename)
+    logger.info(f"Attempting to download file: {filename}")
+    if file_path is None:
+        logger.error(f"Download failed: File {filename} not found")
         return jsonify({"error": "File not found"}), 404
     
     logger.info(f"Downloading file: {filename}")
-    return send_file(file_path, as_attachment=True)
+    # Streamed from disk in chunks, with ETag/If-None-Match and Range handled by send_file
+    return send_file(file_path, as_attachment=True, conditional=True, etag=True)
 
 @app.route("/view/<filename>/<path:subpath>")
 def view_sitemap(filename, subpath):
-    file_path = f"last_work/{filename}"
+    file_path = sitemap_file(filename)
+    if file_path is None:
+        return jsonify({"error": "File not found"}), 404
+    if not filename.endswith('.gz'):
+        return send_file(file_path, mimetype='application/xml', conditional=True, etag=True)
+
+    if request.accept_encodings['gzip']:
+        # Let the client decompress: the stored bytes are sent as they are, and Range applies to them
+        response = send_file(file_path, mimetype='application/xml', conditional=True, etag=True)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        return response
+
+    stat = os.stat(file_path)
+    etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}-identity"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        # The decompressed length is unknown up front, so this representation is not range-capable
+        response = Response(iter_gunzipped(file_path), mimetype='application/xml')
+        response.headers['Accept-Ranges'] = 'none'
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    return response
+
+def url_page_args():
+    """Read and validate ?start=&count= for the paged URL views."""
+    start = int(request.args.get('start', 0))
+    count = int(request.args.get('count', 100))
+    if start < 0 or not 1 <= count <= 1000:
+        raise ValueError("start must be at least 0 and count between 1 and 1000")
+    return start, count
+
+@app.route('/sitemaps/<filename>/urls')
+def sitemap_urls(filename):
+    file_path = sitemap_file(filename)
+    sitemap = sitemap_catalog.get(filename) if file_path else None
+    if sitemap is None:
+        return render_template('sitemap_urls.html', sitemap=None, urls=[], start=0, count=0,
+                               error="Sitemap not found"), 404
+    try:
+        start, count = url_page_args()
+    except ValueError as e:
+        return render_template('sitemap_urls.html', sitemap=sitemap, urls=[], start=0, count=0, error=str(e)), 400
+    urls = read_urls(file_path, start, count)
+    return render_template('sitemap_urls.html', sitemap=sitemap, urls=urls, start=start, count=count)
+
+@app.route('/api/sitemaps/<filename>/urls')
+def api_sitemap_urls(filename):
+    """URL entries N..N+count of a saved sitemap: ?start=&count="""
+    file_path = sitemap_file(filename)
+    sitemap = sitemap_catalog.get(filename) if file_path else None
+    if sitemap is None:
+        return jsonify({"error": "Sitemap not found"}), 404
     try:
-        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
-            content = f.read()
-        return Response(content, mimetype='application/xml')
-    except UnicodeDecodeError:
-        return "Error: Unable to decode the file. Ensure it is a valid UTF-8 encoded gzip file.", 500
+        start, count = url_page_args()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
+    return jsonify({
+        "filename": filename,
+        "total": sitemap['url_count'],
+        "start": start,
+        "count": count,
+        "urls": read_urls(file_path, start, count),
+    })
+
+def sitemap_listing_args():
+    """Read and validate the listing parameters shared by /sitemaps and /api/sitemaps."""
+    sort = request.args.get('sort', 'timestamp')
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_COLUMNS)}")
+    order = request.args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be asc or desc")
+    page = int(request.args.get('page', 1))
+    per_page = int(request.args.get('per_page', 50))
+    if page < 1 or not 1 <= per_page <= 500:
+        raise ValueError("page must be at least 1 and per_page between 1 and 500")
+    return {
+        'domain': request.args.get('domain') or None,
+        'sort': sort,
+        'order': order,
+        'page': page,
+        'per_page': per_page,
+    }
+
+def list_sitemaps(args):
+    sitemaps, total = sitemap_catalog.list(args['domain'], args['sort'], args['order'] == 'desc',
+                                           args['page'], args['per_page'])
+    return sitemaps, {
+        'total': total,
+        'page': args['page'],
+        'per_page': args['per_page'],
+        'pages': max(1, -(-total // args['per_page'])),
+    }
 
 @app.route('/sitemaps')
 def sitemaps():
     try:
-        sitemaps = []
-        
-        for filename in os.listdir(app.config['UPLOAD_FOLDER']):
-            if filename.endswith(('.xml', '.xml.gz')):
-                # Extract domain and timestamp from filename
-                match = re.match(r'(.+)_(\d{8}_\d{6})\.xml(\.gz)?$', filename)
-                if match:
-                    domain = match.group(1).replace('_', '.')  # e.g., elghazawy_com -> elghazawy.com
-                    timestamp = match.group(2)  # e.g., 20250507_143022
-                    # Format timestamp to YYYY-MM-DD HH:MM:SS
-                    sitemaps.append({
-                        'filename': filename,
-                        'domain': domain,
-                        'creation_date': format_creation_date(timestamp),
-                        'timestamp': timestamp,
-                    })
-                else:
-                    # Fallback for files not matching the pattern
-                    sitemaps.append({
-                        'filename': filename,
-                        'domain': filename,
-                        'creation_date': 'Unknown',
-                        'timestamp': timestamp, 
-                    })
-        logger.info(f"Found sitemaps: {[s['filename'] for s in sitemaps]}")
-        sitemaps.sort(key=lambda x: x['timestamp'], reverse=True)
-        return render_template('sitemaps.html', sitemaps=sitemaps)
+        args = sitemap_listing_args()
+    except ValueError as e:
+        return render_template('sitemaps.html', sitemaps=[], error=str(e), args={}, pagination=None,
+                               domains=[])
+    try:
+        sitemaps, pagination = list_sitemaps(args)
+        for sitemap in sitemaps:
+            sitemap['creation_date'] = format_creation_date(sitemap['timestamp'])
+        return render_template('sitemaps.html', sitemaps=sitemaps, args=args, pagination=pagination,
+                               domains=sitemap_catalog.domains())
     except Exception as e:
         logger.error(f"Error listing sitemaps: {str(e)}")
-        return render_template('sitemaps.html', sitemaps=[], error=str(e))
+        return render_template('sitemaps.html', sitemaps=[], error=str(e), args=args, pagination=None,
+                               domains=[])
+
+@app.route('/api/sitemaps')
+def api_sitemaps():
+    """Generated sitemaps as JSON: ?domain=&sort=timestamp|domain|urls|size|filename&order=&page=&per_page="""
+    try:
+        args = sitemap_listing_args()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid parameter: {str(e)}"}), 400
+    sitemaps, pagination = list_sitemaps(args)
+    for sitemap in sitemaps:
+        sitemap['download_url'] = url_for('download_sitemap', filename=sitemap['filename'])
+    return jsonify(dict(pagination, sitemaps=sitemaps))
+
+@app.route('/api/sitemaps/diff')
+def api_sitemap_diff():
+    """
+    URLs added, removed or reprioritized between two saved sitemaps, as JSON lines.
+
+    ?old=<filename>&new=<filename>, or ?domain= for the domain's two newest sitemaps.
+    The last line is {"summary": {...}} with the number of each kind of change.
+    """
+    old_name, new_name = request.args.get('old'), request.args.get('new')
+    domain = request.args.get('domain')
+    if not (old_name and new_name):
+        if not domain:
+            return jsonify({"error": "Give old and new sitemap file names, or a domain"}), 400
+        latest, _ = sitemap_catalog.list(domain, per_page=2)
+        if len(latest) < 2:
+            return jsonify({"error": f"Fewer than two sitemaps for {domain}"}), 404
+        new_name, old_name = latest[0]['filename'], latest[1]['filename']
+
+    old_path, new_path = sitemap_file(old_name), sitemap_file(new_name)
+    if old_path is None or new_path is None:
+        return jsonify({"error": "File not found"}), 404
+
+    sitemap_diff = SitemapDiff(old_path, new_path)
+
+    def generate():
+        yield json.dumps({"old": old_name, "new": new_name}) + "\n"
+        for change in sitemap_diff.changes():
+            yield json.dumps(change) + "\n"
+        yield json.dumps({"summary": sitemap_diff.stats()}) + "\n"
+
+    return Response(generate(), mimetype='application/x-ndjson')
 
 @app.route('/generate-log')
 def generate_log():
-    global current_url_count
-    def stream_logs():
-        last_position = 0
-        while True:
-            try:
-                with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                    f.seek(last_position)
-                    new_logs = f.read()
-                    if new_logs:
-                        url_count = current_url_count
-                        for line in new_logs.splitlines():
-                            if "URLs found" in line:
-                                try:
-                                    count = int(line.split('(')[1].split(' URLs found')[0])
-                                    url_count = count
-                                except (IndexError, ValueError):
-                                    pass
-                        yield f'data: {json.dumps({"log": new_logs, "url_count": url_count})}\n\n'
-                    last_position = f.tell()
-            except FileNotFoundError:
-                yield f'data: {json.dumps({"log": "Log file not found", "url_count": current_url_count})}\n\n'
-                break
-            time.sleep(1)
-
-    return Response(stream_logs(), mimetype='text/event-stream')
+    job_id = request.args.get('job_id', '')
+    if job_manager.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def stream_events():
+        subscription = event_hub.subscribe(job_id)
+        try:
+            for event in subscription.events(timeout=15):
+                if event is None:
+                    # Keep idle connections open through proxies
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'data: {json.dumps(event.to_dict())}\n\n'
+        finally:
+            subscription.close()
+
+    return Response(stream_events(), mimetype='text/event-stream')
+
+@app.route('/metrics')
+def metrics():
+    """Crawl metrics of this process in the Prometheus text format."""
+    if crawl_metrics is None:
+        return Response("Metrics are disabled (SITEMAP_METRICS=0)\n", status=404, mimetype='text/plain')
+    return Response(crawl_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
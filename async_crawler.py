@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Set, TYPE_CHECKING
+
+import aiohttp
+
+import events
+import metrics as crawl_metrics
+
+if TYPE_CHECKING:
+    from sitemap_generator import SitemapGenerator
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCrawler:
+    def __init__(self, generator: "SitemapGenerator", timeout: float = 10):
+        """
+        asyncio/aiohttp crawl engine for a SitemapGenerator.
+
+        Uses the generator's URL validation, normalization, robots cache and
+        per-host rate limiter, so results match the threaded engine.
+        ``max_workers`` is the number of concurrent in-flight requests.
+
+        Args:
+            generator: The SitemapGenerator whose settings drive the crawl
+            timeout: Seconds to open a connection, and to wait for each read of the
+                     response, like the threaded engine's requests timeout; time
+                     queued for a free connection does not count (default: 10)
+        """
+        self.generator = generator
+        self.concurrency = generator.max_workers
+        self.per_host_limit = generator.max_connections_per_host
+        self.timeout = timeout
+
+    def crawl(self) -> List[str]:
+        """Run the crawl to completion and return the sorted list of URLs."""
+        return asyncio.run(self._crawl())
+
+    async def _crawl(self) -> List[str]:
+        gen = self.generator
+        store = gen.url_store
+        gen._seed_frontier(store)
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        async with aiohttp.ClientSession(headers=dict(gen.session.headers), connector=connector,
+                                         timeout=timeout, trace_configs=[self._trace_config()]) as session:
+            await asyncio.gather(*(self._worker(session) for _ in range(self.concurrency)))
+
+        return gen._crawl_result(store)
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Count new and reused connections in the generator's transport stats and time new ones."""
+        gen = self.generator
+        stats = gen.transport_stats
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_create_start(session, context, params):
+            context.connect_start = time.monotonic()
+
+        async def on_create_end(session, context, params):
+            stats.record_connections(1, 0)
+            gen._observe_phase(crawl_metrics.CONNECT, time.monotonic() - context.connect_start)
+
+        async def on_reuse(session, context, params):
+            stats.record_connections(0, 1)
+
+        trace_config.on_connection_create_start.append(on_create_start)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
+
+    async def _next_url(self) -> Optional[str]:
+        """Wait for a URL to crawl; None once the frontier is drained or max_urls is reached."""
+        gen = self.generator
+        store = gen.url_store
+        async with self._cond:
+            while True:
+                # Stop scheduling once crawled + in-flight reach max_urls
+                limit_reached = gen.cancelled or store.crawled_count + self._in_flight >= gen.max_urls
+                if store.pending and not limit_reached:
+                    self._in_flight += 1
+                    return store.pop()
+                if self._in_flight == 0:
+                    # Nothing left that could queue more work
+                    self._cond.notify_all()
+                    return None
+                await self._cond.wait()
+
+    async def _worker(self, session: aiohttp.ClientSession) -> None:
+        gen = self.generator
+        store = gen.url_store
+        while True:
+            url = await self._next_url()
+            if url is None:
+                return
+            try:
+                try:
+                    new_links = await self._process_url(session, url)
+                except Exception as e:
+                    logger.error(f"Error processing {url}: {e}")
+                    gen._emit(events.ERROR, url=url, message=str(e))
+                    store.mark_done(url)
+                    continue
+
+                if new_links is None:
+                    store.mark_done(url)
+                    continue
+
+                if gen._take_duplicate(url):
+                    store.mark_done(url)
+                    store.extend(new_links)
+                    continue
+
+                store.add_crawled(url)
+                gen.urls_found = store.crawled_count
+                logger.info(f"Crawled: {url} ({store.crawled_count} URLs found)")
+
+                added = gen._queue_links(store, url, new_links)
+                gen._page_crawled(url, len(new_links), added, store.pending, self._in_flight - 1)
+            finally:
+                async with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    async def _can_fetch(self, url: str) -> bool:
+        robots = self.generator.robots_cache
+        parser = robots.peek(url)
+        if parser is None:
+            # First request for this host: fetch robots.txt off the event loop.
+            # RobotsCache makes concurrent callers share a single download.
+            parser = await asyncio.get_running_loop().run_in_executor(None, robots.get, url)
+        return parser.can_fetch(robots.user_agent, url)
+
+    async def _read_capped(self, url: str, response: aiohttp.ClientResponse) -> bytes:
+        """Read the body in chunks, stopping at the generator's max_page_bytes."""
+        limit = self.generator.max_page_bytes
+        buffer = bytearray()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            buffer += chunk
+            if len(buffer) >= limit:
+                logger.warning(f"Truncated {url} at {limit} bytes")
+                del buffer[limit:]
+                break
+        return bytes(buffer)
+
+    async def _process_url(self, session: aiohttp.ClientSession, url: str) -> Optional[Set[str]]:
+        """Async counterpart of SitemapGenerator._process_url."""
+        gen = self.generator
+        start = time.monotonic()
+        allowed = await self._can_fetch(url)
+        gen._observe_phase(crawl_metrics.ROBOTS, time.monotonic() - start)
+        if not allowed:
+            gen._record_skip('robots')
+            logger.info(f"Skipping {url} (disallowed by robots.txt)")
+            return set()
+
+        wait = gen.rate_limiter.bucket(url, gen.request_interval(url)).reserve()
+        gen._observe_phase(crawl_metrics.QUEUE_WAIT, wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        metrics = gen.metrics
+        if metrics is not None:
+            metrics.in_flight.inc()
+        try:
+            fetched = await self._fetch(session, url)
+        finally:
+            if metrics is not None:
+                metrics.in_flight.dec()
+        if fetched is None or isinstance(fetched, set):
+            return fetched
+        content, encoding, headers = fetched
+
+        start = time.monotonic()
+        if gen.parser_pool is not None:
+            # Parse in the process pool without blocking the event loop
+            page = await asyncio.wrap_future(gen.parser_pool.submit(url, content, encoding))
+            links = gen._page_parsed(url, page, time.monotonic() - start)
+        else:
+            links = gen._parse_links(url, content, encoding)
+        gen._record_page(url, headers, content, links)
+        return links
+
+    async def _fetch(self, session: aiohttp.ClientSession, url: str):
+        """
+        Fetch a page, retrying per the generator's retry policy.
+
+        Returns:
+            (body, encoding, headers) of an HTML page, a set of links when the page
+            needs no parsing (not modified, or failed), or None for a non-HTML page
+            or an error status
+        """
+        gen = self.generator
+        policy = gen.retry_policy
+        retry = 0
+        while True:
+            try:
+                start = time.monotonic()
+                async with session.get(url, headers=gen._conditional_headers(url)) as response:
+                    headers_received = time.monotonic()
+                    gen._observe_phase(crawl_metrics.TTFB, headers_received - start)
+                    if response.status in policy.statuses and retry < policy.retries:
+                        gen._observe_response(url, response.status)
+                        reason = str(response.status)
+                        wait = policy.retry_after(response.headers.get('Retry-After'))
+                    else:
+                        if response.status == 304:
+                            gen._page_fetched(url, response.status, 0, headers_received - start)
+                            return gen._not_modified_links(url)
+                        content_type = response.headers.get('Content-Type')
+                        if not gen.is_html_content_type(content_type):
+                            gen._page_fetched(url, response.status, 0, headers_received - start)
+                            gen._record_skip('content_type', url=url)
+                            logger.info(f"Skipping {url} (non-HTML content type: {content_type})")
+                            return None
+
+                        content = await self._read_capped(url, response)
+                        gen._observe_phase(crawl_metrics.DOWNLOAD, time.monotonic() - headers_received)
+                        gen._page_fetched(url, response.status, len(content), time.monotonic() - start)
+                        if response.status in policy.statuses:
+                            gen.transport_stats.record_gave_up()
+                        response.raise_for_status()
+                        return content, response.charset, response.headers
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                gen._observe_response(url, None)
+                if retry >= policy.retries:
+                    gen.transport_stats.record_gave_up()
+                    if gen.metrics is not None:
+                        gen.metrics.errors.inc()
+                    logger.error(f"Failed to fetch {url}: {e}")
+                    gen._emit(events.ERROR, url=url, message=str(e))
+                    return set()
+                reason = type(e).__name__
+                wait = None
+            except aiohttp.ClientError as e:
+                logger.error(f"Failed to fetch {url}: {e}")
+                gen._emit(events.ERROR, url=url, message=str(e))
+                if isinstance(e, aiohttp.ClientResponseError):
+                    gen._record_skip('status', url=url)
+                    return None
+                return set()
+
+            # Same policy as the threaded engine's CountingRetry
+            retry += 1
+            from_header = wait is not None
+            if wait is None:
+                wait = policy.backoff(retry)
+            gen.transport_stats.record_retry(reason)
+            gen.transport_stats.record_wait(wait, from_header)
+            logger.info(f"Retrying {url} ({reason}), attempt {retry + 1}")
+            await asyncio.sleep(wait)
@@ -0,0 +1,82 @@
+"""
+Benchmark the cost of checkpoint journaling and of resuming from a journal.
+
+Replays the synthetic crawl from bench_url_store.py with and without a
+CrawlJournal attached to the UrlStore, then restores a fresh store from the
+journal as a resumed crawl would.
+
+Usage:
+    python benchmarks/bench_checkpoint.py --urls 200000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_url_store import ROOT_URL, page_links, url_index
+from crawl_journal import CrawlJournal
+from url_store import UrlStore
+
+
+def crawl(total: int, journal_path: str = None, checkpoint_interval: float = 5.0) -> dict:
+    store = UrlStore(ROOT_URL)
+    journal = None
+    if journal_path:
+        journal = CrawlJournal(journal_path, checkpoint_interval)
+        journal.open(store, ROOT_URL)
+        store.journal = journal
+
+    start = time.perf_counter()
+    store.add(ROOT_URL)
+    while store.pending:
+        url = store.pop()
+        store.add_crawled(url)
+        for link in page_links(url_index(url), total):
+            store.add(link)
+    store.close()
+    elapsed = time.perf_counter() - start
+
+    result = {'seconds': round(elapsed, 2), 'urls_crawled': store.crawled_count}
+    if journal is not None:
+        result.update(journal.stats())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--urls', type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'crawl.journal')
+        baseline = crawl(args.urls)
+        journaled = {
+            f"interval_{interval}s": crawl(args.urls, path, interval)
+            for interval in (5.0, 0.5)
+        }
+
+        start = time.perf_counter()
+        store = UrlStore(ROOT_URL)
+        CrawlJournal(path).open(store, ROOT_URL, resume=True)
+        resume_seconds = time.perf_counter() - start
+        store.close()
+
+    for result in journaled.values():
+        extra = result['seconds'] - baseline['seconds']
+        result['overhead_percent'] = round(extra / baseline['seconds'] * 100, 1)
+        result['overhead_us_per_page'] = round(extra / args.urls * 10 ** 6, 2)
+
+    print(json.dumps({
+        'urls': args.urls,
+        'no_journal': baseline,
+        'journal': journaled,
+        'resume': {'seconds': round(resume_seconds, 2), 'urls_restored': store.crawled_count},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
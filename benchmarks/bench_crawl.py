@@ -0,0 +1,193 @@
+"""
+Reproducible end-to-end crawl benchmark against local synthetic sites.
+
+Each scenario starts a fresh synthetic site server (see synthetic_site.py),
+crawls it with SitemapGenerator, writes the sitemap plain and gzipped, and
+reports pages/sec, fetch latency percentiles, peak RSS and output bytes.
+Every scenario and engine runs in its own subprocess so peak RSS is
+measured in isolation. Everything runs on 127.0.0.1; no network access is
+needed.
+
+Usage:
+    python benchmarks/bench_crawl.py --output bench.json
+    python benchmarks/bench_crawl.py --scenarios baseline errors --engines threads async
+    python benchmarks/bench_crawl.py --output new.json --compare bench.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import events
+from sitemap_generator import SitemapGenerator
+from synthetic_site import SiteConfig, serve_in_subprocess
+
+# Site settings (SiteConfig keyword arguments) and crawler settings per scenario
+SCENARIOS = {
+    'baseline': {'site': {'pages': 2000, 'fanout': 10}, 'crawler': {}},
+    'latency': {'site': {'pages': 2000, 'fanout': 10, 'latency_ms': 20, 'latency_dist': 'lognormal'},
+                'crawler': {}},
+    # Measures the retry path; with adaptive_rate the crawler would deliberately slow down on every 503
+    'errors': {'site': {'pages': 2000, 'fanout': 10, 'error_rate': 0.05}, 'crawler': {'adaptive_rate': False}},
+    'robots': {'site': {'pages': 2000, 'fanout': 10, 'disallow_rate': 0.1}, 'crawler': {}},
+    'heavy': {'site': {'pages': 500, 'fanout': 10, 'page_kb': 100}, 'crawler': {}},
+}
+
+ENGINES = ['threads', 'async']
+
+# Metrics compared by --compare, and whether a higher value is better
+COMPARED = {
+    'pages_per_sec': True,
+    'fetch_p50_ms': False,
+    'fetch_p99_ms': False,
+    'peak_rss_mb': False,
+    'write_seconds': False,
+    'output_bytes': False,
+}
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # Rounded first so float error (0.07 * 100 == 7.000000000000001) does not push the rank up
+    rank = max(1, math.ceil(round(fraction * len(sorted_values), 9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def run_scenario(name: str, engine: str, workers: int) -> dict:
+    scenario = SCENARIOS[name]
+    config = SiteConfig(**scenario['site'])
+    latencies = []
+
+    def sink(event_type, data):
+        if event_type == events.PAGE_FETCHED:
+            latencies.append(data['elapsed'])
+
+    server, base_url = serve_in_subprocess(config)
+    try:
+        generator = SitemapGenerator(base_url, max_urls=config.pages, delay=0, max_workers=workers,
+                                     engine=engine, event_sink=sink, **scenario['crawler'])
+        start = time.perf_counter()
+        urls = generator.crawl_site()
+        crawl_seconds = time.perf_counter() - start
+    finally:
+        server.terminate()
+
+    with tempfile.TemporaryDirectory() as plain_dir, tempfile.TemporaryDirectory() as gzip_dir:
+        start = time.perf_counter()
+        generator.generate_sitemap(urls, os.path.join(plain_dir, 'sitemap.xml'))
+        write_seconds = time.perf_counter() - start
+        generator.generate_sitemap(urls, os.path.join(gzip_dir, 'sitemap.xml'), compress=True)
+        output_bytes = directory_bytes(plain_dir)
+        output_gzip_bytes = directory_bytes(gzip_dir)
+
+    latencies.sort()
+    transport = generator.crawl_stats.get('transport', {})
+    return {
+        'scenario': name,
+        'engine': engine,
+        'workers': workers,
+        'site': scenario['site'],
+        'crawler': scenario['crawler'],
+        'urls': len(urls),
+        'pages_fetched': len(latencies),
+        'seconds': round(crawl_seconds, 3),
+        'pages_per_sec': round(len(urls) / crawl_seconds, 1) if crawl_seconds else None,
+        'fetch_p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'fetch_p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'fetch_max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        'retries': transport.get('retries', 0),
+        'bytes_downloaded': generator.bytes_downloaded,
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'write_seconds': round(write_seconds, 3),
+        'output_bytes': output_bytes,
+        'output_gzip_bytes': output_gzip_bytes,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results: list, baseline_path: str) -> list:
+    """Percent change of each compared metric against a previous report, per scenario and engine."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['scenario'], r['engine']): r for r in json.load(f)['results']}
+    changes = []
+    for result in results:
+        old = baseline.get((result['scenario'], result['engine']))
+        if old is None:
+            continue
+        change = {'scenario': result['scenario'], 'engine': result['engine']}
+        for metric, higher_is_better in COMPARED.items():
+            if old.get(metric):
+                percent = (result[metric] - old[metric]) / old[metric] * 100
+                change[metric] = {'before': old[metric], 'after': result[metric],
+                                  'change_percent': round(percent, 1),
+                                  'better': percent > 0 if higher_is_better else percent < 0}
+        changes.append(change)
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=['threads'])
+    parser.add_argument('--workers', type=int, default=20)
+    parser.add_argument('--output', help="Also write the JSON report to this file")
+    parser.add_argument('--compare', help="Previous JSON report to compare against")
+    parser.add_argument('--run', nargs=2, metavar=('SCENARIO', 'ENGINE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # Per-page INFO logging would dominate the measurement
+        logging.getLogger().setLevel(logging.WARNING)
+        print(json.dumps(run_scenario(args.run[0], args.run[1], args.workers)))
+        return
+
+    results = []
+    for name in args.scenarios:
+        for engine in args.engines:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--run', name, engine, '--workers', str(args.workers)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    if args.compare:
+        report['comparison'] = compare(results, args.compare)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
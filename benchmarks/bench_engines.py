@@ -0,0 +1,59 @@
+"""
+Compare the threaded and async crawl engines against a local synthetic site.
+
+Usage:
+    python benchmarks/bench_engines.py --pages 50000 --latency-ms 20
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sitemap_generator import SitemapGenerator
+from synthetic_site import SiteConfig, serve_in_subprocess
+
+
+def run_engine(base_url: str, pages: int, engine: str, workers: int) -> dict:
+    generator = SitemapGenerator(base_url, max_urls=pages, delay=0, max_workers=workers, engine=engine)
+    start = time.perf_counter()
+    urls = generator.crawl_site()
+    elapsed = time.perf_counter() - start
+    return {
+        'engine': engine,
+        'workers': workers,
+        'urls': len(urls),
+        'seconds': round(elapsed, 2),
+        'pages_per_sec': round(len(urls) / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=50000)
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--thread-workers', type=int, default=20)
+    parser.add_argument('--async-concurrency', type=int, default=200)
+    args = parser.parse_args()
+
+    # Per-page INFO logging would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server, base_url = serve_in_subprocess(SiteConfig(args.pages, args.fanout, args.latency_ms))
+    try:
+        results = [
+            run_engine(base_url, args.pages, 'threads', args.thread_workers),
+            run_engine(base_url, args.pages, 'async', args.async_concurrency),
+        ]
+    finally:
+        server.terminate()
+
+    print(json.dumps({'pages': args.pages, 'latency_ms': args.latency_ms, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark of the link extractors on large product-page fixtures.
+
+The fixtures are generated deterministically to resemble the catalogue
+pages we crawl (300-600 KB: navigation, inline JSON state, styles and a
+product grid with Arabic text). Each extractor must return the same
+links as the BeautifulSoup reference.
+
+Usage:
+    python benchmarks/bench_link_extractors.py --iterations 20
+    python benchmarks/bench_link_extractors.py --extensions   # also collect images and hreflang
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from link_extractors import EXTRACTORS, get_link_extractor
+
+
+def make_product_page(target_kb: int, seed: int) -> bytes:
+    """Build a synthetic catalogue page of roughly ``target_kb`` kilobytes."""
+    rng = random.Random(seed)
+    parts = [
+        '<!DOCTYPE html><html lang="ar" dir="rtl"><head><meta charset="utf-8">',
+        '<title>الأجهزة المنزلية - متجر</title>',
+        '<base href="/ar/">',
+        '<link rel="stylesheet" href="/static/app.css">',
+        '<link rel="canonical" href="https://shop.example/ar/sub-category/home-appliances">',
+        '<style>' + ''.join(f'.c{i}{{margin:{i}px;padding:{i % 7}px}}' for i in range(800)) + '</style>',
+        '<script>window.__STATE__=' + json.dumps({
+            'products': [{'id': i, 'url': f'/ar/product/{i}', 'name': f'منتج {i}'} for i in range(600)]
+        }, ensure_ascii=False) + ';</script>',
+        '</head><body><nav><ul>',
+    ]
+    parts += [f'<li><a class="nav-link" href="/ar/sub-category/cat-{i}">قسم {i}</a></li>' for i in range(120)]
+    parts.append('</ul></nav><!-- <a href="/ar/hidden-in-comment">x</a> --><main class="grid">')
+
+    product = 0
+    size = sum(len(p.encode('utf-8')) for p in parts)
+    while size < target_kb * 1024:
+        product += 1
+        pid = rng.randint(1, 10 ** 6)
+        parts.append(
+            f'<div class="card c{product % 800}" data-id="{pid}" data-price="{rng.randint(100, 99999)}">'
+            f'<a href="product/{pid}?ref=grid&amp;pos={product}" title="منتج رقم {pid}">'
+            f'<img src="/media/{pid}.jpg" alt="صورة {pid}" loading=lazy width=300 height=300></a>'
+            f'<h3><a href=\'/ar/product/{pid}\'>اسم المنتج {pid} - وصف طويل للمنتج</a></h3>'
+            f'<p class="desc">{"نص وصفي " * rng.randint(5, 20)}</p>'
+            f'<button onclick="addToCart({pid})">أضف إلى السلة</button></div>'
+        )
+        size += len(parts[-1].encode('utf-8'))
+    parts.append('</main><footer><a href="/ar/about-us">من نحن</a><a href="mailto:info@shop.example">mail</a>'
+                 '<a href="javascript:void(0)">js</a></footer></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--extensions', action='store_true', help="Also extract images and hreflang alternates")
+    args = parser.parse_args()
+
+    fixtures = [make_product_page(kb, seed) for seed, kb in enumerate((300, 450, 600))]
+    total_bytes = sum(len(f) for f in fixtures)
+    bs4 = get_link_extractor('bs4')
+    reference = [sorted(bs4.extract(f).hrefs) for f in fixtures]
+    reference_images = [bs4.extract(f, extensions=True).images for f in fixtures]
+
+    results = []
+    for name in EXTRACTORS:
+        extractor = get_link_extractor(name)
+        matches = all(sorted(extractor.extract(f).hrefs) == ref for f, ref in zip(fixtures, reference))
+        if args.extensions:
+            matches = matches and all(extractor.extract(f, extensions=True).images == ref
+                                      for f, ref in zip(fixtures, reference_images))
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            for fixture in fixtures:
+                extractor.extract(fixture, 'utf-8', args.extensions)
+        elapsed = time.perf_counter() - start
+        pages = args.iterations * len(fixtures)
+        results.append({
+            'extractor': name,
+            'pages_per_sec': round(pages / elapsed, 1),
+            'mb_per_sec': round(args.iterations * total_bytes / elapsed / 1e6, 1),
+            'matches_bs4': matches,
+        })
+
+    print(json.dumps({
+        'fixtures_kb': [len(f) // 1024 for f in fixtures],
+        'iterations': args.iterations,
+        'extensions': args.extensions,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure the per-page cost of crawl instrumentation with metrics off and on.
+
+Calls the generator's instrumentation hooks the way one crawled page does
+(robots check, queue wait, in-flight gauge, TTFB, download, response
+counters, parse and page counters) without any network I/O, so the numbers
+are the instrumentation overhead alone. Also times rendering /metrics.
+
+Usage:
+    python benchmarks/bench_metrics.py --pages 200000
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics as crawl_metrics
+from metrics import CrawlMetrics
+from sitemap_generator import SitemapGenerator
+
+URL = "https://elghazawy.com/ar/product/1"
+
+
+def page_hooks(generator: SitemapGenerator, pages: int) -> float:
+    """Run the hooks of ``pages`` crawled pages and return the seconds taken."""
+    start = time.perf_counter()
+    for i in range(pages):
+        t = time.monotonic()
+        generator._observe_phase(crawl_metrics.ROBOTS, time.monotonic() - t)
+        generator._observe_phase(crawl_metrics.QUEUE_WAIT, 0.0)
+        metrics = generator.metrics
+        if metrics is not None:
+            metrics.in_flight.inc()
+        t = time.monotonic()
+        generator._observe_phase(crawl_metrics.TTFB, time.monotonic() - t)
+        generator._observe_phase(crawl_metrics.DOWNLOAD, time.monotonic() - t)
+        generator._page_fetched(URL, 200, 20000, 0.05)
+        if metrics is not None:
+            metrics.in_flight.dec()
+        generator._record_parse(time.monotonic() - t, i & 3)
+        generator._page_crawled(URL, 40, 10, 100, 4)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    results = {}
+    for name, options in (('disabled', {}), ('enabled', {'metrics': CrawlMetrics()})):
+        # A fixed delay keeps the adaptive rate controller's bookkeeping out of the numbers
+        generator = SitemapGenerator(URL, adaptive_rate=False, **options)
+        seconds = page_hooks(generator, args.pages)
+        results[name] = {'seconds': round(seconds, 3), 'us_per_page': round(seconds / args.pages * 10 ** 6, 2)}
+
+    start = time.perf_counter()
+    text = generator.metrics.render()
+    results['render'] = {'ms': round((time.perf_counter() - start) * 1000, 2), 'bytes': len(text)}
+    results['overhead_us_per_page'] = round(results['enabled']['us_per_page'] - results['disabled']['us_per_page'], 2)
+
+    print(json.dumps({'pages': args.pages, **results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
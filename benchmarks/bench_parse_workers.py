@@ -0,0 +1,68 @@
+"""
+Measure crawl throughput as HTML parsing moves to more worker processes.
+
+Crawls a local synthetic site with heavy pages once in-process and once
+per parser pool size, using the threaded engine for network I/O.
+
+Usage:
+    python benchmarks/bench_parse_workers.py --pages 2000 --page-kb 200 --workers 0 1 2 4 8 16
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sitemap_generator import SitemapGenerator
+from synthetic_site import SiteConfig, serve_in_subprocess
+
+
+def run(base_url: str, pages: int, parse_workers: int, io_workers: int, extractor: str) -> dict:
+    generator = SitemapGenerator(base_url, max_urls=pages, delay=0, max_workers=io_workers,
+                                 link_extractor=extractor, parse_workers=parse_workers)
+    start = time.perf_counter()
+    urls = generator.crawl_site()
+    elapsed = time.perf_counter() - start
+    return {
+        'parse_workers': parse_workers,
+        'urls': len(urls),
+        'seconds': round(elapsed, 2),
+        'pages_per_sec': round(len(urls) / elapsed, 1) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--page-kb', type=float, default=200.0)
+    parser.add_argument('--io-workers', type=int, default=32)
+    parser.add_argument('--extractor', default='bs4', choices=['fast', 'htmlparser', 'bs4'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4, 8, 16],
+                        help="Parser pool sizes to try; 0 parses in-process")
+    args = parser.parse_args()
+
+    # Per-page INFO logging would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server, base_url = serve_in_subprocess(SiteConfig(args.pages, args.fanout, page_kb=args.page_kb))
+    try:
+        results = [run(base_url, args.pages, workers, args.io_workers, args.extractor)
+                   for workers in args.workers]
+    finally:
+        server.terminate()
+
+    print(json.dumps({
+        'pages': args.pages,
+        'page_kb': args.page_kb,
+        'extractor': args.extractor,
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark URL filtering and priority classification over 1M URLs.
+
+Compares the compiled UrlRules engine with the previous per-call
+implementation of is_valid_url and _determine_priority (reproduced below)
+and checks that both classify every URL identically.
+
+Usage:
+    python benchmarks/bench_url_rules.py --urls 1000000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_rules import DEFAULT_RULES, UrlRules
+
+ROOT_URL = "https://elghazawy.com/ar"
+
+
+def legacy_is_valid_url(root_url: str, url: str) -> bool:
+    parsed_root = urlparse(root_url)
+    parsed_url = urlparse(url)
+    if parsed_url.netloc != parsed_root.netloc:
+        return False
+    non_html_extensions = r'\.(jpg|jpeg|png|gif|pdf|css|js|woff|woff2|ttf|ico|svg|zip|mp4|mp3)(\?.*)?$'
+    if re.search(non_html_extensions, parsed_url.path, re.IGNORECASE):
+        return False
+    return parsed_url.scheme in ['http', 'https']
+
+
+LEGACY_HIGH_PRIORITY = [rule["prefix"] for rule in DEFAULT_RULES["rules"] if "prefix" in rule]
+
+
+def legacy_determine_priority(url: str) -> str:
+    for pattern in LEGACY_HIGH_PRIORITY:
+        if re.search(pattern, url, re.IGNORECASE):
+            return "1.0"
+    if re.search(r'/sub-category/|/category/', url, re.IGNORECASE):
+        return "0.9"
+    if re.search(r'/product/|/item/', url, re.IGNORECASE):
+        return "0.8"
+    return "0.6"
+
+
+def make_urls(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    hosts = ["https://elghazawy.com", "https://elghazawy.com", "https://elghazawy.com", "https://cdn.example.com"]
+    sections = ["ar/product", "en/product", "ar/sub-category/computing", "ar/sub-category/bags",
+                "en/category", "ar/item", "en/about-us", "ar/blog", "static/img"]
+    suffixes = ["", "", "", ".jpg", ".pdf", ".html"]
+    return [
+        f"{rng.choice(hosts)}/{rng.choice(sections)}/{rng.randint(1, 10 ** 7)}{rng.choice(suffixes)}"
+        for _ in range(count)
+    ]
+
+
+def timed(func, urls):
+    start = time.perf_counter()
+    results = [func(url) for url in urls]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--urls', type=int, default=1000000)
+    args = parser.parse_args()
+
+    urls = make_urls(args.urls)
+    rules = UrlRules(DEFAULT_RULES, ROOT_URL)
+
+    legacy_valid_time, legacy_valid = timed(lambda u: legacy_is_valid_url(ROOT_URL, u), urls)
+    valid_time, valid = timed(rules.is_allowed, urls)
+    legacy_priority_time, legacy_priority = timed(legacy_determine_priority, urls)
+    priority_time, priority = timed(lambda u: rules.classify(u)[0], urls)
+
+    print(json.dumps({
+        'urls': args.urls,
+        'is_valid_url': {
+            'legacy_seconds': round(legacy_valid_time, 2),
+            'rules_seconds': round(valid_time, 2),
+            'speedup': round(legacy_valid_time / valid_time, 1),
+            'identical': legacy_valid == valid,
+        },
+        'priority': {
+            'legacy_seconds': round(legacy_priority_time, 2),
+            'rules_seconds': round(priority_time, 2),
+            'speedup': round(legacy_priority_time / priority_time, 1),
+            'identical': legacy_priority == priority,
+        },
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
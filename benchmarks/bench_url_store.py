@@ -0,0 +1,152 @@
+"""
+Benchmark peak memory of crawl bookkeeping per million URLs.
+
+Replays the same synthetic crawl (a link tree with duplicate links back to
+already seen pages) against the previous Python-set bookkeeping of both
+schedulers and against UrlStore with each seen filter. Every variant runs
+in its own subprocess so peak RSS is measured in isolation: once for the
+crawl state alone and once more after the sorted URL list that
+crawl_site() returns has been built.
+
+Usage:
+    python benchmarks/bench_url_store.py --urls 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_store import UrlStore
+
+ROOT_URL = "https://elghazawy.com/ar"
+FANOUT = 10
+
+VARIANTS = ['sets-batch', 'sets-queue', 'store-exact', 'store-bloom', 'store-spill']
+
+
+def page_url(index: int) -> str:
+    if index == 0:
+        return ROOT_URL
+    return f"{ROOT_URL}/product/{index}-{(index * 2654435761) % 10 ** 9:09d}-item-details"
+
+
+def page_links(index: int, total: int) -> list:
+    """Children in the link tree, plus links back to the root and the parent."""
+    children = [page_url(i) for i in range(index * FANOUT + 1, min((index + 1) * FANOUT + 1, total))]
+    return children + [page_url(0), page_url(index // FANOUT)]
+
+
+def url_index(url: str) -> int:
+    return 0 if url == ROOT_URL else int(url.rsplit('/', 1)[1].split('-', 1)[0])
+
+
+def crawl_sets_batch(total: int):
+    crawled_urls = set()
+    to_crawl = {ROOT_URL}
+    visited = set()
+    while to_crawl:
+        for url in list(to_crawl):
+            if url not in visited:
+                visited.add(url)
+                crawled_urls.add(url)
+                for link in page_links(url_index(url), total):
+                    if link not in visited and link not in to_crawl:
+                        to_crawl.add(link)
+        to_crawl -= visited
+    return crawled_urls, (to_crawl, visited)
+
+
+def crawl_sets_queue(total: int):
+    crawled_urls = set()
+    frontier = deque([ROOT_URL])
+    seen = {ROOT_URL}
+    while frontier:
+        url = frontier.popleft()
+        crawled_urls.add(url)
+        for link in page_links(url_index(url), total):
+            if link not in seen:
+                seen.add(link)
+                frontier.append(link)
+    return crawled_urls, (frontier, seen)
+
+
+def crawl_store(total: int, **options):
+    store = UrlStore(ROOT_URL, **options)
+    store.add(ROOT_URL)
+    while store.pending:
+        url = store.pop()
+        store.add_crawled(url)
+        for link in page_links(url_index(url), total):
+            store.add(link)
+    store.close()
+    return store.crawled, store
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_variant(variant: str, total: int) -> dict:
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if variant == 'sets-batch':
+        crawled, state = crawl_sets_batch(total)
+    elif variant == 'sets-queue':
+        crawled, state = crawl_sets_queue(total)
+    elif variant == 'store-exact':
+        crawled, state = crawl_store(total, seen_filter='exact')
+    elif variant == 'store-bloom':
+        crawled, state = crawl_store(total, seen_filter='bloom')
+    else:
+        with tempfile.TemporaryDirectory() as spill_dir:
+            crawled, state = crawl_store(total, seen_filter='exact', memory_budget=8 * 1024 * 1024,
+                                         spill_dir=spill_dir)
+    elapsed = time.perf_counter() - start
+    state_peak = peak_rss_mb()
+    urls = sorted(crawled)
+    result_peak = peak_rss_mb()
+
+    def per_million(peak: float) -> float:
+        return round((peak - baseline) / total * 10 ** 6, 1)
+
+    return {
+        'variant': variant,
+        'urls_crawled': len(urls),
+        'seconds': round(elapsed, 2),
+        'state_peak_rss_mb': round(state_peak, 1),
+        'state_mb_per_million_urls': per_million(state_peak),
+        'peak_rss_mb': round(result_peak, 1),
+        'mb_per_million_urls': per_million(result_peak),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--urls', type=int, default=1000000)
+    parser.add_argument('--variant', choices=VARIANTS, help="Run a single variant in this process")
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.urls)))
+        return
+
+    results = []
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--urls', str(args.urls), '--variant', variant],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output))
+    print(json.dumps({'urls': args.urls, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Local stand-in HTTP server that serves a synthetic website.
+
+Page ``/p/<i>`` links to ``fanout`` other pages, so a crawl starting at ``/``
+reaches every page. Pages selected by ``disallow_rate`` live under
+``/private/<i>``, which robots.txt disallows. Response latency, the pages
+that fail and the private pages are all derived from ``seed``, so every run
+of a configuration serves the same site. Run directly or start it in a
+subprocess with ``serve_in_subprocess`` so the server does not compete with
+the crawler for the GIL.
+"""
+import argparse
+import math
+import multiprocessing
+import random
+import socketserver
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Optional
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+
+class SiteConfig:
+    def __init__(self, pages: int = 1000, fanout: int = 10, latency_ms: float = 0.0,
+                 page_kb: float = 0.0, latency_dist: str = 'fixed', error_rate: float = 0.0,
+                 error_status: int = 503, disallow_rate: float = 0.0,
+                 crawl_delay: Optional[float] = None, seed: int = 0):
+        """
+        Args:
+            pages: Number of pages in the site
+            fanout: Links per page (default: 10)
+            latency_ms: Mean artificial delay added to every response; the median for
+                        "lognormal" (default: 0)
+            page_kb: Pad each page with product-card markup to roughly this size (default: 0, no padding)
+            latency_dist: "fixed", "uniform" (0 to twice the mean), "exponential" or
+                          "lognormal" (sigma 1, a long tail) (default: "fixed")
+            error_rate: Fraction of pages whose first request fails with ``error_status``;
+                        retries succeed (default: 0)
+            error_status: Status of failing first requests (default: 503)
+            disallow_rate: Fraction of pages under /private/, disallowed by robots.txt (default: 0)
+            crawl_delay: Crawl-delay line for robots.txt (default: None, no line)
+            seed: Seed for latencies, failing pages and private pages (default: 0)
+        """
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_dist}")
+        self.pages = pages
+        self.fanout = fanout
+        self.latency_ms = latency_ms
+        self.page_kb = page_kb
+        self.padding = make_padding(page_kb)
+        self.latency_dist = latency_dist
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.disallow_rate = disallow_rate
+        self.crawl_delay = crawl_delay
+        self.seed = seed
+
+    def _fraction(self, index: int, salt: str) -> float:
+        """A stable pseudo-random number in [0, 1) for page ``index``."""
+        return zlib.crc32(f"{self.seed}:{salt}:{index}".encode()) / 2 ** 32
+
+    def is_private(self, index: int) -> bool:
+        return index != 0 and self._fraction(index, 'private') < self.disallow_rate
+
+    def fails_first(self, index: int) -> bool:
+        return self._fraction(index, 'error') < self.error_rate
+
+    def page_path(self, index: int) -> str:
+        return f"/private/{index}" if self.is_private(index) else f"/p/{index}"
+
+    def latency(self, path: str, attempt: int) -> float:
+        """Seconds to delay the ``attempt``-th request for ``path``."""
+        if not self.latency_ms:
+            return 0.0
+        mean = self.latency_ms / 1000.0
+        if self.latency_dist == 'fixed':
+            return mean
+        rng = random.Random(f"{self.seed}:{path}:{attempt}")
+        if self.latency_dist == 'uniform':
+            return rng.uniform(0, 2 * mean)
+        if self.latency_dist == 'exponential':
+            return rng.expovariate(1 / mean)
+        return mean * math.exp(rng.gauss(0, 1))
+
+    def robots_txt(self) -> bytes:
+        lines = ['User-agent: *']
+        lines.append('Disallow: /private/' if self.disallow_rate else 'Allow: /')
+        if self.crawl_delay is not None:
+            lines.append(f'Crawl-delay: {self.crawl_delay}')
+        return ('\n'.join(lines) + '\n').encode()
+
+
+def make_padding(page_kb: float) -> str:
+    """Markup that costs a parser real work: nested tags, attributes and in-page links."""
+    card = ('<div class="card" data-price="199"><a href="#top" title="Back to top">'
+            '<img src="/media/item.jpg" alt="Item" width="300"></a>'
+            '<h3><a href="?sort=price">Product name with a longer description</a></h3>'
+            '<p class="desc">Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p></div>')
+    return card * int(page_kb * 1024 // len(card))
+
+
+def render_page(config: SiteConfig, index: int) -> bytes:
+    """Return the HTML body for page ``index``."""
+    links = ''.join(
+        f'<li><a href="{config.page_path((index * config.fanout + k) % config.pages)}">Page {k}</a></li>'
+        for k in range(1, config.fanout + 1)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f'<title>Page {index}</title></head><body>'
+        f'<h1>Page {index}</h1><ul>{links}</ul>{config.padding}</body></html>'
+    ).encode('utf-8')
+
+
+def make_handler(config: SiteConfig):
+    attempts = {}
+    attempts_lock = threading.Lock()
+
+    class SyntheticSiteHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with attempts_lock:
+                attempt = attempts[self.path] = attempts.get(self.path, 0) + 1
+            latency = config.latency(self.path, attempt)
+            if latency:
+                time.sleep(latency)
+
+            if self.path == '/robots.txt':
+                self._send(200, config.robots_txt(), 'text/plain')
+                return
+
+            if self.path in ('/', ''):
+                index = 0
+            else:
+                prefix, _, number = self.path.rpartition('/')
+                try:
+                    index = int(number)
+                except ValueError:
+                    index = -1
+                # Each page is served only at its own path
+                if 0 <= index < config.pages and config.page_path(index) != f"{prefix}/{index}":
+                    index = -1
+
+            if not 0 <= index < config.pages:
+                self._send(404, b'Not found', 'text/plain')
+                return
+
+            if attempt == 1 and config.fails_first(index):
+                self._send(config.error_status, b'Temporarily unavailable', 'text/plain')
+                return
+
+            self._send(200, render_page(config, index), 'text/html; charset=utf-8')
+
+    return SyntheticSiteHandler
+
+
+class SyntheticSiteServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def serve(config: SiteConfig, port: int = 0, port_queue=None) -> None:
+    """Serve the synthetic site forever, reporting the bound port on ``port_queue``."""
+    server = SyntheticSiteServer(('127.0.0.1', port), make_handler(config))
+    if port_queue is not None:
+        port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def serve_in_subprocess(config: SiteConfig):
+    """Start the server in a child process. Returns (process, base_url)."""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(config, 0, port_queue), daemon=True)
+    process.start()
+    port = port_queue.get(timeout=10)
+    return process, f"http://127.0.0.1:{port}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--page-kb', type=float, default=0.0)
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='fixed')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--disallow-rate', type=float, default=0.0)
+    parser.add_argument('--crawl-delay', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    print(f"Serving {args.pages} pages on http://127.0.0.1:{args.port}")
+    serve(SiteConfig(args.pages, args.fanout, args.latency_ms, args.page_kb, latency_dist=args.latency_dist,
+                     error_rate=args.error_rate, disallow_rate=args.disallow_rate,
+                     crawl_delay=args.crawl_delay, seed=args.seed), args.port)
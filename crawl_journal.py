@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from url_store import HashSet, url_digest
+
+if TYPE_CHECKING:
+    from url_store import UrlStore
+
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+# Record types: a URL was queued, crawled into the sitemap, or finished without
+# being added (non-HTML page or fetch error)
+SEEN = 'S'
+CRAWLED = 'C'
+DONE = 'D'
+
+
+class CrawlJournal:
+    def __init__(self, path: str, checkpoint_interval: float = 5.0):
+        """
+        Append-only journal of crawl progress for checkpoint and resume.
+
+        Every queued, crawled and finished URL becomes one line. Lines are
+        queued in memory and a background thread appends, flushes and fsyncs
+        them every ``checkpoint_interval`` seconds, so a crash loses at most
+        that much progress however slowly the crawl goes. Replaying the
+        journal rebuilds the seen set, the crawled URLs and the frontier;
+        pages that were in flight are queued again, finished pages are not
+        refetched.
+
+        Args:
+            path: Journal file path
+            checkpoint_interval: Seconds between flush/fsync checkpoints (default: 5.0)
+        """
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.records = 0
+        self.bytes_written = 0
+        self.checkpoints = 0
+        self.checkpoint_seconds = 0.0
+        self.resumed = False
+        self._file = None
+        # Lines not yet written; only the checkpoint thread (or close) writes the file
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checkpointer: Optional[threading.Thread] = None
+
+    def _header(self, root_url: str) -> str:
+        return f"# sitemap-journal v{JOURNAL_VERSION} {root_url}\n"
+
+    def open(self, store: "UrlStore", root_url: str, resume: bool = False) -> bool:
+        """
+        Start journaling ``store``'s crawl.
+
+        With ``resume`` and an existing journal for the same root URL, the
+        store is first restored from it and the journal is compacted.
+        Otherwise any previous journal is discarded.
+
+        Returns:
+            True if the crawl was restored from a previous journal
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if resume and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = f.readline()
+            if header == self._header(root_url):
+                self._restore(store, root_url)
+                self.resumed = True
+            else:
+                logger.warning(f"Journal {self.path} is for a different crawl; starting over")
+
+        if not self.resumed:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(self._header(root_url))
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._stop.clear()
+        self._checkpointer = threading.Thread(target=self._checkpoint_periodically,
+                                              name='journal-checkpoint', daemon=True)
+        self._checkpointer.start()
+        return self.resumed
+
+    def _checkpoint_periodically(self) -> None:
+        while not self._stop.wait(self.checkpoint_interval):
+            self.checkpoint()
+
+    def _records(self):
+        """Yield (type, url) pairs, skipping the header and a torn final line."""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            f.readline()
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                kind, _, url = line[:-1].partition('\t')
+                if kind in (SEEN, CRAWLED, DONE) and url:
+                    yield kind, url
+                else:
+                    logger.warning(f"Ignoring malformed journal line: {line!r}")
+
+    def _restore(self, store: "UrlStore", root_url: str) -> None:
+        start = time.monotonic()
+        compacted_path = self.path + '.tmp'
+        finished = HashSet()
+
+        with open(compacted_path, 'w', encoding='utf-8') as out:
+            out.write(self._header(root_url))
+            # Pass 1: finished pages
+            for kind, url in self._records():
+                if kind == SEEN:
+                    continue
+                if finished.add(url_digest(url)):
+                    store.mark_seen(url)
+                    if kind == CRAWLED:
+                        store.add_crawled(url)
+                    out.write(f"{kind}\t{url}\n")
+            # Pass 2: everything queued but not finished goes back on the frontier, in order
+            for kind, url in self._records():
+                if kind == SEEN and store.mark_seen(url):
+                    store.frontier.append(url)
+                    out.write(f"{SEEN}\t{url}\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.replace(compacted_path, self.path)
+        logger.info(f"Resumed from {self.path}: {store.crawled_count} URLs crawled, "
+                    f"{store.pending} queued ({time.monotonic() - start:.2f}s)")
+
+    def _write(self, kind: str, url: str) -> None:
+        line = f"{kind}\t{url}\n"
+        # deque.append is atomic, so the crawl never waits for the checkpoint thread
+        self._pending.append(line)
+        self.records += 1
+        self.bytes_written += len(line)
+
+    def record_seen(self, url: str) -> None:
+        self._write(SEEN, url)
+
+    def record_crawled(self, url: str) -> None:
+        self._write(CRAWLED, url)
+
+    def record_done(self, url: str) -> None:
+        self._write(DONE, url)
+
+    def checkpoint(self) -> None:
+        """Append the queued records to the journal and fsync it."""
+        with self._lock:
+            if self._file is None or not self._pending:
+                return
+            start = time.monotonic()
+            pending = self._pending
+            self._file.write(''.join([pending.popleft() for _ in range(len(pending))]))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.checkpoints += 1
+            self.checkpoint_seconds += time.monotonic() - start
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._checkpointer is not None:
+            self._checkpointer.join()
+            self._checkpointer = None
+        self.checkpoint()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'resumed': self.resumed,
+            'records': self.records,
+            'bytes': self.bytes_written,
+            'checkpoints': self.checkpoints,
+            'checkpoint_seconds': round(self.checkpoint_seconds, 4),
+        }
+
+
+def remove_journal(path: Optional[str]) -> None:
+    """Delete a journal once its crawl's results have been saved."""
+    if path and os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,140 @@
+import json
+import sqlite3
+import threading
+import time
+import logging
+from typing import List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class PageRecord:
+    """Stored validators, outlinks and sitemap extension entries for one crawled URL."""
+
+    __slots__ = ('url', 'etag', 'last_modified', 'content_hash', 'lastmod', 'outlinks', 'media')
+
+    def __init__(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                 content_hash: Optional[str], lastmod: Optional[str], outlinks: List[str],
+                 media: Optional[Tuple[tuple, tuple]] = None):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.lastmod = lastmod
+        self.outlinks = outlinks
+        # (image URLs, (hreflang, URL) pairs), if the page had any when it was last parsed
+        self.media = media
+
+
+class CrawlState:
+    def __init__(self, db_path: str, commit_every: int = 200):
+        """
+        Persistent per-site crawl state backed by SQLite.
+
+        Stores each URL's ETag, Last-Modified, content hash, the date its
+        content last changed, the links extracted from it and its images and
+        hreflang alternates, so a recrawl can issue conditional GETs and reuse
+        them on 304 responses. The connection is opened on first use and
+        again after ``close()``, so lookups still work once a crawl is over.
+
+        Args:
+            db_path: Path of the SQLite database file
+            commit_every: Number of writes batched per transaction (default: 200)
+        """
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        with self._lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the open connection, opening it (and creating the table) if needed. Call with the lock held."""
+        if self._conn is not None:
+            return self._conn
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT PRIMARY KEY,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' content_hash TEXT,'
+            ' lastmod TEXT,'
+            ' outlinks TEXT,'
+            ' fetched_at REAL,'
+            ' media TEXT)'
+        )
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(pages)')}
+        if 'media' not in columns:
+            # State files written before images and alternates were recorded
+            self._conn.execute('ALTER TABLE pages ADD COLUMN media TEXT')
+        self._conn.commit()
+        return self._conn
+
+    def get(self, url: str) -> Optional[PageRecord]:
+        """Return the stored record for ``url``, or None if it was never crawled."""
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT etag, last_modified, content_hash, lastmod, outlinks, media FROM pages WHERE url = ?',
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_hash, lastmod, outlinks, media = row
+        if media:
+            images, alternates = json.loads(media)
+            media = (tuple(images), tuple(tuple(pair) for pair in alternates))
+        return PageRecord(url, etag, last_modified, content_hash, lastmod,
+                          outlinks.split('\n') if outlinks else [], media)
+
+    def get_lastmod(self, url: str) -> Optional[str]:
+        """Return the stored date of the last content change for ``url``."""
+        with self._lock:
+            row = self._connection().execute('SELECT lastmod FROM pages WHERE url = ?', (url,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            content_hash: str, lastmod: str, outlinks, media: Optional[Tuple[tuple, tuple]] = None) -> None:
+        """Insert or replace the record for ``url``."""
+        media_json = json.dumps(media, separators=(',', ':')) if media else None
+        with self._lock:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO pages'
+                ' (url, etag, last_modified, content_hash, lastmod, outlinks, fetched_at, media)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, etag, last_modified, content_hash, lastmod, '\n'.join(sorted(outlinks)), time.time(),
+                 media_json)
+            )
+            self._maybe_commit()
+
+    def touch(self, url: str) -> None:
+        """Record that ``url`` was revalidated without changes."""
+        with self._lock:
+            self._connection().execute('UPDATE pages SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self._maybe_commit()
+
+    def _maybe_commit(self) -> None:
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def commit(self) -> None:
+        """Flush pending writes to disk."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        """Flush pending writes and close the connection; it is reopened if the state is used again."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+            self._pending = 0
@@ -0,0 +1,621 @@
+"""
+Coordinator/worker crawling over a shared frontier.
+
+The frontier, the seen set and per-host politeness slots live in a
+FrontierBackend. The coordinator seeds it and assembles the sitemap; any
+number of workers, on this or other nodes, lease URLs, fetch them and
+report the links they found.
+
+Usage:
+    python distributed.py coordinator --db crawl.sqlite --root-url https://example.com --output sitemap.xml
+    python distributed.py worker --db crawl.sqlite
+"""
+import argparse
+import json
+import sqlite3
+import socket
+import threading
+import time
+import uuid
+import zlib
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, TYPE_CHECKING
+
+import events
+
+if TYPE_CHECKING:
+    from sitemap_generator import SitemapGenerator
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 0
+LEASED = 1
+DONE = 2
+
+
+def partition_of(url: str, partitions: int) -> int:
+    """Partition of a URL, by a hash of its host and first path segment."""
+    parsed = urlsplit(url)
+    section = parsed.path.lstrip('/').split('/', 1)[0]
+    return zlib.crc32(f"{parsed.netloc}/{section}".encode('utf-8')) % partitions
+
+
+class Lease:
+    """A URL handed to one worker until ``expires``; it must not be fetched before ``not_before``."""
+
+    __slots__ = ('url', 'not_before', 'expires')
+
+    def __init__(self, url: str, not_before: float, expires: float):
+        self.url = url
+        self.not_before = not_before
+        self.expires = expires
+
+
+class FrontierBackend:
+    """
+    Shared frontier, seen set and per-host politeness schedule.
+
+    Every URL is added once (the seen set), queued, leased to one worker at
+    a time and finally marked done. Leases that are not completed before
+    they expire go back to the queue. Each host has a next-fetch time that
+    leases reserve slots against, so the delay between requests to a host
+    holds across all workers on all nodes.
+    """
+
+    def configure(self, root_url: str, max_urls: int, default_interval: float,
+                  partitions: int = 64, lease_ttl: float = 60.0, seeds: Iterable[str] = (),
+                  rules: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Reset the backend for a new crawl and queue ``seeds``. Called by the coordinator.
+
+        ``rules`` is the coordinator's URL rules config, so every worker filters
+        and normalizes URLs the same way (None: url_rules.DEFAULT_RULES).
+        """
+        raise NotImplementedError
+
+    def config(self) -> Dict[str, Any]:
+        """Return the crawl settings stored by configure()."""
+        raise NotImplementedError
+
+    def add(self, urls: Iterable[str]) -> int:
+        """Queue URLs that were never seen before; return how many were new."""
+        raise NotImplementedError
+
+    def lease(self, worker_id: str, limit: int, partitions: Optional[Set[int]] = None) -> List[Lease]:
+        """Lease up to ``limit`` queued URLs, reserving a politeness slot for each."""
+        raise NotImplementedError
+
+    def complete(self, worker_id: str, url: str, links: Iterable[str], crawled: bool) -> bool:
+        """
+        Finish a leased URL and queue its links.
+
+        Returns:
+            False if the URL had already been completed (e.g. by a worker
+            whose lease expired) and the report was ignored
+        """
+        raise NotImplementedError
+
+    def release(self, worker_id: str, url: str) -> None:
+        """Give a leased URL back without fetching it."""
+        raise NotImplementedError
+
+    def set_host_interval(self, host: str, interval: float) -> None:
+        """Set the minimum seconds between requests to ``host``, e.g. from its robots.txt."""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of queued, leased, done and crawled URLs."""
+        raise NotImplementedError
+
+    def crawled_urls(self) -> List[str]:
+        raise NotImplementedError
+
+    def finished(self) -> bool:
+        """True once nothing is queued or leased, or max_urls pages are crawled and no leases are out."""
+        counts = self.counts()
+        if counts['leased']:
+            return False
+        return not counts['queued'] or counts['crawled'] >= self.config()['max_urls']
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryFrontierBackend(FrontierBackend):
+    def __init__(self):
+        """In-process backend for workers running as threads of one process, and for tests."""
+        self._lock = threading.Lock()
+        self.configure('', 0, 0.0)
+
+    def configure(self, root_url: str, max_urls: int, default_interval: float,
+                  partitions: int = 64, lease_ttl: float = 60.0, seeds: Iterable[str] = (),
+                  rules: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self._config = {'root_url': root_url, 'max_urls': max_urls, 'default_interval': default_interval,
+                            'partitions': partitions, 'lease_ttl': lease_ttl, 'rules': rules}
+            self._seen: Set[str] = set()
+            self._queue: Deque[str] = deque()
+            self._leases: Dict[str, tuple] = {}
+            self._crawled: List[str] = []
+            self._done = 0
+            self._hosts: Dict[str, List[float]] = {}
+            self._add(seeds)
+
+    def config(self) -> Dict[str, Any]:
+        return dict(self._config)
+
+    def add(self, urls: Iterable[str]) -> int:
+        with self._lock:
+            return self._add(urls)
+
+    def _add(self, urls: Iterable[str]) -> int:
+        added = 0
+        for url in urls:
+            if url not in self._seen:
+                self._seen.add(url)
+                self._queue.append(url)
+                added += 1
+        return added
+
+    def lease(self, worker_id: str, limit: int, partitions: Optional[Set[int]] = None) -> List[Lease]:
+        now = time.time()
+        ttl = self._config['lease_ttl']
+        with self._lock:
+            for url, (owner, expires) in list(self._leases.items()):
+                if expires < now:
+                    logger.info(f"Lease on {url} held by {owner} expired; requeueing")
+                    del self._leases[url]
+                    self._queue.appendleft(url)
+
+            budget = min(limit, self._config['max_urls'] - len(self._crawled) - len(self._leases))
+            leases = []
+            skipped = []
+            # Slots further out than half a TTL would expire before they are used
+            horizon = now + ttl / 2
+            # Look past the head of the queue so one slow host does not block the others
+            examined = 0
+            while self._queue and len(leases) < budget and examined < budget * 10:
+                url = self._queue.popleft()
+                examined += 1
+                if partitions is not None and partition_of(url, self._config['partitions']) not in partitions:
+                    skipped.append(url)
+                    continue
+                host = urlsplit(url).netloc
+                slot = self._hosts.setdefault(host, [self._config['default_interval'], 0.0])
+                start = max(now, slot[1])
+                if start > horizon:
+                    skipped.append(url)
+                    continue
+                slot[1] = start + slot[0]
+                self._leases[url] = (worker_id, start + ttl)
+                leases.append(Lease(url, start, start + ttl))
+            self._queue.extendleft(reversed(skipped))
+            return leases
+
+    def complete(self, worker_id: str, url: str, links: Iterable[str], crawled: bool) -> bool:
+        with self._lock:
+            lease = self._leases.pop(url, None)
+            if lease is None and url not in self._queue:
+                return False
+            if lease is None:
+                # Expired and requeued, but nobody has fetched it again yet
+                self._queue.remove(url)
+            self._done += 1
+            if crawled:
+                self._crawled.append(url)
+            self._add(links)
+            return True
+
+    def release(self, worker_id: str, url: str) -> None:
+        with self._lock:
+            if self._leases.get(url, (None,))[0] == worker_id:
+                del self._leases[url]
+                self._queue.appendleft(url)
+
+    def set_host_interval(self, host: str, interval: float) -> None:
+        with self._lock:
+            self._hosts.setdefault(host, [interval, 0.0])[0] = interval
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {'queued': len(self._queue), 'leased': len(self._leases),
+                    'done': self._done, 'crawled': len(self._crawled)}
+
+    def crawled_urls(self) -> List[str]:
+        with self._lock:
+            return sorted(self._crawled)
+
+
+class SQLiteFrontierBackend(FrontierBackend):
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        """
+        Frontier backend in a SQLite database shared by every worker process.
+
+        Each lease and completion runs in one ``BEGIN IMMEDIATE`` transaction,
+        so workers in several processes (or on several nodes sharing the
+        file) never lease the same URL twice.
+
+        Args:
+            db_path: Path of the SQLite database file
+            timeout: Seconds to wait for another process's write lock (default: 30)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS urls ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' url TEXT UNIQUE NOT NULL,'
+            ' host TEXT NOT NULL,'
+            ' partition INTEGER NOT NULL,'
+            ' state INTEGER NOT NULL DEFAULT 0,'
+            ' crawled INTEGER NOT NULL DEFAULT 0,'
+            ' lease_owner TEXT,'
+            ' lease_expires REAL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS urls_state ON urls (state, partition, id)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY, interval REAL, next_fetch REAL)'
+        )
+        self._config: Optional[Dict[str, Any]] = None
+
+    def _transaction(self):
+        backend = self
+
+        class Transaction:
+            def __enter__(self):
+                backend._lock.acquire()
+                backend._conn.execute('BEGIN IMMEDIATE')
+                return backend._conn
+
+            def __exit__(self, exc_type, exc, tb):
+                try:
+                    backend._conn.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+                finally:
+                    backend._lock.release()
+
+        return Transaction()
+
+    def configure(self, root_url: str, max_urls: int, default_interval: float,
+                  partitions: int = 64, lease_ttl: float = 60.0, seeds: Iterable[str] = (),
+                  rules: Optional[Dict[str, Any]] = None) -> None:
+        config = {'root_url': root_url, 'max_urls': max_urls, 'default_interval': default_interval,
+                  'partitions': partitions, 'lease_ttl': lease_ttl}
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM urls')
+            conn.execute('DELETE FROM hosts')
+            conn.execute('DELETE FROM meta')
+            conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)',
+                             [(key, str(value)) for key, value in config.items()]
+                             + [('rules', json.dumps(rules))])
+            self._config = dict(config, rules=rules)
+            self._add(conn, seeds)
+
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            with self._lock:
+                rows = dict(self._conn.execute('SELECT key, value FROM meta').fetchall())
+            if not rows:
+                raise RuntimeError(f"Frontier {self.db_path} has not been configured by a coordinator")
+            self._config = {
+                'root_url': rows['root_url'],
+                'max_urls': int(rows['max_urls']),
+                'default_interval': float(rows['default_interval']),
+                'partitions': int(rows['partitions']),
+                'lease_ttl': float(rows['lease_ttl']),
+                # Frontiers configured before rules were shared have none: the default rules
+                'rules': json.loads(rows.get('rules', 'null')),
+            }
+        return dict(self._config)
+
+    def _add(self, conn, urls: Iterable[str]) -> int:
+        partitions = self.config()['partitions']
+        before = conn.total_changes
+        conn.executemany(
+            'INSERT OR IGNORE INTO urls (url, host, partition) VALUES (?, ?, ?)',
+            [(url, urlsplit(url).netloc, partition_of(url, partitions)) for url in urls]
+        )
+        return conn.total_changes - before
+
+    def add(self, urls: Iterable[str]) -> int:
+        with self._transaction() as conn:
+            return self._add(conn, urls)
+
+    def lease(self, worker_id: str, limit: int, partitions: Optional[Set[int]] = None) -> List[Lease]:
+        config = self.config()
+        ttl = config['lease_ttl']
+        now = time.time()
+        horizon = now + ttl / 2
+        with self._transaction() as conn:
+            conn.execute('UPDATE urls SET state = ?, lease_owner = NULL WHERE state = ? AND lease_expires < ?',
+                         (QUEUED, LEASED, now))
+            crawled, leased = conn.execute(
+                'SELECT COALESCE(SUM(crawled), 0), COALESCE(SUM(state = ?), 0) FROM urls', (LEASED,)
+            ).fetchone()
+            budget = min(limit, config['max_urls'] - crawled - leased)
+            if budget <= 0:
+                return []
+
+            query = 'SELECT id, url, host FROM urls WHERE state = ?'
+            params: List[Any] = [QUEUED]
+            if partitions is not None:
+                query += f" AND partition IN ({','.join('?' * len(partitions))})"
+                params += sorted(partitions)
+            # Look past the head of the queue so one slow host does not block the others
+            query += ' ORDER BY id LIMIT ?'
+            params.append(budget * 10)
+
+            hosts: Dict[str, List[float]] = {}
+            leases = []
+            for row_id, url, host in conn.execute(query, params).fetchall():
+                if host not in hosts:
+                    row = conn.execute('SELECT interval, next_fetch FROM hosts WHERE host = ?', (host,)).fetchone()
+                    hosts[host] = list(row) if row else [config['default_interval'], 0.0]
+                interval, next_fetch = hosts[host]
+                start = max(now, next_fetch)
+                if start > horizon:
+                    continue
+                hosts[host][1] = start + interval
+                conn.execute('UPDATE urls SET state = ?, lease_owner = ?, lease_expires = ? WHERE id = ?',
+                             (LEASED, worker_id, start + ttl, row_id))
+                leases.append(Lease(url, start, start + ttl))
+                if len(leases) >= budget:
+                    break
+
+            conn.executemany(
+                'INSERT INTO hosts (host, interval, next_fetch) VALUES (?, ?, ?) '
+                'ON CONFLICT (host) DO UPDATE SET next_fetch = excluded.next_fetch',
+                [(host, interval, next_fetch) for host, (interval, next_fetch) in hosts.items()]
+            )
+            return leases
+
+    def complete(self, worker_id: str, url: str, links: Iterable[str], crawled: bool) -> bool:
+        with self._transaction() as conn:
+            updated = conn.execute(
+                'UPDATE urls SET state = ?, crawled = ?, lease_owner = NULL WHERE url = ? AND state != ?',
+                (DONE, int(crawled), url, DONE)
+            ).rowcount
+            if not updated:
+                return False
+            self._add(conn, links)
+            return True
+
+    def release(self, worker_id: str, url: str) -> None:
+        with self._transaction() as conn:
+            conn.execute('UPDATE urls SET state = ?, lease_owner = NULL WHERE url = ? AND lease_owner = ?',
+                         (QUEUED, url, worker_id))
+
+    def set_host_interval(self, host: str, interval: float) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO hosts (host, interval, next_fetch) VALUES (?, ?, 0) '
+                'ON CONFLICT (host) DO UPDATE SET interval = excluded.interval',
+                (host, interval)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = dict(self._conn.execute('SELECT state, COUNT(*) FROM urls GROUP BY state').fetchall())
+            crawled = self._conn.execute('SELECT COUNT(*) FROM urls WHERE crawled = 1').fetchone()[0]
+        return {'queued': rows.get(QUEUED, 0), 'leased': rows.get(LEASED, 0),
+                'done': rows.get(DONE, 0), 'crawled': crawled}
+
+    def crawled_urls(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT url FROM urls WHERE crawled = 1 ORDER BY url')]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CrawlWorker:
+    def __init__(self, generator: "SitemapGenerator", backend: FrontierBackend,
+                 worker_id: Optional[str] = None, batch_size: Optional[int] = None,
+                 partitions: Optional[Set[int]] = None, poll_interval: float = 1.0):
+        """
+        Leases URLs from the shared frontier, fetches them with the generator and reports their links.
+
+        Args:
+            generator: SitemapGenerator providing the session, robots cache and link parsing
+            backend: Shared frontier
+            worker_id: Name of this worker in leases (default: hostname plus a random suffix)
+            batch_size: URLs leased per request (default: twice the generator's max_workers)
+            partitions: Only lease URLs in these partitions (default: None, any partition)
+            poll_interval: Seconds to wait when no URL is ready (default: 1.0)
+        """
+        self.generator = generator
+        self.backend = backend
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.batch_size = batch_size or generator.max_workers * 2
+        self.partitions = partitions
+        self.poll_interval = poll_interval
+        self.pages = 0
+        self._host_intervals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def run(self) -> int:
+        """Work until the crawl is finished or the generator is cancelled; return pages processed."""
+        gen = self.generator
+        logger.info(f"Worker {self.worker_id} started")
+        with ThreadPoolExecutor(max_workers=gen.max_workers) as executor:
+            while not gen.cancelled:
+                leases = self.backend.lease(self.worker_id, self.batch_size, self.partitions)
+                if not leases:
+                    if self.backend.finished():
+                        break
+                    gen._cancel_event.wait(self.poll_interval)
+                    continue
+                list(executor.map(self._process, leases))
+        logger.info(f"Worker {self.worker_id} finished after {self.pages} pages")
+        return self.pages
+
+    def _report_interval(self, url: str) -> None:
+        """Share the host's current request interval (robots.txt, adaptive rate) with all workers."""
+        host = urlsplit(url).netloc
+        interval = self.generator.request_interval(url)
+        with self._lock:
+            if self._host_intervals.get(host) == interval:
+                return
+            self._host_intervals[host] = interval
+        self.backend.set_host_interval(host, interval)
+
+    def _process(self, lease: Lease) -> None:
+        gen = self.generator
+        wait = lease.not_before - time.time()
+        if wait > 0:
+            gen._cancel_event.wait(wait)
+        if gen.cancelled:
+            self.backend.release(self.worker_id, lease.url)
+            return
+
+        try:
+            self._report_interval(lease.url)
+            new_links = gen._process_url(lease.url)
+        except Exception as e:
+            logger.error(f"Error processing {lease.url}: {e}")
+            gen._emit(events.ERROR, url=lease.url, message=str(e))
+            self.backend.complete(self.worker_id, lease.url, [], crawled=False)
+            return
+
+        if new_links is None and gen.cancelled:
+            self.backend.release(self.worker_id, lease.url)
+            return
+        # Duplicates of another page hand on their links but stay out of the sitemap
+        crawled = new_links is not None and not gen._take_duplicate(lease.url)
+        if self.backend.complete(self.worker_id, lease.url, new_links or [], crawled):
+            with self._lock:
+                self.pages += 1
+            if crawled:
+                logger.info(f"Crawled: {lease.url} (worker {self.worker_id})")
+                gen._page_crawled(lease.url, len(new_links), 0, 0, 0)
+
+
+class CrawlCoordinator:
+    def __init__(self, generator: "SitemapGenerator", backend: FrontierBackend,
+                 partitions: int = 64, lease_ttl: float = 60.0, poll_interval: float = 1.0):
+        """
+        Seeds the shared frontier, tracks progress and collects the crawled URLs.
+
+        Args:
+            generator: SitemapGenerator whose root URL, max_urls and delay define the crawl
+            backend: Shared frontier
+            partitions: Number of host/path hash partitions (default: 64)
+            lease_ttl: Seconds before an unfinished lease is handed to another worker (default: 60)
+            poll_interval: Seconds between progress checks (default: 1.0)
+        """
+        self.generator = generator
+        self.backend = backend
+        self.partitions = partitions
+        self.lease_ttl = lease_ttl
+        self.poll_interval = poll_interval
+
+    def seed(self) -> None:
+        gen = self.generator
+        seeds = [gen.root_url] if gen.is_valid_url(gen.root_url) else []
+        # Read before configure() so no sitemap download holds the backend's lock
+        seeds.extend(gen.sitemap_seeds())
+        self.backend.configure(gen.root_url, gen.max_urls, gen.delay, partitions=self.partitions,
+                               lease_ttl=self.lease_ttl, seeds=seeds, rules=gen.rules.config)
+
+    def wait(self) -> List[str]:
+        """Block until the crawl is finished or cancelled and return the crawled URLs."""
+        gen = self.generator
+        while not self.backend.finished() and not gen.cancelled:
+            counts = self.backend.counts()
+            gen.urls_found = counts['crawled']
+            gen._emit(events.PROGRESS, urls_found=counts['crawled'], queue_depth=counts['queued'],
+                      in_flight=counts['leased'], bytes_downloaded=gen.bytes_downloaded)
+            gen._cancel_event.wait(self.poll_interval)
+        urls = self.backend.crawled_urls()
+        gen.urls_found = len(urls)
+        return urls
+
+    def run(self, local_worker: bool = True) -> List[str]:
+        """
+        Seed the frontier, optionally crawl with a worker in this process, and wait for the crawl.
+
+        Workers on other nodes can join at any time with the same backend.
+        """
+        self.seed()
+        thread = None
+        if local_worker:
+            worker = CrawlWorker(self.generator, self.backend, poll_interval=self.poll_interval)
+            thread = threading.Thread(target=worker.run, name='crawl-worker', daemon=True)
+            thread.start()
+        try:
+            return self.wait()
+        finally:
+            if thread is not None:
+                thread.join()
+
+
+def worker_generator(backend: FrontierBackend, **options) -> "SitemapGenerator":
+    """
+    Build the SitemapGenerator of a worker from the crawl settings the coordinator stored in ``backend``.
+
+    The worker gets the coordinator's root URL, URL limit, delay and URL
+    rules, so it filters and normalizes links exactly like the coordinator.
+    ``options`` are further SitemapGenerator arguments, e.g. ``max_workers``.
+    """
+    from sitemap_generator import SitemapGenerator
+
+    config = backend.config()
+    return SitemapGenerator(config['root_url'], max_urls=config['max_urls'], delay=config['default_interval'],
+                            rules=config['rules'], **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='role', required=True)
+
+    coordinator = subparsers.add_parser('coordinator', help="Seed the frontier and write the sitemap")
+    coordinator.add_argument('--db', required=True, help="SQLite frontier shared with the workers")
+    coordinator.add_argument('--root-url', required=True)
+    coordinator.add_argument('--max-urls', type=int, default=1000)
+    coordinator.add_argument('--delay', type=float, default=1.0)
+    coordinator.add_argument('--rules', default=None,
+                             help="JSON file of URL rules, shared with the workers (default: built-in rules)")
+    coordinator.add_argument('--output', default='sitemap.xml')
+    coordinator.add_argument('--compress', action='store_true')
+    coordinator.add_argument('--partitions', type=int, default=64)
+    coordinator.add_argument('--lease-ttl', type=float, default=60.0)
+    coordinator.add_argument('--no-local-worker', action='store_true',
+                             help="Only coordinate; leave all fetching to remote workers")
+
+    worker = subparsers.add_parser('worker', help="Fetch URLs leased from the frontier")
+    worker.add_argument('--db', required=True, help="SQLite frontier shared with the coordinator")
+    worker.add_argument('--max-workers', type=int, default=5)
+    worker.add_argument('--partitions', default=None,
+                        help="Comma-separated partitions to work on (default: all)")
+    args = parser.parse_args()
+
+    from sitemap_generator import SitemapGenerator
+
+    backend = SQLiteFrontierBackend(args.db)
+    if args.role == 'coordinator':
+        generator = SitemapGenerator(args.root_url, max_urls=args.max_urls, delay=args.delay, rules=args.rules)
+        urls = CrawlCoordinator(generator, backend, args.partitions, args.lease_ttl).run(
+            local_worker=not args.no_local_worker
+        )
+        if urls:
+            generator.generate_sitemap(urls, args.output, compress=args.compress)
+        else:
+            logger.warning("No URLs found. Sitemap not generated.")
+    else:
+        generator = worker_generator(backend, max_workers=args.max_workers)
+        partitions = {int(p) for p in args.partitions.split(',')} if args.partitions else None
+        CrawlWorker(generator, backend, partitions=partitions).run()
+    backend.close()
+
+
+if __name__ == '__main__':
+    main()
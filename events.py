@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+# Event types emitted by SitemapGenerator
+CRAWL_STARTED = 'crawl_started'
+PAGE_FETCHED = 'page_fetched'
+LINKS_DISCOVERED = 'links_discovered'
+PROGRESS = 'progress'
+ERROR = 'error'
+CRAWL_FINISHED = 'crawl_finished'
+
+# Event types emitted by the job layer
+JOB_STATUS = 'job_status'
+END = 'end'
+
+
+class Event:
+    """A typed progress event published on a topic."""
+
+    __slots__ = ('type', 'data', 'timestamp')
+
+    def __init__(self, type: str, data: Dict[str, Any]):
+        self.type = type
+        self.data = data
+        self.timestamp = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.data, type=self.type, timestamp=self.timestamp)
+
+
+class Subscription:
+    def __init__(self, hub: "EventHub", topic: str, buffer_size: int):
+        """
+        A subscriber's bounded event buffer.
+
+        When the subscriber falls behind, the oldest events are dropped and
+        counted in ``dropped`` instead of blocking publishers.
+        """
+        self.hub = hub
+        self.topic = topic
+        self.dropped = 0
+        self.closed = False
+        self._buffer: Deque[Event] = deque()
+        self._buffer_size = buffer_size
+        self._cond = threading.Condition()
+
+    def _put(self, event: Event) -> None:
+        with self._cond:
+            if len(self._buffer) >= self._buffer_size:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(event)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Return the next event, or None if none arrived within ``timeout``."""
+        with self._cond:
+            if not self._buffer:
+                self._cond.wait(timeout)
+            if not self._buffer:
+                return None
+            return self._buffer.popleft()
+
+    def events(self, timeout: Optional[float] = None) -> Iterator[Optional[Event]]:
+        """Yield events until the topic ends; yields None on each idle ``timeout``."""
+        while not self.closed:
+            event = self.get(timeout)
+            yield event
+            if event is not None and event.type == END:
+                break
+        self.close()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.hub.unsubscribe(self)
+
+
+class EventHub:
+    def __init__(self, buffer_size: int = 1000, history_size: int = 50):
+        """
+        In-process publish/subscribe hub for crawl progress.
+
+        Args:
+            buffer_size: Maximum events buffered per subscriber (default: 1000)
+            history_size: Recent events replayed to late subscribers (default: 50)
+        """
+        self.buffer_size = buffer_size
+        self.history_size = history_size
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._history: Dict[str, Deque[Event]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, topic: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        event = Event(event_type, data or {})
+        with self._lock:
+            history = self._history.get(topic)
+            if history is None:
+                history = self._history[topic] = deque(maxlen=self.history_size)
+            history.append(event)
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription._put(event)
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Subscribe to a topic. Recent events are replayed first."""
+        subscription = Subscription(self, topic, self.buffer_size)
+        with self._lock:
+            for event in self._history.get(topic, ()):
+                subscription._put(event)
+            self._subscribers.setdefault(topic, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.topic)
+            if subscribers and subscription in subscribers:
+                subscribers.remove(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.topic]
+
+    def close_topic(self, topic: str) -> None:
+        """Publish the END event so subscribers finish their streams."""
+        self.publish(topic, END)
+
+    def discard(self, topic: str) -> None:
+        """Forget a topic's history."""
+        with self._lock:
+            self._history.pop(topic, None)
@@ -0,0 +1,192 @@
+import threading
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobConflict(Exception):
+    """Raised when a job is submitted while another job with the same key is queued or running."""
+
+    def __init__(self, message: str, job: "Job"):
+        super().__init__(message)
+        self.job = job
+
+
+class Job:
+    def __init__(self, params: Dict[str, Any], key: Optional[str] = None):
+        """
+        A single sitemap generation job and its progress.
+
+        Args:
+            params: The request parameters the job was created with
+            key: Resource the job uses exclusively, e.g. its crawl journal (optional)
+        """
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.key = key
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.generator = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def url_count(self) -> int:
+        """Number of URLs found so far, read live from the running crawl."""
+        if self.result is not None:
+            return self.result.get('url_count', 0)
+        if self.generator is not None:
+            return self.generator.urls_found
+        return 0
+
+    def cancel(self) -> None:
+        """Ask the job to stop. A running crawl stops submitting new pages."""
+        self.cancel_event.set()
+        if self.generator is not None:
+            self.generator.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'root_url': self.params.get('root_url'),
+            'url_count': self.url_count,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, max_concurrent: int = 2, max_queued: int = 20, max_history: int = 100,
+                 status_listener: Optional[Callable[[Job], None]] = None,
+                 discard_listener: Optional[Callable[[Job], None]] = None):
+        """
+        Runs jobs on a bounded worker pool.
+
+        Args:
+            max_concurrent: Jobs that may run at the same time (default: 2)
+            max_queued: Jobs that may wait for a free worker before submissions
+                        are rejected (default: 20)
+            max_history: Finished jobs kept for status lookups (default: 100)
+            status_listener: Called with the job on every status change (optional)
+            discard_listener: Called with a finished job when it is pruned from history (optional)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self.status_listener = status_listener
+        self.discard_listener = discard_listener
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='sitemap-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, params: Dict[str, Any], target: Callable[[Job], Dict[str, Any]],
+               key: Optional[str] = None) -> Job:
+        """
+        Queue a job and return it immediately.
+
+        Args:
+            params: Request parameters stored on the job
+            target: Called with the job on a worker thread; returns the job result
+            key: Resource the job uses exclusively; no two unfinished jobs share a key (optional)
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+            JobConflict: If an unfinished job has the same key
+        """
+        job = Job(params, key)
+        with self._lock:
+            if key is not None:
+                for other in self._jobs.values():
+                    if other.key == key and other.status not in FINISHED_STATES:
+                        raise JobConflict(f"Job {other.id} for {other.params.get('root_url')} is {other.status}", other)
+            queued = sum(1 for j in self._jobs.values() if j.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"Job queue is full ({queued} jobs waiting)")
+            self._jobs[job.id] = job
+            self._prune()
+        self._notify(job)
+        self._executor.submit(self._run, job, target)
+        logger.info(f"Queued job {job.id} for {params.get('root_url')}")
+        return job
+
+    def _notify(self, job: Job) -> None:
+        if self.status_listener is not None:
+            try:
+                self.status_listener(job)
+            except Exception as e:
+                logger.error(f"Job status listener failed for {job.id}: {e}")
+
+    def _run(self, job: Job, target: Callable[[Job], Dict[str, Any]]) -> None:
+        if job.cancelled:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            self._notify(job)
+            return
+
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._notify(job)
+        try:
+            job.result = target(job)
+            job.status = CANCELLED if job.cancelled else COMPLETED
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            # Drop the generator so its session and buffers can be freed
+            job.generator = None
+            logger.info(f"Job {job.id} {job.status}")
+            self._notify(job)
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status in FINISHED_STATES]
+        excess = len(finished) - self.max_history
+        if excess > 0:
+            for job in sorted(finished, key=lambda j: j.finished_at or 0)[:excess]:
+                del self._jobs[job.id]
+                if self.discard_listener is not None:
+                    self.discard_listener(job)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED_STATES:
+            job.cancel()
+        return job
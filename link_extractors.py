@@ -0,0 +1,266 @@
+import re
+import html
+import logging
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple, Type
+
+from bs4 import BeautifulSoup
+
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractedLinks:
+    """Raw (unjoined, unnormalized) link data found in one page."""
+
+    __slots__ = ('hrefs', 'base', 'canonical', 'images', 'alternates')
+
+    def __init__(self):
+        self.hrefs: List[str] = []
+        self.base: Optional[str] = None
+        self.canonical: Optional[str] = None
+        # <img> sources, and (hreflang, href) of <link rel="alternate" hreflang>
+        self.images: List[str] = []
+        self.alternates: List[Tuple[str, str]] = []
+
+
+def decode_html(content: bytes, encoding: Optional[str]) -> str:
+    """Decode page or attribute bytes, preferring UTF-8 over the HTTP default of ISO-8859-1."""
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        try:
+            return content.decode(encoding or 'latin-1', errors='replace')
+        except LookupError:
+            return content.decode('latin-1')
+
+
+def _image_source(src: Optional[str], data_src: Optional[str]) -> Optional[str]:
+    """Pick an ``<img>``'s source, preferring a lazy-loading ``data-src`` over an inline placeholder."""
+    if src and not src.lstrip().startswith('data:'):
+        return src.strip()
+    if data_src:
+        return data_src.strip()
+    return None
+
+
+def _is_ascii_compatible(encoding: Optional[str]) -> bool:
+    return not encoding or not encoding.lower().replace('-', '').startswith(('utf16', 'utf32'))
+
+
+class LinkExtractor:
+    """
+    Base class: pull ``<a href>``, ``<base href>``, ``<link rel=canonical>``, ``<img src>``
+    and ``<link rel=alternate hreflang>`` out of a page.
+    """
+
+    name = ''
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, extensions: bool = False) -> ExtractedLinks:
+        """Extract a page's links; with ``extensions`` also its images and hreflang alternates."""
+        raise NotImplementedError
+
+
+class FastLinkExtractor(LinkExtractor):
+    """
+    Tokenizer-level extractor that scans raw bytes with one compiled regex.
+
+    Comments, ``<script>`` and ``<style>`` blocks are skipped; only ``a``,
+    ``base`` and ``link`` start tags (and ``img`` with ``extensions``) are
+    looked at. No tree is built and the page is never decoded as a whole.
+    """
+
+    name = 'fast'
+
+    _TOKEN_RE = re.compile(
+        rb'<!--.*?-->'
+        rb'|<script\b.*?</script\s*>'
+        rb'|<style\b.*?</style\s*>'
+        rb'|<(a|base|link)\s((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+        re.IGNORECASE | re.DOTALL
+    )
+    # <img> tags are cut at the first ">" rather than parsed for quoted values: much cheaper on
+    # image-heavy pages, and src comes before any alt text that could hold a ">"
+    _TOKEN_IMG_RE = re.compile(_TOKEN_RE.pattern + rb'|<(img)\s([^>]*)>', re.IGNORECASE | re.DOTALL)
+    _ATTR_RE = re.compile(
+        rb'([a-zA-Z_:][-a-zA-Z0-9_:.]*)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+))'
+    )
+    # The source attributes of an <img>, searched for without parsing its other attributes
+    _IMG_SRC_RE = re.compile(rb'(?<![-\w])src\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+))', re.IGNORECASE)
+    _IMG_DATA_SRC_RE = re.compile(rb'(?<![-\w])data-src\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+))',
+                                  re.IGNORECASE)
+
+    def __init__(self, fallback: Optional[LinkExtractor] = None):
+        self.fallback = fallback
+
+    def _attrs(self, raw: bytes) -> Dict[bytes, bytes]:
+        attrs = {}
+        for match in self._ATTR_RE.finditer(raw):
+            name = match.group(1).lower()
+            if name not in attrs:
+                value = match.group(2)
+                if value is None:
+                    value = match.group(3) if match.group(3) is not None else match.group(4)
+                attrs[name] = value
+        return attrs
+
+    @staticmethod
+    def _text(value: bytes, encoding: Optional[str]) -> str:
+        return html.unescape(decode_html(value, encoding)).strip()
+
+    def _match_text(self, match: Optional["re.Match"], encoding: Optional[str]) -> Optional[str]:
+        if match is None:
+            return None
+        value = match.group(1)
+        if value is None:
+            value = match.group(2) if match.group(2) is not None else match.group(3)
+        return self._text(value, encoding)
+
+    def _image(self, raw: bytes, encoding: Optional[str]) -> Optional[str]:
+        src = self._match_text(self._IMG_SRC_RE.search(raw), encoding)
+        if src and not src.startswith('data:'):
+            return src
+        return _image_source(src, self._match_text(self._IMG_DATA_SRC_RE.search(raw), encoding))
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, extensions: bool = False) -> ExtractedLinks:
+        if not _is_ascii_compatible(encoding):
+            content = content.decode(encoding, errors='replace').encode('utf-8')
+            encoding = 'utf-8'
+
+        try:
+            result = ExtractedLinks()
+            for match in (self._TOKEN_IMG_RE if extensions else self._TOKEN_RE).finditer(content):
+                tag = match.group(1)
+                if tag is None:
+                    if match.lastindex == 4:
+                        image = self._image(match.group(4), encoding)
+                        if image:
+                            result.images.append(image)
+                    continue
+                tag = tag.lower()
+                attrs = self._attrs(match.group(2))
+                href = attrs.get(b'href')
+                if href is None:
+                    continue
+                value = self._text(href, encoding)
+
+                if tag == b'a':
+                    result.hrefs.append(value)
+                elif tag == b'base':
+                    if result.base is None:
+                        result.base = value
+                else:
+                    rel = attrs.get(b'rel', b'').lower().split()
+                    if b'canonical' in rel:
+                        if result.canonical is None:
+                            result.canonical = value
+                    elif extensions and b'alternate' in rel and b'hreflang' in attrs:
+                        result.alternates.append((self._text(attrs[b'hreflang'], encoding), value))
+            return result
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Fast link extraction failed ({e}); falling back to {self.fallback.name}")
+            return self.fallback.extract(content, encoding, extensions)
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self, result: ExtractedLinks, extensions: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.result = result
+        self.tags = ('a', 'base', 'link', 'img') if extensions else ('a', 'base', 'link')
+        self.extensions = extensions
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in self.tags:
+            return
+        attrs = dict(attrs)
+        if tag == 'img':
+            image = _image_source(attrs.get('src'), attrs.get('data-src'))
+            if image:
+                self.result.images.append(image)
+            return
+        href = attrs.get('href')
+        if href is None:
+            return
+        href = href.strip()
+        if tag == 'a':
+            self.result.hrefs.append(href)
+        elif tag == 'base':
+            if self.result.base is None:
+                self.result.base = href
+        else:
+            rel = (attrs.get('rel') or '').lower().split()
+            if 'canonical' in rel:
+                if self.result.canonical is None:
+                    self.result.canonical = href
+            elif self.extensions and 'alternate' in rel and attrs.get('hreflang'):
+                self.result.alternates.append((attrs['hreflang'].strip(), href))
+
+    handle_startendtag = handle_starttag
+
+
+class HTMLParserLinkExtractor(LinkExtractor):
+    """Event-driven extractor on the standard library HTML tokenizer; no tree is built."""
+
+    name = 'htmlparser'
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, extensions: bool = False) -> ExtractedLinks:
+        result = ExtractedLinks()
+        parser = _LinkParser(result, extensions)
+        parser.feed(decode_html(content, encoding))
+        parser.close()
+        return result
+
+
+class BeautifulSoupLinkExtractor(LinkExtractor):
+    """Full-tree extractor using BeautifulSoup's ``html.parser``; the most forgiving option."""
+
+    name = 'bs4'
+
+    def extract(self, content: bytes, encoding: Optional[str] = None, extensions: bool = False) -> ExtractedLinks:
+        result = ExtractedLinks()
+        soup = BeautifulSoup(decode_html(content, encoding), 'html.parser')
+
+        for link in soup.find_all('a', href=True):
+            result.hrefs.append(link['href'].strip())
+
+        base = soup.find('base', href=True)
+        if base is not None:
+            result.base = base['href'].strip()
+
+        for link in soup.find_all('link', href=True):
+            rel = [value.lower() for value in (link.get('rel') or [])]
+            if 'canonical' in rel:
+                if result.canonical is None:
+                    result.canonical = link['href'].strip()
+            elif extensions and 'alternate' in rel and link.get('hreflang'):
+                result.alternates.append((link['hreflang'].strip(), link['href'].strip()))
+
+        if extensions:
+            for img in soup.find_all('img'):
+                image = _image_source(img.get('src'), img.get('data-src'))
+                if image:
+                    result.images.append(image)
+
+        return result
+
+
+EXTRACTORS: Dict[str, Type[LinkExtractor]] = {
+    FastLinkExtractor.name: FastLinkExtractor,
+    HTMLParserLinkExtractor.name: HTMLParserLinkExtractor,
+    BeautifulSoupLinkExtractor.name: BeautifulSoupLinkExtractor,
+}
+
+
+def get_link_extractor(name: str) -> LinkExtractor:
+    """
+    Return a link extractor by name: "fast", "htmlparser" or "bs4".
+
+    The fast extractor falls back to BeautifulSoup if it fails on a page.
+    """
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown link extractor: {name}")
+    if name == FastLinkExtractor.name:
+        return FastLinkExtractor(fallback=BeautifulSoupLinkExtractor())
+    return EXTRACTORS[name]()
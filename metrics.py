@@ -0,0 +1,244 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sitemap_generator import SitemapGenerator
+
+
+# Upper bounds in seconds of the phase timing buckets
+PHASE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Crawl phases timed by SitemapGenerator
+CONNECT = 'connect'
+TTFB = 'ttfb'
+DOWNLOAD = 'download'
+PARSE = 'parse'
+ROBOTS = 'robots'
+QUEUE_WAIT = 'queue_wait'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        """A named metric with one time series per combination of label values."""
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Yield (name suffix, formatted labels, value) for every series."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not self.labelnames:
+            # Expose unlabelled series from the start rather than only after their first update
+            self._values[()] = 0
+
+    def inc(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield '', _format_labels(self.labelnames, labels), value
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], float]] = None):
+        """
+        A value that goes up and down.
+
+        With ``callback`` the gauge has no stored value; it is read from the
+        callback when metrics are rendered, which costs nothing on the crawl's
+        hot path.
+        """
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def dec(self, amount: float = 1, labels: Tuple[str, ...] = ()) -> None:
+        self.inc(-amount, labels)
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        if self.callback is not None:
+            yield '', '', self.callback()
+            return
+        yield from super().samples()
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = PHASE_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: a count per bucket plus one for +Inf, then the sum
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def _get_series(self, labels: Tuple[str, ...]) -> List[float]:
+        series = self._series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+        return series
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        series = self._get_series(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series[index] += 1
+            series[-1] += value
+
+    def labels(self, *values: str) -> "BoundHistogram":
+        """Return the series for ``values``, to observe without a label lookup on hot paths."""
+        return BoundHistogram(self, self._get_series(tuple(values)))
+
+    def count(self, labels: Tuple[str, ...] = ()) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield '_bucket', _format_labels(self.labelnames, labels, le), cumulative
+            yield '_sum', _format_labels(self.labelnames, labels), series[-1]
+            yield '_count', _format_labels(self.labelnames, labels), cumulative
+
+
+class BoundHistogram:
+    __slots__ = ('_buckets', '_lock', '_series')
+
+    def __init__(self, histogram: Histogram, series: List[float]):
+        self._buckets = histogram.buckets
+        self._lock = histogram._lock
+        self._series = series
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._series[index] += 1
+            self._series[-1] += value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class CrawlMetrics:
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Counters, gauges and phase timings of every crawl that shares this object.
+
+        Pass one instance to each SitemapGenerator (``metrics=``) to aggregate
+        their crawls; generators without one skip all instrumentation.
+        Frontier size and running crawls are read from the tracked generators
+        only when metrics are rendered.
+        """
+        self.registry = registry or MetricsRegistry()
+        self._crawls: List["SitemapGenerator"] = []
+        self._crawls_lock = threading.Lock()
+        register = self.registry.register
+
+        self.phase_seconds = register(Histogram(
+            'sitemap_phase_seconds',
+            "Time spent per crawl phase: connect (DNS, TCP, TLS), ttfb, download, parse, "
+            "robots check and queue_wait for a host's rate limit slot.",
+            ('phase',)))
+        # Bound once so timing a phase skips the label lookup
+        self.phases = {phase: self.phase_seconds.labels(phase)
+                       for phase in (CONNECT, TTFB, DOWNLOAD, PARSE, ROBOTS, QUEUE_WAIT)}
+        self.pages = register(Counter('sitemap_pages_crawled_total', "Pages added to a sitemap."))
+        self.bytes = register(Counter('sitemap_downloaded_bytes_total', "Page body bytes downloaded."))
+        self.responses = register(Counter('sitemap_responses_total', "HTTP responses by status code.",
+                                          ('status',)))
+        self.skipped = register(Counter(
+            'sitemap_skipped_total',
+            "URLs not fetched, links not followed or pages left out of the sitemap: robots "
+            "(disallowed by robots.txt), filter (rejected by the URL rules), content_type "
+            "(not an HTML page), status (an HTTP error response) and duplicate (canonical URL "
+            "elsewhere or near-duplicate text).",
+            ('reason',)))
+        self.errors = register(Counter('sitemap_fetch_errors_total', "Requests that failed without a response."))
+        self.in_flight = register(Gauge('sitemap_in_flight_requests', "Requests currently being fetched."))
+        register(Gauge('sitemap_frontier_urls', "URLs queued in the frontiers of running crawls.",
+                       callback=self._frontier_size))
+        register(Gauge('sitemap_running_crawls', "Crawls in progress.",
+                       callback=lambda: len(self._crawls)))
+
+    def track(self, generator: "SitemapGenerator") -> None:
+        with self._crawls_lock:
+            self._crawls.append(generator)
+
+    def untrack(self, generator: "SitemapGenerator") -> None:
+        with self._crawls_lock:
+            if generator in self._crawls:
+                self._crawls.remove(generator)
+
+    def _frontier_size(self) -> int:
+        with self._crawls_lock:
+            stores = [crawl.url_store for crawl in self._crawls]
+        return sum(store.pending for store in stores if store is not None)
+
+    def render(self) -> str:
+        return self.registry.render()
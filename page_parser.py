@@ -0,0 +1,157 @@
+import multiprocessing
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from urllib.parse import urldefrag, urljoin
+from typing import Optional, Set, Tuple
+
+from link_extractors import LinkExtractor, decode_html, get_link_extractor
+from simhash import page_text, simhash
+from url_rules import UrlRules
+
+
+logger = logging.getLogger(__name__)
+
+# Image entries allowed per <url> by the image sitemap extension
+MAX_IMAGES_PER_PAGE = 1000
+
+class ParsedPage:
+    """Links, duplicate-detection data and sitemap extension entries of one parsed page."""
+
+    __slots__ = ('links', 'rejected', 'canonical', 'fingerprint', 'images', 'alternates')
+
+    def __init__(self, links: Set[str], rejected: int, canonical: Optional[str] = None,
+                 fingerprint: Optional[int] = None, images: Tuple[str, ...] = (),
+                 alternates: Tuple[Tuple[str, str], ...] = ()):
+        self.links = links
+        self.rejected = rejected
+        self.canonical = canonical
+        self.fingerprint = fingerprint
+        self.images = images
+        self.alternates = alternates
+
+    def __getstate__(self):
+        return self.links, self.rejected, self.canonical, self.fingerprint, self.images, self.alternates
+
+    def __setstate__(self, state):
+        self.links, self.rejected, self.canonical, self.fingerprint, self.images, self.alternates = state
+
+
+def _page_images(base_url: str, sources) -> Tuple[str, ...]:
+    """Absolute http(s) image URLs in page order, without duplicates or fragments."""
+    images = {}
+    for src in sources:
+        image = urldefrag(urljoin(base_url, src))[0]
+        if image.startswith(('http://', 'https://')):
+            images[image] = None
+            if len(images) >= MAX_IMAGES_PER_PAGE:
+                break
+    return tuple(images)
+
+
+def _page_alternates(base_url: str, alternates, rules: UrlRules) -> Tuple[Tuple[str, str], ...]:
+    """Normalized (hreflang, URL) pairs, one per language code."""
+    pairs = {}
+    for hreflang, href in alternates:
+        url = urljoin(base_url, href)
+        if hreflang and url.startswith(('http://', 'https://')):
+            pairs.setdefault(hreflang.lower(), rules.normalize(url))
+    return tuple(pairs.items())
+
+
+def parse_links(url: str, content: bytes, encoding: Optional[str],
+                extractor: LinkExtractor, rules: UrlRules, fingerprint: bool = False,
+                extensions: bool = False) -> ParsedPage:
+    """
+    Parse a page's HTML for links.
+
+    Args:
+        url: URL of the page
+        content: Raw page body
+        encoding: Encoding from the Content-Type header, if any
+        extractor: Link extractor
+        rules: URL rules that normalize and filter the links
+        fingerprint: Also compute the simhash of the page's text (default: False)
+        extensions: Also resolve the page's ``<img>`` sources and hreflang alternates
+                    (default: False)
+
+    Returns:
+        The page's valid, normalized links, the number of links the URL rules
+        rejected, its normalized ``<link rel="canonical">``, its simhash (None when
+        there is too little text to compare), and its images and hreflang alternates
+    """
+    links = set()
+    rejected = 0
+    extracted = extractor.extract(content, encoding, extensions)
+    base_url = urljoin(url, extracted.base) if extracted.base else url
+
+    for href in extracted.hrefs:
+        normalized_url = rules.normalize(urljoin(base_url, href))
+        if rules.is_allowed(normalized_url):
+            links.add(normalized_url)
+        else:
+            rejected += 1
+
+    canonical = rules.normalize(urljoin(base_url, extracted.canonical)) if extracted.canonical else None
+    page_fingerprint = simhash(page_text(decode_html(content, encoding))) if fingerprint else None
+    if not extensions:
+        return ParsedPage(links, rejected, canonical, page_fingerprint)
+    return ParsedPage(links, rejected, canonical, page_fingerprint, _page_images(base_url, extracted.images),
+                      _page_alternates(base_url, extracted.alternates, rules))
+
+
+# Set in each pool process by _init_worker
+_worker_extractor: Optional[LinkExtractor] = None
+_worker_rules: Optional[UrlRules] = None
+_worker_fingerprint = False
+_worker_extensions = False
+
+
+def _init_worker(extractor_name: str, rules: UrlRules, fingerprint: bool, extensions: bool) -> None:
+    global _worker_extractor, _worker_rules, _worker_fingerprint, _worker_extensions
+    _worker_extractor = get_link_extractor(extractor_name)
+    _worker_rules = rules
+    _worker_fingerprint = fingerprint
+    _worker_extensions = extensions
+
+
+def _parse_in_worker(url: str, content: bytes, encoding: Optional[str]) -> ParsedPage:
+    return parse_links(url, content, encoding, _worker_extractor, _worker_rules, _worker_fingerprint,
+                       _worker_extensions)
+
+
+class ParserPool:
+    def __init__(self, workers: int, extractor_name: str, rules: UrlRules, fingerprint: bool = False,
+                 extensions: bool = False):
+        """
+        Process pool that parses pages and normalizes their links off the crawler's GIL.
+
+        Each worker builds its own extractor and receives the URL rules once
+        at start-up, so a task carries only the URL, the raw body bytes and
+        the encoding, and returns only the page's ParsedPage. Workers
+        are spawned rather than forked because the crawler is multi-threaded.
+
+        Args:
+            workers: Number of parser processes
+            extractor_name: Link extractor used in the workers ("fast", "htmlparser" or "bs4")
+            rules: URL rules used to normalize and filter the extracted links
+            fingerprint: Compute the simhash of each page's text (default: False)
+            extensions: Collect each page's images and hreflang alternates (default: False)
+        """
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(extractor_name, rules, fingerprint, extensions),
+        )
+        logger.info(f"Started parser pool with {workers} processes")
+
+    def submit(self, url: str, content: bytes, encoding: Optional[str]) -> "Future[ParsedPage]":
+        return self._executor.submit(_parse_in_worker, url, content, encoding)
+
+    def parse(self, url: str, content: bytes, encoding: Optional[str]) -> ParsedPage:
+        """Parse a page in the pool, blocking the calling (I/O) thread until it is done."""
+        return self.submit(url, content, encoding).result()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
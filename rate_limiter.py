@@ -0,0 +1,247 @@
+import threading
+import time
+import logging
+from collections import deque
+from urllib.parse import urlparse
+from typing import Any, Deque, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, interval: float, burst: int = 1):
+        """
+        Token bucket that hands out one token every ``interval`` seconds.
+
+        Args:
+            interval: Seconds between tokens; 0 disables limiting
+            burst: Maximum number of tokens that can accumulate (default: 1)
+        """
+        self.interval = interval
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_interval(self, interval: float) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self.interval = interval
+
+    def _refill(self, now: float) -> None:
+        if self.interval > 0:
+            elapsed = now - self.last_refill
+            self.tokens = min(self.burst, self.tokens + elapsed / self.interval)
+        else:
+            self.tokens = float(self.burst)
+        self.last_refill = now
+
+    def reserve(self) -> float:
+        """
+        Take a token and return how long the caller must wait before using it.
+
+        Tokens may go negative so waiting callers are served in order
+        without busy polling.
+        """
+        with self._lock:
+            if self.interval <= 0:
+                return 0.0
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens * self.interval
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the time spent waiting."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    def __init__(self, default_interval: float, burst: int = 1):
+        """
+        Per-host politeness enforced with one token bucket per scheme+netloc.
+
+        Args:
+            default_interval: Seconds between requests to the same host
+            burst: Requests allowed back to back before throttling (default: 1)
+        """
+        self.default_interval = default_interval
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+    def bucket(self, url: str, interval: Optional[float] = None) -> TokenBucket:
+        """Return the bucket for the URL's host, updating its interval if given."""
+        key = self._host_key(url)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.default_interval if interval is None else interval, self.burst)
+                self._buckets[key] = bucket
+                return bucket
+        if interval is not None and interval != bucket.interval:
+            bucket.set_interval(interval)
+        return bucket
+
+    def acquire(self, url: str, interval: Optional[float] = None) -> float:
+        """Block until a request to the URL's host is allowed. Returns the time spent waiting."""
+        return self.bucket(url, interval).acquire()
+
+
+# Responses asking us to slow down. A status of None is a connection error or timeout.
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+class HostRate:
+    def __init__(self, interval: float):
+        """Adaptive rate state and response history of one host."""
+        self.interval = interval
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.error_rate = 0.0
+        self.responses = 0
+        self.since_change = 0
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.reasons: Dict[str, int] = {}
+        self.changes: Deque[Dict[str, Any]] = deque(maxlen=10)
+
+
+class AdaptiveRateController:
+    def __init__(self, initial_interval: float, min_interval: float, max_interval: float = 60.0,
+                 increase: float = 1.0, window: int = 10, latency_factor: float = 2.0,
+                 smoothing: float = 0.2):
+        """
+        AIMD controller of the delay between requests to each host.
+
+        Every response is reported with its status and latency. A 429/503
+        response, a connection failure, or a smoothed latency above
+        ``latency_factor`` times the host's baseline doubles the host's
+        interval (multiplicative decrease of the rate). After ``window``
+        healthy responses in a row the rate grows by ``increase`` requests
+        per second (additive increase), never beyond the ceiling set by
+        ``min_interval``.
+
+        Args:
+            initial_interval: Starting seconds between requests to a host; raised to
+                              ``min_interval`` if shorter
+            min_interval: Shortest interval, i.e. the rate ceiling (0: no ceiling)
+            max_interval: Longest interval backoff can reach (default: 60)
+            increase: Requests per second added per healthy window (default: 1.0)
+            window: Responses between two rate changes (default: 10)
+            latency_factor: Latency over baseline that counts as overload (default: 2.0)
+            smoothing: Weight of the newest sample in the latency and error averages (default: 0.2)
+        """
+        # The ceiling holds from the first request, not only once the rate has grown to it
+        self.initial_interval = max(initial_interval, min_interval)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.increase = increase
+        self.window = window
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self._hosts: Dict[str, HostRate] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, key: str) -> HostRate:
+        state = self._hosts.get(key)
+        if state is None:
+            state = self._hosts[key] = HostRate(self.initial_interval)
+        return state
+
+    def interval(self, url: str, floor: Optional[float] = None) -> float:
+        """Current interval for the URL's host, never below ``floor`` (e.g. its robots.txt Crawl-delay)."""
+        with self._lock:
+            interval = self._state(HostRateLimiter._host_key(url)).interval
+        return max(interval, floor or 0.0)
+
+    def observe(self, url: str, status: Optional[int], latency: Optional[float] = None) -> None:
+        """Report a response from the URL's host, or a failed request with status None."""
+        key = HostRateLimiter._host_key(url)
+        with self._lock:
+            state = self._state(key)
+            state.responses += 1
+            state.since_change += 1
+            failed = status is None or status >= 500
+            state.error_rate += self.smoothing * (failed - state.error_rate)
+
+            if status is None or status in OVERLOAD_STATUSES:
+                self._decrease(key, state, 'timeout' if status is None else str(status))
+                return
+            if latency is not None and not failed:
+                if state.latency is None:
+                    state.latency = latency
+                else:
+                    state.latency += self.smoothing * (latency - state.latency)
+                if state.baseline is None or state.latency < state.baseline:
+                    state.baseline = state.latency
+                else:
+                    # Let the baseline follow a server that has become slower for good
+                    state.baseline += 0.01 * (state.latency - state.baseline)
+
+            if state.since_change < self.window:
+                return
+            if (state.latency is not None and state.latency > state.baseline * self.latency_factor
+                    and state.latency - state.baseline > 0.05):
+                self._decrease(key, state, 'latency')
+            elif not failed:
+                self._increase(key, state)
+
+    def _change(self, key: str, state: HostRate, interval: float, reason: str) -> None:
+        if interval == state.interval:
+            return
+        logger.info(f"Rate for {key}: interval {state.interval:.3f}s -> {interval:.3f}s ({reason})")
+        state.changes.append({'time': round(time.time(), 3), 'from': round(state.interval, 4),
+                              'to': round(interval, 4), 'reason': reason})
+        state.reasons[reason] = state.reasons.get(reason, 0) + 1
+        state.interval = interval
+        state.since_change = 0
+
+    def _decrease(self, key: str, state: HostRate, reason: str) -> None:
+        now = time.monotonic()
+        # Requests that were already in flight report the same overload; react once per round trip
+        if now - state.last_decrease < state.interval + (state.latency or 0.1):
+            return
+        state.last_decrease = now
+        state.decreases += 1
+        self._change(key, state, min(self.max_interval, max(state.interval * 2, 0.1)), reason)
+
+    def _increase(self, key: str, state: HostRate) -> None:
+        if state.interval <= self.min_interval:
+            return
+        interval = 1 / (1 / state.interval + self.increase)
+        if self.min_interval == 0 and interval < 0.01:
+            interval = 0.0
+        state.increases += 1
+        self._change(key, state, max(self.min_interval, interval), 'healthy')
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Current rate, latency, error rate and recent rate changes per host."""
+        with self._lock:
+            return {
+                key: {
+                    'interval': round(state.interval, 4),
+                    'rate': round(1 / state.interval, 2) if state.interval else None,
+                    'latency_ms': round(state.latency * 1000, 1) if state.latency is not None else None,
+                    'baseline_ms': round(state.baseline * 1000, 1) if state.baseline is not None else None,
+                    'error_rate': round(state.error_rate, 3),
+                    'responses': state.responses,
+                    'increases': state.increases,
+                    'decreases': state.decreases,
+                    'reasons': dict(state.reasons),
+                    'recent_changes': list(state.changes),
+                }
+                for key, state in self._hosts.items()
+            }
@@ -0,0 +1,176 @@
+import threading
+import time
+import logging
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from typing import Dict, Optional
+
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds before a robots.txt that could not be fetched (5xx or network error) is tried again
+UNREACHABLE_TTL = 60.0
+
+
+class _RobotsEntry:
+    """A parsed robots.txt together with the time it was fetched."""
+
+    __slots__ = ('parser', 'fetched_at', 'ttl')
+
+    def __init__(self, parser: RobotFileParser, fetched_at: float, ttl: Optional[float] = None):
+        self.parser = parser
+        self.fetched_at = fetched_at
+        # Overrides the cache's TTL, e.g. for an unreachable robots.txt
+        self.ttl = ttl
+
+
+class RobotsCache:
+    def __init__(self, session: requests.Session, user_agent: str,
+                 ttl: Optional[float] = None, timeout: float = 10):
+        """
+        Thread-safe per-host robots.txt cache.
+
+        Each robots.txt is fetched once per scheme+netloc and shared by all
+        workers. When several threads ask for the same host at once only one
+        of them fetches; the others wait for its result. A robots.txt that
+        answers with a server error or cannot be reached disallows the whole
+        host (RFC 9309, section 2.3.1.4) and is fetched again after
+        ``UNREACHABLE_TTL`` seconds.
+
+        Args:
+            session: Session used to download robots.txt files
+            user_agent: Default user agent for rule lookups
+            ttl: Seconds before a cached robots.txt is refetched
+                 (default: None, keep for the lifetime of the cache)
+            timeout: Request timeout in seconds (default: 10)
+        """
+        self.session = session
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, _RobotsEntry] = {}
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+    def _is_fresh(self, entry: Optional[_RobotsEntry]) -> bool:
+        if entry is None:
+            return False
+        ttl = entry.ttl if entry.ttl is not None else self.ttl
+        if ttl is None:
+            return True
+        return time.monotonic() - entry.fetched_at < ttl
+
+    def _fetch(self, key: str) -> _RobotsEntry:
+        """Download and parse robots.txt for a host, mirroring RobotFileParser.read()."""
+        robots_url = f"{key}/robots.txt"
+        rp = RobotFileParser()
+        rp.set_url(robots_url)
+        ttl = None
+        try:
+            response = self.session.get(robots_url, timeout=self.timeout)
+            if response.status_code in (401, 403):
+                rp.disallow_all = True
+            elif 400 <= response.status_code < 500:
+                rp.allow_all = True
+            elif response.status_code >= 500:
+                logger.warning(f"Could not fetch robots.txt at {robots_url}: HTTP {response.status_code}; "
+                               f"disallowing the host for {UNREACHABLE_TTL:.0f}s")
+                rp.disallow_all = True
+                ttl = UNREACHABLE_TTL
+            else:
+                rp.parse(response.text.splitlines())
+        except requests.RequestException as e:
+            logger.warning(f"Could not fetch robots.txt at {robots_url}: {e}; "
+                           f"disallowing the host for {UNREACHABLE_TTL:.0f}s")
+            rp.disallow_all = True
+            ttl = UNREACHABLE_TTL
+        rp.modified()
+        return _RobotsEntry(rp, time.monotonic(), ttl)
+
+    def peek(self, url: str) -> Optional[RobotFileParser]:
+        """Return the cached robots.txt for the host of ``url`` without fetching, or None."""
+        key = self._cache_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if self._is_fresh(entry):
+                self.hits += 1
+                return entry.parser
+        return None
+
+    def get(self, url: str) -> RobotFileParser:
+        """Return the parsed robots.txt for the host of ``url``."""
+        key = self._cache_key(url)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if self._is_fresh(entry):
+                self.hits += 1
+                return entry.parser
+            host_lock = self._host_locks.setdefault(key, threading.Lock())
+
+        # Only one thread per host fetches; the rest block here and then
+        # pick up the fresh entry.
+        with host_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if self._is_fresh(entry):
+                    self.hits += 1
+                    return entry.parser
+                self.misses += 1
+
+            entry = self._fetch(key)
+
+            with self._lock:
+                self._entries[key] = entry
+            return entry.parser
+
+    def can_fetch(self, url: str, user_agent: Optional[str] = None) -> bool:
+        """Check whether ``url`` may be crawled."""
+        return self.get(url).can_fetch(user_agent or self.user_agent, url)
+
+    def crawl_delay(self, url: str, user_agent: Optional[str] = None) -> Optional[float]:
+        """
+        Return the minimum delay between requests requested by the host.
+
+        Combines ``Crawl-delay`` and ``Request-rate``, whichever is stricter.
+        Returns None when robots.txt specifies neither.
+        """
+        rp = self.get(url)
+        user_agent = user_agent or self.user_agent
+        delays = []
+
+        crawl_delay = rp.crawl_delay(user_agent)
+        if crawl_delay is not None:
+            delays.append(float(crawl_delay))
+
+        request_rate = rp.request_rate(user_agent)
+        if request_rate is not None and request_rate.requests:
+            delays.append(request_rate.seconds / request_rate.requests)
+
+        return max(delays) if delays else None
+
+    def clear(self) -> None:
+        """Drop all cached entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._host_locks.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return cache hit/miss counters."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hosts': len(self._entries),
+            }
@@ -0,0 +1,96 @@
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional
+
+
+FINGERPRINT_BITS = 64
+
+# Fewer words than this is too little text to tell pages apart (empty or script-rendered pages)
+MIN_WORDS = 20
+
+# Markup whose text is not page content
+_NON_TEXT_RE = re.compile(r'<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>|<[^>]*>',
+                          re.IGNORECASE | re.DOTALL)
+_WORD_RE = re.compile(r'\w+')
+
+# For each bit of a byte, a table mapping every byte value to that bit (0 or 1)
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+
+def page_text(html: str) -> str:
+    """Strip comments, scripts, styles and tags from an HTML page."""
+    return _NON_TEXT_RE.sub(' ', html)
+
+
+def simhash(text: str, shingle_size: int = 3, min_words: int = MIN_WORDS) -> Optional[int]:
+    """
+    64-bit simhash of a text's word shingles.
+
+    Texts that share most of their shingles get fingerprints that differ in
+    only a few bits, so near-duplicate pages (same content, different
+    navigation or timestamps) are found by Hamming distance.
+
+    Returns:
+        The fingerprint, or None if the text has fewer than ``min_words`` words
+        (or fewer than ``shingle_size``)
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < max(min_words, shingle_size):
+        return None
+    shingles = {' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+
+    hashes = b''.join(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles)
+    count = len(shingles)
+    fingerprint = 0
+    # Bitwise majority vote over all shingle hashes, one byte column and bit at a time
+    for byte in range(FINGERPRINT_BITS // 8):
+        column = hashes[byte::8]
+        for bit in range(8):
+            if column.translate(_BIT_TABLES[bit]).count(1) * 2 > count:
+                fingerprint |= 1 << (byte * 8 + bit)
+    return fingerprint
+
+
+class SimhashIndex:
+    def __init__(self, max_distance: int = 3):
+        """
+        Thread-safe set of simhash fingerprints that finds near-duplicates without scanning them all.
+
+        Fingerprints are indexed by ``max_distance + 1`` bands of bits. Two
+        fingerprints within ``max_distance`` bits of each other agree on at
+        least one whole band, so only fingerprints sharing a band are compared.
+
+        Args:
+            max_distance: Largest Hamming distance counted as a near-duplicate (default: 3)
+        """
+        if not 0 <= max_distance < 16:
+            raise ValueError(f"max_distance must be between 0 and 15: {max_distance}")
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._band_bits = -(-FINGERPRINT_BITS // self.bands)
+        self._mask = (1 << self._band_bits) - 1
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+        self.size = 0
+
+    def _keys(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> (band * self._band_bits)) & self._mask for band in range(self.bands)]
+
+    def add(self, fingerprint: int) -> Optional[int]:
+        """
+        Add a fingerprint unless a near-duplicate is indexed already.
+
+        Returns:
+            The indexed near-duplicate, or None if ``fingerprint`` was added
+        """
+        keys = self._keys(fingerprint)
+        with self._lock:
+            for table, key in zip(self._tables, keys):
+                for other in table.get(key, ()):
+                    if (fingerprint ^ other).bit_count() <= self.max_distance:
+                        return other
+            for table, key in zip(self._tables, keys):
+                table.setdefault(key, []).append(fingerprint)
+            self.size += 1
+        return None
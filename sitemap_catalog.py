@@ -0,0 +1,201 @@
+import os
+import re
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sitemap_reader import count_urls
+
+
+logger = logging.getLogger(__name__)
+
+# <domain>_<YYYYmmdd_HHMMSS>.xml[.gz] as written by app.py, and -<n> for the parts of a split sitemap
+SITEMAP_NAME_RE = re.compile(r'(.+)_(\d{8}_\d{6})\.xml(\.gz)?$')
+PART_NAME_RE = re.compile(r'.+_\d{8}_\d{6}-\d+\.xml(\.gz)?$')
+
+SORT_COLUMNS = {
+    'timestamp': 'timestamp',
+    'domain': 'domain',
+    'urls': 'url_count',
+    'size': 'bytes',
+    'filename': 'filename',
+}
+
+COLUMNS = ('filename', 'domain', 'timestamp', 'url_count', 'bytes', 'compressed', 'parts')
+
+
+class SitemapCatalog:
+    def __init__(self, directory: str, db_path: str):
+        """
+        Persistent catalogue of the sitemaps in a directory, for paginated listings.
+
+        Sitemaps written by the app are recorded as they are created. The
+        directory itself is only listed again when its mtime changes, i.e.
+        when files were added or removed behind the catalogue's back; a
+        listing otherwise costs one ``stat`` plus an indexed query. Part files
+        of a split sitemap are counted with their index, not listed.
+
+        Args:
+            directory: Directory holding the sitemap files
+            db_path: Path of the SQLite catalogue file
+        """
+        self.directory = directory
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sitemaps ('
+            ' filename TEXT PRIMARY KEY,'
+            ' domain TEXT NOT NULL,'
+            ' timestamp TEXT NOT NULL,'
+            ' url_count INTEGER,'
+            ' bytes INTEGER NOT NULL,'
+            ' compressed INTEGER NOT NULL,'
+            ' parts INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS sitemaps_timestamp ON sitemaps (timestamp)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS sitemaps_domain ON sitemaps (domain, timestamp)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self._conn.commit()
+
+    def _directory_mtime(self) -> int:
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _stored_mtime(self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'directory_mtime'").fetchone()
+        return int(row[0]) if row else None
+
+    def _store_mtime(self, mtime: int) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('directory_mtime', ?)", (str(mtime),))
+
+    @staticmethod
+    def _describe(filename: str) -> Tuple[str, str]:
+        """Return (domain, timestamp) from a sitemap file name; unknown names list under their own name."""
+        match = SITEMAP_NAME_RE.match(filename)
+        if match is None:
+            return filename, ''
+        return match.group(1).replace('_', '.'), match.group(2)
+
+    def record(self, filename: str, domain: str, timestamp: str, url_count: int, parts: int = 1) -> None:
+        """Add or replace a sitemap the app has just written to the directory."""
+        path = os.path.join(self.directory, filename)
+        stat = os.stat(path)
+        total_bytes = stat.st_size
+        if parts > 1:
+            stem = filename[:-len('.xml.gz')] if filename.endswith('.xml.gz') else filename[:-len('.xml')]
+            suffix = filename[len(stem):]
+            for number in range(1, parts + 1):
+                part = os.path.join(self.directory, f"{stem}-{number}{suffix}")
+                if os.path.isfile(part):
+                    total_bytes += os.path.getsize(part)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sitemaps'
+                ' (filename, domain, timestamp, url_count, bytes, compressed, parts, mtime_ns)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (filename, domain, timestamp, url_count, total_bytes, int(filename.endswith('.gz')),
+                 parts, stat.st_mtime_ns)
+            )
+            # The new files are what changed the directory's mtime
+            self._store_mtime(self._directory_mtime())
+            self._conn.commit()
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        Bring the catalogue in line with the directory if it changed since the last sync.
+
+        Returns:
+            True if the directory was listed
+        """
+        with self._lock:
+            mtime = self._directory_mtime()
+            if not force and mtime == self._stored_mtime():
+                return False
+
+            known = dict(self._conn.execute('SELECT filename, mtime_ns FROM sitemaps').fetchall())
+            present = set()
+            added = 0
+            try:
+                entries = list(os.scandir(self.directory))
+            except FileNotFoundError:
+                entries = []
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(('.xml', '.xml.gz')) or PART_NAME_RE.match(name) or not entry.is_file():
+                    continue
+                present.add(name)
+                stat = entry.stat()
+                if known.get(name) == stat.st_mtime_ns:
+                    continue
+                domain, timestamp = self._describe(name)
+                try:
+                    url_count, parts = count_urls(entry.path)
+                except Exception as e:
+                    logger.warning(f"Could not count URLs in {entry.path}: {e}")
+                    url_count, parts = None, 1
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO sitemaps'
+                    ' (filename, domain, timestamp, url_count, bytes, compressed, parts, mtime_ns)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (name, domain, timestamp, url_count, stat.st_size, int(name.endswith('.gz')),
+                     parts, stat.st_mtime_ns)
+                )
+                added += 1
+
+            removed = [(name,) for name in known if name not in present]
+            self._conn.executemany('DELETE FROM sitemaps WHERE filename = ?', removed)
+            self._store_mtime(mtime)
+            self._conn.commit()
+        logger.info(f"Sitemap catalogue synced with {self.directory}: {added} added or changed, {len(removed)} removed")
+        return True
+
+    def list(self, domain: Optional[str] = None, sort: str = 'timestamp', descending: bool = True,
+             page: int = 1, per_page: int = 50) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Return one page of sitemaps and the number of sitemaps matching the filter.
+
+        Args:
+            domain: Only sitemaps of this domain (default: None, all)
+            sort: "timestamp", "domain", "urls", "size" or "filename" (default: "timestamp")
+            descending: Sort in descending order (default: True)
+            page: 1-based page number (default: 1)
+            per_page: Sitemaps per page (default: 50)
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        self.sync()
+        where, params = ('WHERE domain = ?', [domain]) if domain else ('', [])
+        direction = 'DESC' if descending else 'ASC'
+        # filename breaks ties so pages never overlap
+        query = (f"SELECT {', '.join(COLUMNS)} FROM sitemaps {where}"
+                 f" ORDER BY {SORT_COLUMNS[sort]} {direction}, filename {direction} LIMIT ? OFFSET ?")
+        with self._lock:
+            total = self._conn.execute(f'SELECT COUNT(*) FROM sitemaps {where}', params).fetchone()[0]
+            rows = self._conn.execute(query, params + [per_page, (max(page, 1) - 1) * per_page]).fetchall()
+        return [dict(zip(COLUMNS, row), compressed=bool(row[5])) for row in rows], total
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Return the catalogue entry of one sitemap, or None if it is not listed."""
+        self.sync()
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM sitemaps WHERE filename = ?",
+                                     (filename,)).fetchone()
+        return dict(zip(COLUMNS, row), compressed=bool(row[5])) if row else None
+
+    def domains(self) -> List[Tuple[str, int]]:
+        """Return (domain, number of sitemaps) for every domain, by name."""
+        self.sync()
+        with self._lock:
+            return self._conn.execute(
+                'SELECT domain, COUNT(*) FROM sitemaps GROUP BY domain ORDER BY domain'
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,166 @@
+import heapq
+import os
+import logging
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sitemap_reader import iter_entries
+
+
+logger = logging.getLogger(__name__)
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+# Memory for URLs held before a sorted run is written to disk
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Rough bytes per held entry besides its strings: the tuple and three str headers
+_ENTRY_OVERHEAD = 200
+
+# (url, priority, changefreq)
+Entry = Tuple[str, str, str]
+
+
+def _escape_field(value: str) -> str:
+    # Tabs and newlines cannot appear in a valid URL; keep them from breaking the run files' lines
+    if '\t' in value or '\n' in value or '\r' in value:
+        return value.replace('\t', '%09').replace('\n', '%0A').replace('\r', '%0D')
+    return value
+
+
+class SortedEntries:
+    def __init__(self, entries: Iterable[Entry], memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 temp_dir: Optional[str] = None):
+        """
+        Sort sitemap entries by URL in bounded memory.
+
+        Entries are collected until they use about ``memory_budget`` bytes,
+        then sorted and written to a temporary run file. Iterating merges the
+        runs, so only one line per run is held at a time. Inputs that fit in
+        the budget never touch the disk. A URL listed twice is yielded once.
+
+        Args:
+            entries: (url, priority, changefreq) tuples in any order
+            memory_budget: Approximate bytes of entries held before spilling a run (default: 64 MB)
+            temp_dir: Directory for run files (default: the system temporary directory)
+        """
+        self.entries = entries
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.runs = 0
+
+    def _write_run(self, directory: str, batch: List[Entry]) -> str:
+        batch.sort()
+        path = os.path.join(directory, f"run-{self.runs}.tsv")
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.writelines(f"{_escape_field(url)}\t{priority}\t{changefreq}\n" for url, priority, changefreq in batch)
+        self.runs += 1
+        return path
+
+    @staticmethod
+    def _read_run(path: str) -> Iterator[Entry]:
+        with open(path, 'r', encoding='utf-8', newline='\n') as f:
+            for line in f:
+                url, priority, changefreq = line[:-1].split('\t')
+                yield url, priority, changefreq
+
+    def __iter__(self) -> Iterator[Entry]:
+        with tempfile.TemporaryDirectory(prefix='sitemap-diff-', dir=self.temp_dir) as directory:
+            runs = []
+            batch: List[Entry] = []
+            held = 0
+            for entry in self.entries:
+                batch.append(entry)
+                held += len(entry[0]) + len(entry[1]) + len(entry[2]) + _ENTRY_OVERHEAD
+                if held >= self.memory_budget:
+                    runs.append(self._write_run(directory, batch))
+                    batch = []
+                    held = 0
+
+            batch.sort()
+            if runs:
+                logger.info(f"Merging {len(runs) + 1} sorted runs of sitemap entries")
+                merged = heapq.merge(*(self._read_run(path) for path in runs), batch)
+            else:
+                merged = iter(batch)
+
+            previous = None
+            for entry in merged:
+                if entry[0] != previous:
+                    previous = entry[0]
+                    yield entry
+
+
+def sitemap_entries(path: str) -> Iterator[Entry]:
+    """Yield (url, priority, changefreq) for each URL of a sitemap or sitemap index file."""
+    for entry in iter_entries(path):
+        url = entry.get('loc')
+        if url:
+            yield url, entry.get('priority', ''), entry.get('changefreq', '')
+
+
+class SitemapDiff:
+    def __init__(self, old_file: str, new_file: str, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 temp_dir: Optional[str] = None):
+        """
+        URLs added, removed or reprioritized between two sitemaps of a site.
+
+        Both sitemaps (plain, gzipped or sitemap indexes with their parts next
+        to them) are stream-parsed, sorted by URL with ``SortedEntries`` and
+        merge-compared, so memory stays within about ``memory_budget`` per
+        sitemap whatever their size.
+
+        Args:
+            old_file: Path of the earlier sitemap
+            new_file: Path of the later sitemap
+            memory_budget: Approximate bytes of URLs held in memory per sitemap before
+                           sorting spills to disk (default: 64 MB)
+            temp_dir: Directory for sort runs (default: the system temporary directory)
+        """
+        self.old_file = old_file
+        self.new_file = new_file
+        self.memory_budget = memory_budget
+        self.temp_dir = temp_dir
+        self.counts = {ADDED: 0, REMOVED: 0, CHANGED: 0, 'unchanged': 0}
+
+    def changes(self) -> Iterator[Dict[str, str]]:
+        """
+        Yield one dict per difference, in URL order.
+
+        Yields:
+            {"change": "added", "url", "priority"}, {"change": "removed", "url", "priority"}
+            or {"change": "changed", "url", "old_priority", "new_priority"}
+        """
+        old = iter(SortedEntries(sitemap_entries(self.old_file), self.memory_budget, self.temp_dir))
+        new = iter(SortedEntries(sitemap_entries(self.new_file), self.memory_budget, self.temp_dir))
+        old_entry = next(old, None)
+        new_entry = next(new, None)
+        while old_entry is not None or new_entry is not None:
+            if new_entry is None or (old_entry is not None and old_entry[0] < new_entry[0]):
+                self.counts[REMOVED] += 1
+                yield {'change': REMOVED, 'url': old_entry[0], 'priority': old_entry[1]}
+                old_entry = next(old, None)
+            elif old_entry is None or new_entry[0] < old_entry[0]:
+                self.counts[ADDED] += 1
+                yield {'change': ADDED, 'url': new_entry[0], 'priority': new_entry[1]}
+                new_entry = next(new, None)
+            else:
+                if old_entry[1] != new_entry[1]:
+                    self.counts[CHANGED] += 1
+                    yield {'change': CHANGED, 'url': new_entry[0],
+                           'old_priority': old_entry[1], 'new_priority': new_entry[1]}
+                else:
+                    self.counts['unchanged'] += 1
+                old_entry = next(old, None)
+                new_entry = next(new, None)
+        logger.info(f"Compared {self.old_file} with {self.new_file}: {self.counts}")
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+def diff_sitemaps(old_file: str, new_file: str, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Iterator[Dict[str, str]]:
+    """Yield the URLs added, removed or reprioritized from ``old_file`` to ``new_file``; see SitemapDiff."""
+    return SitemapDiff(old_file, new_file, memory_budget).changes()
@@ -1,18 +1,36 @@
+import argparse
+import json
+import queue
 import requests
-from bs4 import BeautifulSoup
-from urllib.robotparser import RobotFileParser
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 from datetime import datetime
-from xml.etree.ElementTree import Element, SubElement, tostring
-from xml.dom import minidom
+from email.utils import parsedate_to_datetime
+import hashlib
 import os
+import sys
 import time
-import re
 import gzip
-from typing import List, Set, Optional, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from typing import Any, Callable, Iterator, List, Sequence, Set, Optional, Dict, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import logging
 
+import events
+import metrics as crawl_metrics
+from crawl_journal import CrawlJournal, remove_journal
+from crawl_state import CrawlState
+from link_extractors import get_link_extractor
+from metrics import CrawlMetrics
+from page_parser import ParsedPage, ParserPool, parse_links
+from robots_cache import RobotsCache
+from sitemap_seeds import SitemapSeeder
+from rate_limiter import AdaptiveRateController, HostRateLimiter
+from simhash import SimhashIndex
+from sitemap_writer import SitemapWriter
+from transport import RetryPolicy, TransportStats, create_session, record_session_connections
+from url_rules import UrlRules
+from url_store import DEFAULT_MEMORY_BUDGET, UrlStore
+
 
 # Configure logging
 logging.basicConfig(
@@ -25,9 +43,63 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Content types whose bodies are downloaded and parsed for links
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Put on the record queue of iter_crawl when the crawl thread is done
+_END_OF_CRAWL = object()
+
+
+class CrawlRecord:
+    """One page crawled into the sitemap, as yielded by SitemapGenerator.iter_crawl."""
+    
+    __slots__ = ('url', 'status', 'depth', 'bytes', 'links', 'fetch_seconds', 'parse_seconds')
+    
+    def __init__(self, url: str, status: Optional[int], depth: Optional[int], size: int, links: int,
+                 fetch_seconds: Optional[float], parse_seconds: Optional[float]):
+        self.url = url
+        # None when the page was not fetched: disallowed by robots.txt, or crawled
+        # before the crawl was resumed
+        self.status = status
+        # Link hops from the root URL or the sitemap seed the page was found through,
+        # None for pages crawled before a resume
+        self.depth = depth
+        self.bytes = size
+        self.links = links
+        self.fetch_seconds = fetch_seconds
+        # None when the page was not parsed (not modified since the last crawl, or no body)
+        self.parse_seconds = parse_seconds
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'status': self.status,
+            'depth': self.depth,
+            'bytes': self.bytes,
+            'links': self.links,
+            'fetch_seconds': None if self.fetch_seconds is None else round(self.fetch_seconds, 4),
+            'parse_seconds': None if self.parse_seconds is None else round(self.parse_seconds, 4),
+        }
+
+
 class SitemapGenerator:
     def __init__(self, root_url: str, max_urls: int = 1000, delay: float = 1.0, 
-                 user_agent: str = "CustomCrawler/1.0", max_workers: int = 5):
+                 user_agent: str = "CustomCrawler/1.0", max_workers: int = 5,
+                 robots_ttl: Optional[float] = None, scheduler: str = "queue",
+                 engine: str = "threads", max_connections_per_host: Optional[int] = None,
+                 state_db: Optional[str] = None,
+                 event_sink: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 link_extractor: str = "fast", max_page_bytes: int = 5 * 1024 * 1024,
+                 rules: Union[UrlRules, str, Dict[str, Any], None] = None,
+                 seen_filter: str = "exact", seen_error_rate: float = 1e-4,
+                 frontier_memory: int = DEFAULT_MEMORY_BUDGET, spill_dir: Optional[str] = None,
+                 checkpoint_file: Optional[str] = None, checkpoint_interval: float = 5.0,
+                 resume: bool = False, parse_workers: int = 0,
+                 frontier_backend: Any = None, max_retries: int = 3, retry_backoff: float = 0.5,
+                 adaptive_rate: bool = True, max_rate: Optional[float] = None,
+                 metrics: Optional[CrawlMetrics] = None, seed_sitemaps: bool = True,
+                 seed_files: Sequence[str] = (), canonical: bool = True,
+                 dedupe_content: bool = False, dedupe_distance: int = 3, extensions: bool = False):
         """
         Initialize the sitemap generator.
         
@@ -37,188 +109,831 @@ class SitemapGenerator:
             delay: Delay between requests in seconds (default: 1.0)
             user_agent: User agent string for requests (default: "CustomCrawler/1.0")
             max_workers: Maximum number of concurrent workers (default: 5)
+            robots_ttl: Seconds to cache each robots.txt (default: None, cache for the generator's lifetime)
+            scheduler: "queue" for a continuous frontier with per-host rate limiting,
+                       "batch" for the legacy layer-by-layer crawl (default: "queue")
+            engine: "threads" for the ThreadPoolExecutor crawler, "async" for the
+                    asyncio/aiohttp crawler where max_workers is the number of
+                    in-flight requests, "distributed" to coordinate a crawl over a
+                    shared frontier that workers on other nodes can join (default: "threads")
+            max_connections_per_host: Open connections per host; requests beyond it wait
+                                      for a free connection (default: None, same as max_workers)
+            state_db: Path to a SQLite crawl state file. When set, pages are revalidated
+                      with conditional GETs, unchanged pages reuse their stored links and
+                      lastmod reflects the real change date (default: None)
+            event_sink: Called with (event_type, data) for progress events such as
+                        page fetches, discovered links and errors (default: None)
+            link_extractor: "fast" (byte-level tokenizer with BeautifulSoup fallback),
+                            "htmlparser" or "bs4" (default: "fast")
+            max_page_bytes: Stop reading a page body after this many bytes (default: 5 MB)
+            rules: URL filter and priority rules: a UrlRules, a config dict or a JSON file
+                   path (default: None, url_rules.DEFAULT_RULES)
+            seen_filter: "exact" to track discovered URLs as 64-bit fingerprints, "bloom" for a
+                         scalable Bloom filter that uses less memory but may skip a few URLs
+                         (default: "exact")
+            seen_error_rate: False-positive rate of the Bloom seen filter (default: 1e-4)
+            frontier_memory: Bytes of queued URLs kept in memory before the frontier
+                             spills to disk (default: 64 MB)
+            spill_dir: Directory for the frontier spill file (default: None, the system temp dir)
+            checkpoint_file: Path of an append-only journal recording crawl progress, so an
+                             interrupted crawl can be resumed (default: None, no checkpoints)
+            checkpoint_interval: Seconds between journal flushes to disk (default: 5.0)
+            resume: Continue from checkpoint_file if it holds a crawl of the same root URL,
+                    without refetching finished pages (default: False)
+            parse_workers: Parse pages and normalize their links in this many worker
+                           processes while fetching stays on the crawler's threads or
+                           event loop (default: 0, parse in-process)
+            frontier_backend: Shared frontier for the distributed engine: a
+                              distributed.FrontierBackend or a SQLite file path
+                              (default: None, an in-process frontier)
+            max_retries: Retries of a request after a connection error or a 429/5xx
+                         response, honouring Retry-After (default: 3)
+            retry_backoff: Base of the exponential, jittered backoff between retries
+                           in seconds (default: 0.5)
+            adaptive_rate: Adapt each host's request rate to its responses: back off on
+                           429/503, failures and rising latency, ramp up while it stays
+                           healthy (default: True). Otherwise every host gets ``delay``.
+            max_rate: Ceiling of the adaptive rate in requests per second per host
+                      (default: None, 1 / delay: only back off and recover)
+            metrics: Record phase timings, counters and gauges of this crawl in a shared
+                     CrawlMetrics, e.g. for a Prometheus endpoint (default: None, no
+                     instrumentation)
+            seed_sitemaps: Queue the URLs of the sitemaps listed in robots.txt ``Sitemap:``
+                           lines before crawling, so pages no link points to are found
+                           too (default: True)
+            seed_files: Local sitemap files whose URLs are queued before crawling, e.g. the
+                        sitemap of the previous crawl (default: none)
+            canonical: Leave pages whose ``<link rel="canonical">`` names another URL out of
+                       the sitemap and crawl the canonical URL instead (default: True)
+            dedupe_content: Leave pages out of the sitemap whose text is a near-duplicate
+                            of a page crawled before, by simhash (default: False)
+            dedupe_distance: Most simhash bits in which two pages' text may differ to count
+                             as duplicates (default: 3)
+            extensions: Collect each page's ``<img>`` sources and ``<link rel="alternate"
+                        hreflang>`` pairs while parsing it, for ``<image:image>`` and
+                        ``<xhtml:link>`` sitemap entries (default: False)
         """
-        self.root_url = self._normalize_url(root_url)
+        if scheduler not in ("queue", "batch"):
+            raise ValueError(f"Unknown scheduler: {scheduler}")
+        if engine not in ("threads", "async", "distributed"):
+            raise ValueError(f"Unknown engine: {engine}")
+        if seen_filter not in ("exact", "bloom"):
+            raise ValueError(f"Unknown seen filter: {seen_filter}")
+        if max_rate is not None and max_rate <= 0:
+            raise ValueError(f"max_rate must be positive: {max_rate}")
+
+        # The rules normalize URLs, the root URL included
+        self.rules = UrlRules.load(rules, root_url)
+        self.root_url = self.rules.root_url
         self.max_urls = max_urls
         self.delay = delay
         self.user_agent = user_agent
         self.max_workers = max_workers
+        self.max_connections_per_host = max_connections_per_host or max_workers
+        self.rate_controller = None
+        if adaptive_rate:
+            self.rate_controller = AdaptiveRateController(
+                self.delay, min_interval=1 / max_rate if max_rate else self.delay
+            )
+        self.metrics = metrics
+        self.retry_policy = RetryPolicy(max_retries, retry_backoff)
+        self.transport_stats = TransportStats()
         self.session = self._create_session()
+        self.robots_cache = RobotsCache(self.session, self.user_agent, ttl=robots_ttl)
+        self.scheduler = scheduler
+        self.engine = engine
+        self.rate_limiter = HostRateLimiter(self.delay)
+        self.crawl_state = CrawlState(state_db) if state_db else None
+        self.crawl_stats: Dict[str, Dict] = {}
+        self._recrawl_counts = {'new': 0, 'changed': 0, 'unchanged': 0, 'not_modified': 0}
+        self._stats_lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self.event_sink = event_sink
+        self.link_extractor_name = link_extractor
+        self.link_extractor = get_link_extractor(link_extractor)
+        self.max_page_bytes = max_page_bytes
+        self.seen_filter = seen_filter
+        self.seen_error_rate = seen_error_rate
+        self.frontier_memory = frontier_memory
+        self.spill_dir = spill_dir
+        self.url_store: Optional[UrlStore] = None
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.parse_workers = parse_workers
+        self.parser_pool: Optional[ParserPool] = None
+        self.frontier_backend = frontier_backend
+        self.seed_sitemaps = seed_sitemaps
+        self.seed_files = list(seed_files)
+        self.canonical = canonical
+        self.dedupe_content = dedupe_content
+        self.dedupe_distance = dedupe_distance
+        self.simhash_index: Optional[SimhashIndex] = None
+        self.extensions = extensions
+        # (image URLs, (hreflang, URL) pairs) of crawled pages that have any
+        self.page_media: Dict[str, Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]] = {}
+        # Crawled pages that duplicate another page, until their crawl engine takes them
+        self._duplicates: Set[str] = set()
+        self._duplicate_counts = {'canonical': 0, 'content': 0}
+        self.urls_found = 0
+        self.bytes_downloaded = 0
+        # While iter_crawl runs: the queue its records go through, what is known of
+        # pages being crawled, and the depth of queued pages by hash(url)
+        self._records: Optional[queue.Queue] = None
+        self._page_info: Dict[str, Dict[str, Any]] = {}
+        self._depths: Dict[int, int] = {}
         
     def _create_session(self) -> requests.Session:
-        """Create a requests session with custom headers."""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': self.user_agent,
-            'Accept': 'text/html,application/xhtml+xml',
-            'Accept-Language': 'en-US,en;q=0.5',
-        })
-        return session
+        """Create a keep-alive requests session with custom headers, sized to the crawl's concurrency."""
+        return create_session(self.user_agent, pool_size=max(10, self.max_workers),
+                              per_host_connections=self.max_connections_per_host,
+                              policy=self.retry_policy, stats=self.transport_stats,
+                              on_retry=self._observe_response,
+                              on_connect=self._observe_connect if self.metrics is not None else None)
         
     def _normalize_url(self, url: str) -> str:
-        """Normalize URL by removing fragments and query parameters."""
-        parsed = urlparse(url)
-        return f"{parsed.scheme}://{parsed.netloc}{parsed.path.rstrip('/')}"
+        """Normalize a URL with the configured URL rules (see url_normalizer.UrlNormalizer)."""
+        return self.rules.normalize(url)
     
     def is_valid_url(self, url: str) -> bool:
-        """Check if the URL is valid and belongs to the root domain."""
-        parsed_root = urlparse(self.root_url)
-        parsed_url = urlparse(url)
-        
-        # Check if URL belongs to the root domain
-        if parsed_url.netloc != parsed_root.netloc:
-            return False
-        
-        # Exclude non-HTML resources
-        non_html_extensions = r'\.(jpg|jpeg|png|gif|pdf|css|js|woff|woff2|ttf|ico|svg|zip|mp4|mp3)(\?.*)?$'
-        if re.search(non_html_extensions, parsed_url.path, re.IGNORECASE):
-            return False
-        
-        # Ensure URL uses http or https
-        return parsed_url.scheme in ['http', 'https']
+        """Check if the URL is valid, belongs to the root domain and passes the configured filters."""
+        return self.rules.is_allowed(url)
     
     def can_fetch_url(self, url: str, user_agent: Optional[str] = None) -> bool:
         """Check if the URL is allowed to be crawled according to robots.txt."""
-        if user_agent is None:
-            user_agent = self.user_agent
-            
-        parsed_url = urlparse(url)
-        robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
-        
-        try:
-            rp = RobotFileParser()
-            rp.set_url(robots_url)
-            rp.read()
-            return rp.can_fetch(user_agent, url)
-        except Exception as e:
-            logger.warning(f"Could not parse robots.txt at {robots_url}: {e}")
-            return True
+        return self.robots_cache.can_fetch(url, user_agent)
+    
+    def get_crawl_delay(self, url: str) -> float:
+        """Return the politeness delay for the URL's host, honouring robots.txt Crawl-delay/Request-rate."""
+        robots_delay = self.robots_cache.crawl_delay(url)
+        if robots_delay is None:
+            return self.delay
+        return max(self.delay, robots_delay)
+    
+    def request_interval(self, url: str) -> float:
+        """Return the seconds between requests to the URL's host: the adaptive rate if enabled, never above robots.txt's."""
+        if self.rate_controller is None:
+            return self.get_crawl_delay(url)
+        return self.rate_controller.interval(url, self.robots_cache.crawl_delay(url))
     
-    def _extract_links(self, url: str) -> Set[str]:
-        """Extract all valid links from a page."""
+    def _observe_response(self, url: str, status: Optional[int], elapsed: Optional[float] = None) -> None:
+        """Feed a response (status None: the request failed) to the adaptive rate controller."""
+        if self.rate_controller is not None:
+            self.rate_controller.observe(url, status, elapsed)
+    
+    def _extract_links(self, url: str) -> Optional[Set[str]]:
+        """
+        Extract all valid links from a page.
+        
+        The response is streamed: non-HTML responses are dropped after the
+        headers and bodies are read only up to max_page_bytes.
+        
+        Returns:
+            The page's links, or None if the URL turned out not to be an HTML page
+        """
         links = set()
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.in_flight.inc()
         
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                absolute_url = urljoin(url, href)
-                normalized_url = self._normalize_url(absolute_url)
+            start = time.monotonic()
+            with self.session.get(url, timeout=10, headers=self._conditional_headers(url),
+                                  stream=True) as response:
+                headers_received = time.monotonic()
+                self._observe_phase(crawl_metrics.TTFB, headers_received - start)
+                if response.status_code == 304:
+                    self._page_fetched(url, response.status_code, 0, headers_received - start)
+                    return self._not_modified_links(url)
                 
-                if self.is_valid_url(normalized_url):
-                    links.add(normalized_url)
+                content_type = response.headers.get('Content-Type')
+                if not self.is_html_content_type(content_type):
+                    self._page_fetched(url, response.status_code, 0, headers_received - start)
+                    self._record_skip('content_type', url=url)
+                    logger.info(f"Skipping {url} (non-HTML content type: {content_type})")
+                    return None
+                
+                content = self._read_capped(url, response.iter_content(64 * 1024))
+                self._observe_phase(crawl_metrics.DOWNLOAD, time.monotonic() - headers_received)
+                self._page_fetched(url, response.status_code, len(content), time.monotonic() - start)
+                response.raise_for_status()
+            
+            links = self._parse_links(url, content, response.encoding)
+            self._record_page(url, response.headers, content, links)
             
         except requests.RequestException as e:
             logger.error(f"Failed to fetch {url}: {e}")
+            self._emit(events.ERROR, url=url, message=str(e))
+            if isinstance(e, requests.HTTPError):
+                # A page that answers with an error status is gone (or broken); seeding
+                # from the previous sitemap must not carry it forward
+                self._record_skip('status', url=url)
+                return None
+            self._observe_response(url, None)
+            if metrics is not None:
+                metrics.errors.inc()
+        finally:
+            if metrics is not None:
+                metrics.in_flight.dec()
         
         return links
     
+    @staticmethod
+    def is_html_content_type(content_type: Optional[str]) -> bool:
+        """Check whether a Content-Type header denotes an HTML page. A missing header counts as HTML."""
+        if not content_type:
+            return True
+        mime_type = content_type.split(';', 1)[0].strip().lower()
+        return mime_type in HTML_CONTENT_TYPES
+    
+    def _read_capped(self, url: str, chunks) -> bytes:
+        """Join body chunks, stopping once max_page_bytes have been read."""
+        buffer = bytearray()
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) >= self.max_page_bytes:
+                logger.warning(f"Truncated {url} at {self.max_page_bytes} bytes")
+                del buffer[self.max_page_bytes:]
+                break
+        return bytes(buffer)
+    
+    def _emit(self, event_type: str, **data) -> None:
+        """Send a progress event to the event sink, if one is configured."""
+        if self.event_sink is not None:
+            self.event_sink(event_type, data)
+    
+    def _observe_phase(self, phase: str, seconds: float) -> None:
+        """Record the duration of a crawl phase (see metrics.py) if metrics are enabled."""
+        if self.metrics is not None:
+            self.metrics.phases[phase].observe(seconds)
+    
+    def _observe_connect(self, seconds: float) -> None:
+        self._observe_phase(crawl_metrics.CONNECT, seconds)
+    
+    def _record_skip(self, reason: str, count: int = 1, url: Optional[str] = None) -> None:
+        """Count skipped URLs; ``url`` is a fetched page that is left out of the sitemap."""
+        if self.metrics is not None:
+            self.metrics.skipped.inc(count, (reason,))
+        if url is not None and self._records is not None:
+            self._page_info.pop(url, None)
+            self._depths.pop(hash(url), None)
+    
+    def _record_parse(self, seconds: float, rejected: int) -> None:
+        if self.metrics is not None:
+            self.metrics.phases[crawl_metrics.PARSE].observe(seconds)
+            if rejected:
+                self.metrics.skipped.inc(rejected, ('filter',))
+    
+    def _page_fetched(self, url: str, status: int, size: int, elapsed: float) -> None:
+        self._observe_response(url, status, elapsed)
+        if self.metrics is not None:
+            self.metrics.responses.inc(1, (str(status),))
+            self.metrics.bytes.inc(size)
+        with self._stats_lock:
+            self.bytes_downloaded += size
+        if self._records is not None:
+            self._page_info[url] = {'status': status, 'bytes': size, 'fetch_seconds': elapsed}
+        if self.event_sink is not None:
+            self._emit(events.PAGE_FETCHED, url=url, status=status, bytes=size, elapsed=round(elapsed, 4))
+    
+    def _page_crawled(self, url: str, link_count: int, new_links: int, queue_depth: int, in_flight: int) -> None:
+        """Publish discovered-links and progress events and the iter_crawl record after a page has been crawled."""
+        if self.metrics is not None:
+            self.metrics.pages.inc()
+        if self._records is not None:
+            info = self._page_info.pop(url, {})
+            self._records.put(CrawlRecord(url, info.get('status'), self._depths.pop(hash(url), 0),
+                                          info.get('bytes', 0), link_count, info.get('fetch_seconds'),
+                                          info.get('parse_seconds')))
+        if self.event_sink is None:
+            return
+        self._emit(events.LINKS_DISCOVERED, url=url, links=link_count, new=new_links)
+        self._emit(events.PROGRESS, urls_found=self.urls_found, queue_depth=queue_depth,
+                   in_flight=in_flight, bytes_downloaded=self.bytes_downloaded)
+    
+    def _queue_links(self, store: UrlStore, url: str, links: Set[str]) -> int:
+        """Queue the links of a crawled page and return how many were new."""
+        if self._records is None:
+            return sum(1 for link in links if store.add(link))
+        depth = self._depths.get(hash(url), 0) + 1
+        added = 0
+        for link in links:
+            if store.add(link):
+                self._depths[hash(link)] = depth
+                added += 1
+        return added
+    
+    def _crawl_result(self, store: UrlStore) -> List[str]:
+        """The sorted crawled URLs, or none under iter_crawl, which has yielded them already."""
+        if self._records is not None:
+            return []
+        return store.crawled_urls()
+    
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return If-None-Match/If-Modified-Since headers from the stored crawl state."""
+        if self.crawl_state is None:
+            return {}
+        record = self.crawl_state.get(url)
+        if record is None:
+            return {}
+        headers = {}
+        if record.etag:
+            headers['If-None-Match'] = record.etag
+        if record.last_modified:
+            headers['If-Modified-Since'] = record.last_modified
+        return headers
+    
+    def _not_modified_links(self, url: str) -> Set[str]:
+        """Return the stored outlinks of a page the server reported as 304 Not Modified."""
+        record = self.crawl_state.get(url) if self.crawl_state else None
+        if record is None:
+            return set()
+        if self.extensions and record.media:
+            self._store_media(url, *record.media)
+        self.crawl_state.touch(url)
+        self._count_recrawl('not_modified')
+        return {link for link in record.outlinks if self.is_valid_url(link)}
+    
+    def _record_page(self, url: str, headers, content: bytes, links: Set[str]) -> None:
+        """Store validators, content hash and outlinks for a freshly fetched page."""
+        if self.crawl_state is None:
+            return
+        content_hash = hashlib.sha1(content).hexdigest()
+        previous = self.crawl_state.get(url)
+        last_modified = headers.get('Last-Modified')
+        
+        if previous is not None and previous.content_hash == content_hash and previous.lastmod:
+            lastmod = previous.lastmod
+            self._count_recrawl('unchanged')
+        else:
+            lastmod = self._lastmod_from_header(last_modified) or datetime.now().strftime("%Y-%m-%d")
+            self._count_recrawl('new' if previous is None else 'changed')
+        
+        self.crawl_state.put(url, headers.get('ETag'), last_modified, content_hash, lastmod, links,
+                             self.page_media.get(url))
+    
+    @staticmethod
+    def _lastmod_from_header(last_modified: Optional[str]) -> Optional[str]:
+        if not last_modified:
+            return None
+        try:
+            return parsedate_to_datetime(last_modified).strftime("%Y-%m-%d")
+        except (TypeError, ValueError):
+            return None
+    
+    def _count_recrawl(self, outcome: str) -> None:
+        with self._stats_lock:
+            self._recrawl_counts[outcome] += 1
+    
+    def _store_media(self, url: str, images: Sequence[str], alternates: Sequence[Tuple[str, str]]) -> None:
+        """Keep a page's images and alternates, sharing the strings that recur across pages."""
+        if not images and not alternates:
+            return
+        media = (tuple(sys.intern(image) for image in images),
+                 tuple((sys.intern(hreflang), sys.intern(href)) for hreflang, href in alternates))
+        with self._stats_lock:
+            self.page_media[url] = media
+    
+    def get_page_media(self, url: str) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]:
+        """Return the image URLs and (hreflang, URL) alternates found on a crawled page."""
+        return self.page_media.get(url, ((), ()))
+    
+    def get_lastmod(self, url: str) -> Optional[str]:
+        """Return the date the URL's content last changed, if known from the crawl state."""
+        if self.crawl_state is None:
+            return None
+        return self.crawl_state.get_lastmod(url)
+    
+    def _parse_links(self, url: str, content: bytes, encoding: Optional[str] = None) -> Set[str]:
+        """Parse a page's HTML and return its valid, normalized links."""
+        start = time.monotonic()
+        if self.parser_pool is not None:
+            page = self.parser_pool.parse(url, content, encoding)
+        else:
+            page = parse_links(url, content, encoding, self.link_extractor, self.rules, self.dedupe_content,
+                               self.extensions)
+        return self._page_parsed(url, page, time.monotonic() - start)
+    
+    def _page_parsed(self, url: str, page: ParsedPage, seconds: float) -> Set[str]:
+        """
+        Record a parsed page and check whether it duplicates another page.
+        
+        A duplicate is remembered for _take_duplicate. A page only duplicates
+        its canonical URL when that is another page this crawl accepts; the
+        canonical is then added to the returned links so it gets crawled.
+        Off-site or rejected canonicals are ignored.
+        
+        Returns:
+            The links to follow from the page
+        """
+        self._record_parse(seconds, page.rejected)
+        if self._records is not None and url in self._page_info:
+            self._page_info[url]['parse_seconds'] = seconds
+        links = page.links
+        reason = None
+        if (self.canonical and page.canonical and page.canonical != url
+                and self.is_valid_url(page.canonical)):
+            reason = 'canonical'
+            links.add(page.canonical)
+        elif page.fingerprint is not None and self.simhash_index is not None:
+            if self.simhash_index.add(page.fingerprint) is not None:
+                reason = 'content'
+        
+        if reason is not None:
+            with self._stats_lock:
+                self._duplicates.add(url)
+                self._duplicate_counts[reason] += 1
+            self._record_skip('duplicate', url=url)
+            logger.info(f"Leaving out {url} (duplicate {reason}"
+                        f"{f' of {page.canonical}' if reason == 'canonical' else ''})")
+        elif self.extensions:
+            self._store_media(url, page.images, page.alternates)
+        return links
+    
+    def _take_duplicate(self, url: str) -> bool:
+        """Return True if a crawled page duplicates another and must be left out of the sitemap."""
+        with self._stats_lock:
+            if url in self._duplicates:
+                self._duplicates.remove(url)
+                return True
+        return False
+    
     def crawl_site(self) -> List[str]:
         """Crawl the website starting from root_url and return a list of URLs."""
-        crawled_urls = set()
-        to_crawl = {self.root_url}
-        visited = set()
+        self.urls_found = 0
+        self.bytes_downloaded = 0
+        self.transport_stats.reset()
+        self._emit(events.CRAWL_STARTED, root_url=self.root_url, max_urls=self.max_urls)
+        self.simhash_index = SimhashIndex(self.dedupe_distance) if self.dedupe_content else None
+        self._duplicate_counts = dict.fromkeys(self._duplicate_counts, 0)
+        self.page_media = {}
+        if self.parse_workers > 0:
+            self.parser_pool = ParserPool(self.parse_workers, self.link_extractor_name, self.rules,
+                                          fingerprint=self.dedupe_content, extensions=self.extensions)
+        if self.metrics is not None:
+            self.metrics.track(self)
+        try:
+            if self.engine == "distributed":
+                urls = self._crawl_distributed()
+            else:
+                urls = self._crawl_local()
+        finally:
+            if self.metrics is not None:
+                self.metrics.untrack(self)
+            if self.parser_pool is not None:
+                self.parser_pool.shutdown()
+                self.parser_pool = None
+            if self.crawl_state is not None:
+                self.crawl_state.close()
+            # A cancel stops this crawl only; the generator can crawl again
+            cancelled = self.cancelled
+            self._cancel_event.clear()
+        
+        # Under iter_crawl the engines return no URLs; the records carried them
+        found = len(urls) if self._records is None else self.urls_found
+        if cancelled:
+            logger.info(f"Crawl cancelled after {found} URLs")
+        if self.rate_controller is not None:
+            self.crawl_stats['rate'] = self.rate_controller.stats()
+            logger.info(f"Adaptive rate: {self.crawl_stats['rate']}")
+        record_session_connections(self.session, self.transport_stats)
+        self.crawl_stats['transport'] = self.transport_stats.snapshot()
+        logger.info(f"Transport: {self.crawl_stats['transport']}")
+        self.crawl_stats['robots'] = self.robots_cache.stats()
+        logger.info(f"robots.txt cache: {self.crawl_stats['robots']}")
+        self.crawl_stats['duplicates'] = dict(self._duplicate_counts)
+        logger.info(f"Duplicates left out: {self.crawl_stats['duplicates']}")
+        if self.extensions:
+            self.crawl_stats['extensions'] = {
+                'pages_with_images': sum(1 for images, _ in self.page_media.values() if images),
+                'images': sum(len(images) for images, _ in self.page_media.values()),
+                'pages_with_alternates': sum(1 for _, alternates in self.page_media.values() if alternates),
+            }
+            logger.info(f"Sitemap extensions: {self.crawl_stats['extensions']}")
+        if self.crawl_state is not None:
+            self.crawl_stats['recrawl'] = dict(self._recrawl_counts)
+            logger.info(f"Recrawl: {self.crawl_stats['recrawl']}")
+        self._emit(events.CRAWL_FINISHED, urls_found=found, cancelled=cancelled,
+                   bytes_downloaded=self.bytes_downloaded)
+        return urls
+    
+    def iter_crawl(self, buffer: int = 1000) -> Iterator[CrawlRecord]:
+        """
+        Crawl the website, yielding a CrawlRecord for each page as soon as it is crawled.
+        
+        The crawl runs in a background thread and hands records over through a
+        queue of ``buffer`` records, so a consumer that falls behind holds the
+        crawl back instead of records piling up. Records come in the order
+        pages finish and are not kept once yielded; the sorted URL list of
+        crawl_site is never built. Leaving the loop early cancels the crawl and
+        waits for the pages in flight. ``get_lastmod`` and ``get_page_media``
+        of a yielded URL are final, and crawl_stats is filled once the last
+        record is out.
+        
+        Args:
+            buffer: Records held between the crawl and the consumer (default: 1000)
+        
+        Yields:
+            A CrawlRecord per page that goes into the sitemap
+        """
+        if self.engine == "distributed":
+            # Remote workers' pages only reach the coordinator through the shared frontier
+            raise ValueError("iter_crawl does not support the distributed engine")
+        
+        records: queue.Queue = queue.Queue(maxsize=buffer)
+        errors: List[BaseException] = []
+        
+        def crawl() -> None:
+            try:
+                self.crawl_site()
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                records.put(_END_OF_CRAWL)
+        
+        self._records = records
+        self._page_info = {}
+        self._depths = {}
+        thread = threading.Thread(target=crawl, name="sitemap-crawl", daemon=True)
+        thread.start()
+        finished = False
+        try:
+            while True:
+                record = records.get()
+                if record is _END_OF_CRAWL:
+                    finished = True
+                    break
+                yield record
+        finally:
+            if not finished:
+                self.cancel()
+                # Unblock the crawl thread until it is done
+                while records.get() is not _END_OF_CRAWL:
+                    pass
+            thread.join()
+            # The crawl may have finished before the consumer left; do not leave the cancel behind
+            self._cancel_event.clear()
+            self._records = None
+            self._page_info = {}
+            self._depths = {}
+        if errors:
+            raise errors[0]
+    
+    def _crawl_local(self) -> List[str]:
+        """Crawl with this process's own URL store, using the configured engine and scheduler."""
+        self.url_store = UrlStore(self.root_url, seen_filter=self.seen_filter,
+                                  error_rate=self.seen_error_rate,
+                                  memory_budget=self.frontier_memory, spill_dir=self.spill_dir)
+        journal = None
+        if self.checkpoint_file:
+            journal = CrawlJournal(self.checkpoint_file, self.checkpoint_interval)
+            journal.open(self.url_store, self.root_url, resume=self.resume)
+            self.url_store.journal = journal
+            self.urls_found = self.url_store.crawled_count
+            if self._records is not None:
+                # Pages crawled before the resume are not crawled again; hand them over first
+                for url in self.url_store.crawled:
+                    self._records.put(CrawlRecord(url, None, None, 0, 0, None, None))
+        try:
+            if self.engine == "async":
+                # Imported lazily so aiohttp is only required for the async engine
+                from async_crawler import AsyncCrawler
+                urls = AsyncCrawler(self).crawl()
+            elif self.scheduler == "batch":
+                urls = self._crawl_batches()
+            else:
+                urls = self._crawl_frontier()
+        finally:
+            self.url_store.close()
+        
+        self.crawl_stats['url_store'] = self.url_store.stats()
+        logger.info(f"URL store: {self.crawl_stats['url_store']}")
+        if journal is not None:
+            self.crawl_stats['checkpoint'] = journal.stats()
+            logger.info(f"Checkpoints: {self.crawl_stats['checkpoint']}")
+        return urls
+    
+    def _crawl_distributed(self) -> List[str]:
+        """Seed the shared frontier, crawl with a local worker and collect every node's results."""
+        from distributed import CrawlCoordinator, MemoryFrontierBackend, SQLiteFrontierBackend
+        backend = self.frontier_backend
+        if backend is None:
+            backend = MemoryFrontierBackend()
+        elif isinstance(backend, str):
+            backend = SQLiteFrontierBackend(backend)
+        try:
+            urls = CrawlCoordinator(self, backend).run()
+            self.crawl_stats['frontier'] = backend.counts()
+            logger.info(f"Shared frontier: {self.crawl_stats['frontier']}")
+        finally:
+            if backend is not self.frontier_backend:
+                backend.close()
+        return urls
+    
+    def clear_checkpoint(self) -> None:
+        """Delete the checkpoint journal, e.g. once the sitemap has been written."""
+        remove_journal(self.checkpoint_file)
+    
+    def _seed_frontier(self, store: UrlStore) -> None:
+        """
+        Queue the root URL, then the URLs of the site's sitemaps.
+        
+        Discovered links are validated in _parse_links; only the root needs
+        checking here. A resumed crawl has seen the root already and keeps the
+        seeds it journaled, so its sitemaps are not read again.
+        """
+        if self.is_valid_url(self.root_url):
+            fresh = store.add(self.root_url)
+        else:
+            fresh = store.mark_seen(self.root_url)
+        if fresh:
+            store.extend(self.sitemap_seeds())
+    
+    def sitemap_seeds(self) -> Iterator[str]:
+        """
+        Yield the valid, normalized page URLs of the robots.txt sitemaps and ``seed_files``.
+        
+        Sitemaps are stream-parsed as they download. At most ``max_urls``
+        URLs are yielded, since the crawl cannot add more to the sitemap.
+        """
+        remote = []
+        if self.seed_sitemaps:
+            remote = self.robots_cache.get(self.root_url).site_maps() or []
+        if not remote and not self.seed_files:
+            return
+        
+        seeder = SitemapSeeder(self.session,
+                               throttle=lambda url: self.rate_limiter.acquire(url, self.request_interval(url)))
+        seeds = 0
+        for url in seeder.urls(remote, self.seed_files):
+            if self.cancelled or seeds >= self.max_urls:
+                break
+            url = self._normalize_url(url)
+            if self.is_valid_url(url):
+                seeds += 1
+                yield url
+            else:
+                self._record_skip('filter')
+        
+        self.crawl_stats['seeds'] = dict(seeder.stats(), seeds=seeds)
+        logger.info(f"Sitemap seeds: {self.crawl_stats['seeds']}")
+    
+    def cancel(self) -> None:
+        """
+        Stop the running crawl, or the next one if none is running. Pages already
+        in flight finish; nothing new is fetched.
+        """
+        self._cancel_event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+    
+    def _crawl_frontier(self) -> List[str]:
+        """
+        Crawl using a continuous frontier queue.
+        
+        Workers pick up the next URL as soon as they are free, politeness is
+        enforced per host by a token bucket, and no work is submitted once
+        crawled plus in-flight pages reach max_urls.
+        """
+        store = self.url_store
+        self._seed_frontier(store)
+        in_flight = {}
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            while to_crawl and len(crawled_urls) < self.max_urls:
+            while store.pending or in_flight:
+                # Keep every worker busy without overshooting max_urls
+                while (store.pending and not self.cancelled and len(in_flight) < self.max_workers
+                       and store.crawled_count + len(in_flight) < self.max_urls):
+                    url = store.pop()
+                    in_flight[executor.submit(self._process_url, url, True)] = url
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    try:
+                        new_links = future.result()
+                    except Exception as e:
+                        logger.error(f"Error processing {url}: {e}")
+                        self._emit(events.ERROR, url=url, message=str(e))
+                        store.mark_done(url)
+                        continue
+                    
+                    # Not an HTML page (or never fetched because of cancellation):
+                    # leave it out of the sitemap
+                    if new_links is None:
+                        if not self.cancelled:
+                            store.mark_done(url)
+                        continue
+                    
+                    if self._take_duplicate(url):
+                        store.mark_done(url)
+                        store.extend(new_links)
+                        continue
+                    
+                    # Each URL enters the frontier once, so it is crawled at most once
+                    store.add_crawled(url)
+                    self.urls_found = store.crawled_count
+                    logger.info(f"Crawled: {url} ({store.crawled_count} URLs found)")
+                    
+                    added = self._queue_links(store, url, new_links)
+                    self._page_crawled(url, len(new_links), added, store.pending, len(in_flight))
+        
+        return self._crawl_result(store)
+    
+    def _crawl_batches(self) -> List[str]:
+        """Crawl layer by layer, sleeping between batches (legacy scheduler)."""
+        store = self.url_store
+        self._seed_frontier(store)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while store.pending and store.crawled_count < self.max_urls and not self.cancelled:
                 futures = {}
                 
-                # Submit current batch of URLs for processing
-                for url in to_crawl:
-                    if url not in visited:
-                        visited.add(url)
-                        futures[executor.submit(self._process_url, url)] = url
+                # Submit the current layer: everything queued before this batch started
+                for _ in range(store.pending):
+                    url = store.pop()
+                    futures[executor.submit(self._process_url, url)] = url
                 
                 # Process completed futures
                 for future in as_completed(futures):
+                    if self.cancelled:
+                        break
                     url = futures[future]
                     try:
                         new_links = future.result()
                         
-                        if url in crawled_urls:
+                        if new_links is None:
+                            if not self.cancelled:
+                                store.mark_done(url)
+                            continue
+                        
+                        if self._take_duplicate(url):
+                            store.mark_done(url)
+                            store.extend(new_links)
                             continue
-                            
-                        if self.is_valid_url(url):
-                            crawled_urls.add(url)
-                            logger.info(f"Crawled: {url} ({len(crawled_urls)} URLs found)")
-                            
-                            # Add new links to the queue
-                            for link in new_links:
-                                if link not in visited and link not in to_crawl:
-                                    to_crawl.add(link)
+                        
+                        store.add_crawled(url)
+                        self.urls_found = store.crawled_count
+                        logger.info(f"Crawled: {url} ({store.crawled_count} URLs found)")
+                        
+                        # Queue new links for the next layer
+                        added = self._queue_links(store, url, new_links)
+                        self._page_crawled(url, len(new_links), added, store.pending, 0)
                     
                     except Exception as e:
                         logger.error(f"Error processing {url}: {e}")
-                
-                # Remove processed URLs from the queue
-                to_crawl -= visited
+                        self._emit(events.ERROR, url=url, message=str(e))
+                        store.mark_done(url)
                 
                 # Be polite: wait between batches
-                time.sleep(self.delay)
+                self._cancel_event.wait(self.request_interval(self.root_url))
         
-        return sorted(crawled_urls)
+        return self._crawl_result(store)
     
-    def _process_url(self, url: str) -> Set[str]:
-        """Process a single URL and return discovered links."""
-        if not self.can_fetch_url(url):
+    def _process_url(self, url: str, throttle: bool = False) -> Optional[Set[str]]:
+        """
+        Process a single URL and return discovered links, or None if it is not an HTML page
+        or the crawl was cancelled before it was fetched. Pages that duplicate another
+        page also return their links; _take_duplicate tells them apart.
+        
+        Args:
+            url: The URL to fetch
+            throttle: Wait for the host's rate limiter before fetching (default: False)
+        """
+        if self.cancelled:
+            return None
+        
+        start = time.monotonic()
+        allowed = self.can_fetch_url(url)
+        self._observe_phase(crawl_metrics.ROBOTS, time.monotonic() - start)
+        if not allowed:
+            self._record_skip('robots')
             logger.info(f"Skipping {url} (disallowed by robots.txt)")
             return set()
         
+        if throttle:
+            waited = self.rate_limiter.acquire(url, self.request_interval(url))
+            self._observe_phase(crawl_metrics.QUEUE_WAIT, waited)
+        
         return self._extract_links(url)
     def _determine_priority(self, url: str) -> str:
-        """
-        Determine priority based on URL pattern.
-        
-        Rules:
-        1. High priority pages (priority = 1)
-        2. Sub-category pages (priority = 0.9)
-        3. Product pages (priority = 0.8)
-        4. Other pages (priority = 0.6)
-        """
-  
-        high_priority_pages = [
-        "https://elghazawy.com/ar/", 
-        "https://elghazawy.com/ar/sub-category/mobile-tablet",
-        "https://elghazawy.com/ar/sub-category/computing",
-        "https://elghazawy.com/ar/sub-category/home-appliances",
-        "https://elghazawy.com/ar/sub-category/health-beauty",
-        "https://elghazawy.com/ar/sub-category/electronics",
-        "https://elghazawy.com/ar/sub-category/televisions",
-        "https://elghazawy.com/ar/sub-category/kitchen-home",
-        "https://elghazawy.com/ar/sub-category/stationery",
-        "https://elghazawy.com/ar/sub-category/toys-baby",
-        "https://elghazawy.com/ar/sub-category/fitness-supplies",
-        "https://elghazawy.com/ar/sub-category/maintenance-tools",
-        "https://elghazawy.com/ar/sub-category/electricity-connectors",
-        "https://elghazawy.com/ar/sub-category/bags",
-        "https://elghazawy.com/ar/sub-category/Fashion-",
-        ]  
-        
-        # check if the URL matches any high-priority patterns
-        for pattern in high_priority_pages:
-            if re.search(pattern, url, re.IGNORECASE):
-                return "1.0"
-        
-        #check if the URL matches any sub-category patterns
-        if re.search(r'/sub-category/|/category/', url, re.IGNORECASE):
-            return "0.9"
-        
-        #check if the URL matches any product patterns
-        if re.search(r'/product/|/item/', url, re.IGNORECASE):
-            return "0.8"
-        
-        # Default priority for other pages
-        return "0.6"
+        """Determine priority based on the configured URL rules."""
+        return self.rules.classify(url)[0]
 
     def generate_sitemap(self, urls: List[str], output_file: str = "sitemap.xml", 
                         compress: bool = False) -> str:
         """
         Generate a sitemap.xml file from a list of URLs with custom priorities.
         
+        Entries are streamed to disk. Sites with more than 50,000 URLs (or
+        50 MB) are split into numbered parts referenced by a sitemap index
+        written to ``output_file``.
+        
         Args:
             urls: List of URLs to include in the sitemap
             output_file: Output file name (default: "sitemap.xml")
@@ -230,75 +945,31 @@ class SitemapGenerator:
         if not urls:
             raise ValueError("No URLs provided for sitemap generation")
         
-        # Current date for lastmod
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        # Create XML structure
-        urlset = Element("urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
-        
-        for url in urls:
-            url_elem = SubElement(urlset, "url")
-            SubElement(url_elem, "loc").text = url
-            SubElement(url_elem, "lastmod").text = today
-            
-
-            priority = self._determine_priority(url)
-            SubElement(url_elem, "priority").text = priority
-            
-
-            if priority == "1.0":
-                changefreq = "daily"
-            elif priority == "0.9":
-                changefreq = "weekly"
-            else:
-                changefreq = "monthly"
-                
-            SubElement(url_elem, "changefreq").text = changefreq
-        
-    # def generate_sitemap(self, urls: List[str], output_file: str = "sitemap.xml", 
-    #                     compress: bool = False) -> str:
-    #     """
-    #     Generate a sitemap.xml file from a list of URLs.
-        
-    #     Args:
-    #         urls: List of URLs to include in the sitemap
-    #         output_file: Output file name (default: "sitemap.xml")
-    #         compress: Whether to gzip compress the output (default: False)
-            
-    #     Returns:
-    #         Path to the generated sitemap file
-    #     """
-    #     if not urls:
-    #         raise ValueError("No URLs provided for sitemap generation")
-        
-    #     # Current date for lastmod
-    #     today = datetime.now().strftime("%Y-%m-%d")
-        
-    #     # Create XML structure
-    #     urlset = Element("urlset", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9")
-        
-    #     for url in urls:
-    #         url_elem = SubElement(urlset, "url")
-    #         SubElement(url_elem, "loc").text = url
-    #         SubElement(url_elem, "lastmod").text = today
-    #         SubElement(url_elem, "changefreq").text = "weekly"
-    #         SubElement(url_elem, "priority").text = "0.5"
-        
-    #     # Convert to string and prettify
-    #     rough_string = tostring(urlset, "utf-8")
-    #     reparsed = minidom.parseString(rough_string)
-    #     pretty_xml = reparsed.toprettyxml(indent="    ")
-        
-    #     # Save to file
-    #     with open(output_file, "w", encoding="utf-8") as f:
-    #         f.write(pretty_xml)
-        
-    #     if compress:
-    #         self._compress_file(output_file)
-    #         output_file += ".gz"
+        try:
+            with self.sitemap_writer(output_file, compress) as writer:
+                for url in urls:
+                    self.add_to_sitemap(writer, url)
+        finally:
+            self.close()
         
-    #     logger.info(f"Sitemap saved to {output_file}")
-    #     return output_file
+        logger.info(f"Sitemap saved to {writer.output_file}")
+        return writer.output_file
+    
+    def close(self) -> None:
+        """Close the crawl state database, e.g. once the sitemap is written. It reopens if used again."""
+        if self.crawl_state is not None:
+            self.crawl_state.close()
+    
+    def sitemap_writer(self, output_file: str, compress: bool = False) -> SitemapWriter:
+        """Open a streaming SitemapWriter with this crawl's rules and the site's base URL."""
+        parsed_root = urlparse(self.root_url)
+        return SitemapWriter(output_file, compress=compress, rules=self.rules,
+                             base_url=f"{parsed_root.scheme}://{parsed_root.netloc}")
+    
+    def add_to_sitemap(self, writer: SitemapWriter, url: str) -> None:
+        """Write a crawled URL with its lastmod, images and hreflang alternates."""
+        images, alternates = self.get_page_media(url)
+        writer.add(url, lastmod=self.get_lastmod(url), images=images, alternates=alternates)
     
 
     def _compress_file(self, filepath: str) -> None:
@@ -308,32 +979,99 @@ class SitemapGenerator:
                 f_out.writelines(f_in)
         os.remove(filepath)
 
-def main():
-    # Configuration
-    root_url = "https://elghazawy.com/ar"  # Your site's root domain
-    max_urls = 1000  # Maximum number of URLs to crawl
-    delay = 1.0  # Delay between requests (in seconds)
-    output_file = "sitemap.xml"  # Output file name
-# High-priority pages to include in the sitemap
-    # high_property = 1.0  # Priority for high-priority pages
-    # low_property = 0.5  # Priority for other pages
+# Command-line flags that map to SitemapGenerator options of the same name
+CLI_OPTIONS = ('max_urls', 'delay', 'max_workers', 'engine', 'scheduler', 'state_db',
+               'checkpoint_file', 'resume', 'extensions')
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Crawl a site from the command line, writing each page to the sitemap as soon as it is crawled.
+    
+    Options come from a JSON ``--config`` file of SitemapGenerator keyword
+    arguments (``root_url`` included), overridden by the flags. Pages go into
+    a streaming sitemap in the order they are crawled and, with ``--jsonl``,
+    to stdout as one JSON record per line.
+    
+    Returns:
+        The exit status
+    """
+    parser = argparse.ArgumentParser(description="Crawl a website and write its sitemap as pages are crawled.")
+    parser.add_argument('root_url', nargs='?', help="Root URL of the site (default: root_url from --config)")
+    parser.add_argument('--config', help="JSON file of SitemapGenerator options; flags take precedence")
+    parser.add_argument('--max-urls', type=int)
+    parser.add_argument('--delay', type=float)
+    parser.add_argument('--workers', type=int, dest='max_workers')
+    parser.add_argument('--engine', choices=('threads', 'async'))
+    parser.add_argument('--scheduler', choices=('queue', 'batch'))
+    parser.add_argument('--state-db', help="SQLite crawl state for incremental recrawls")
+    parser.add_argument('--checkpoint', dest='checkpoint_file',
+                        help="Progress journal for resuming interrupted crawls")
+    parser.add_argument('--resume', action='store_true', default=None,
+                        help="Continue the crawl journaled in --checkpoint")
+    parser.add_argument('--extensions', action='store_true', default=None,
+                        help="Add image and hreflang entries to the sitemap")
+    parser.add_argument('--output', help="Sitemap file to write (default: sitemap.xml, none with --jsonl)")
+    parser.add_argument('--compress', action='store_true')
+    parser.add_argument('--jsonl', action='store_true',
+                        help="Write a JSON record of each crawled page to stdout")
+    args = parser.parse_args(argv)
+    
+    config: Dict[str, Any] = {}
+    if args.config:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    for option in CLI_OPTIONS:
+        value = getattr(args, option)
+        if value is not None:
+            config[option] = value
+    root_url = args.root_url or config.get('root_url')
+    config.pop('root_url', None)
+    if not root_url:
+        parser.error("a root URL is required, as an argument or as root_url in --config")
+    output_file = args.output or (None if args.jsonl else "sitemap.xml")
     try:
-        # Initialize and run crawler
-        generator = SitemapGenerator(root_url=root_url, max_urls=max_urls, delay=delay)
-        logger.info(f"Starting crawl from {root_url}...")
-        urls = generator.crawl_site()
-        
-        # Generate sitemap
-        if urls:
-            logger.info(f"Found {len(urls)} URLs. Generating sitemap...")
-            generator.generate_sitemap(urls, output_file, compress=True)
-        else:
-            logger.warning("No URLs found. Sitemap not generated.")
-            
+        generator = SitemapGenerator(root_url, **config)
+    except (TypeError, ValueError) as e:
+        parser.error(str(e))
+    
+    logger.info(f"{'Resuming' if generator.resume else 'Starting'} crawl from {generator.root_url}...")
+    records = generator.iter_crawl()
+    writer = None
+    status = 0
+    try:
+        for record in records:
+            if args.jsonl:
+                # Flushed per record so a consumer down the pipe sees pages as they finish
+                sys.stdout.write(json.dumps(record.to_dict()) + "\n")
+                sys.stdout.flush()
+            if output_file:
+                if writer is None:
+                    writer = generator.sitemap_writer(output_file, compress=args.compress)
+                generator.add_to_sitemap(writer, record.url)
+    except KeyboardInterrupt:
+        logger.warning("Crawl interrupted; the sitemap holds the pages crawled so far")
+        status = 130
+    except BrokenPipeError:
+        # The reader of stdout went away, e.g. `| head`; stop crawling quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        logger.info("stdout closed, stopping the crawl")
     except Exception as e:
         logger.error(f"An error occurred: {e}", exc_info=True)
-
+        status = 1
+    finally:
+        records.close()
+        generator.close()
+    
+    if writer is not None:
+        writer.close()
+        logger.info(f"Sitemap saved to {writer.output_file} ({writer.url_count} URLs)")
+        if status == 0:
+            generator.clear_checkpoint()
+    elif output_file:
+        logger.warning("No URLs found. Sitemap not generated.")
+    return status
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import json
+import os
+import logging
+import xml.etree.ElementTree as ET
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from sitemap_seeds import SITEMAP, iter_sitemap, open_sitemap_stream
+from sitemap_writer import INDEX_SUFFIX, SITEMAP_NS, URLSET_OPEN
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Child elements of <url> kept by the parser, in the sitemap namespace or none;
+# image and hreflang extensions are left out
+URL_FIELDS = frozenset(('loc', 'lastmod', 'changefreq', 'priority'))
+SITEMAP_TAG_PREFIX = f'{{{SITEMAP_NS}}}'
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def read_offset_index(path: str) -> Optional[Dict]:
+    """
+    Return the offset index SitemapWriter left next to a sitemap, or None.
+
+    An index older than its sitemap belongs to an earlier file of that name and is ignored.
+    """
+    index_path = path + INDEX_SUFFIX
+    try:
+        if os.stat(index_path).st_mtime_ns < os.stat(path).st_mtime_ns:
+            return None
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not index.get('urls_per_member') or not index.get('offsets'):
+        return None
+    return index
+
+
+def index_parts(path: str) -> Optional[List[str]]:
+    """
+    Return the part files of a sitemap index that exist next to it, or None if ``path`` is not an index.
+    """
+    with open(path, 'rb') as f:
+        stream = open_sitemap_stream(f)
+        if b'<sitemapindex' not in stream.peek(512):
+            return None
+        directory = os.path.dirname(path)
+        parts = (os.path.join(directory, os.path.basename(loc)) for kind, loc in iter_sitemap(stream)
+                 if kind == SITEMAP)
+        return [part for part in parts if os.path.isfile(part)]
+
+
+def count_urls(path: str) -> Tuple[int, int]:
+    """
+    Count the ``<url>`` entries of a sitemap file without parsing it.
+
+    The count is read from the offset index if there is one. A sitemap index
+    is counted through its parts that exist next to it.
+
+    Returns:
+        (URL count, number of files: 1, or the number of parts of an index)
+    """
+    index = read_offset_index(path)
+    if index is not None:
+        return index['urls'], 1
+    parts = index_parts(path)
+    if parts is not None:
+        return sum(count_urls(part)[0] for part in parts), len(parts)
+
+    with open(path, 'rb') as f:
+        stream = open_sitemap_stream(f)
+        count = 0
+        tail = b''
+        while True:
+            chunk = stream.read(4 * CHUNK_SIZE)
+            if not chunk:
+                return count, 1
+            data = tail + chunk
+            count += data.count(b'<url>')
+            # A match cannot fit in the kept bytes, so none is counted twice
+            tail = data[-4:]
+
+
+def _parse_urls(stream: BinaryIO, fragment: bool) -> Iterator[Dict[str, str]]:
+    """Yield each ``<url>`` of a stream as a dict of its child elements' text."""
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    if fragment:
+        # The stream starts at a <url> in the middle of the file
+        parser.feed(URLSET_OPEN)
+    root = None
+    depth = 0
+    entry: Dict[str, str] = {}
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = elem
+                continue
+            depth -= 1
+            if depth == 1:
+                yield entry
+                entry = {}
+                root.clear()
+            elif depth == 2:
+                if elem.tag.startswith(SITEMAP_TAG_PREFIX) or elem.tag in URL_FIELDS:
+                    entry[_local_name(elem.tag)] = (elem.text or '').strip()
+
+
+def iter_urls(path: str, start: int = 0) -> Iterator[Dict[str, str]]:
+    """
+    Yield the ``<url>`` entries of a sitemap file from the ``start``-th (0-based) onwards.
+
+    With an offset index the file is entered at the gzip member (or byte
+    offset) holding URL ``start``, so only up to one member is decompressed
+    before it. Without one the file is read from the top.
+    """
+    index = read_offset_index(path)
+    member = 0
+    if index is not None:
+        member = min(start // index['urls_per_member'], len(index['offsets']) - 1)
+        start -= member * index['urls_per_member']
+    with open(path, 'rb') as f:
+        if member:
+            f.seek(index['offsets'][member])
+        yield from islice(_parse_urls(open_sitemap_stream(f), fragment=member > 0), start, None)
+
+
+def iter_entries(path: str) -> Iterator[Dict[str, str]]:
+    """Yield every ``<url>`` entry of a sitemap, or of all parts of a sitemap index in order."""
+    parts = index_parts(path)
+    for part in parts if parts is not None else [path]:
+        yield from iter_urls(part)
+
+
+def read_urls(path: str, start: int, count: int) -> List[Dict[str, str]]:
+    """
+    Return ``count`` URL entries of a sitemap from the ``start``-th (0-based) on.
+
+    A sitemap index is read through its parts as if they were one sitemap.
+    """
+    parts = index_parts(path)
+    if parts is None:
+        return list(islice(iter_urls(path, start), count))
+
+    entries: List[Dict[str, str]] = []
+    for part in parts:
+        urls = count_urls(part)[0]
+        if start >= urls:
+            start -= urls
+            continue
+        entries.extend(islice(iter_urls(part, start), count - len(entries)))
+        start = 0
+        if len(entries) >= count:
+            break
+    return entries
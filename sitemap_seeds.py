@@ -0,0 +1,224 @@
+import gzip
+import io
+import os
+import logging
+import xml.etree.ElementTree as ET
+import zlib
+from collections import deque
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from sitemap_writer import MAX_BYTES_PER_SITEMAP
+
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Entry kinds yielded by iter_sitemap
+PAGE = 'page'
+SITEMAP = 'sitemap'
+
+# Sitemaps fetched or opened per crawl, counting every part of a sitemap index
+MAX_SITEMAPS = 500
+
+
+class SitemapTooLarge(Exception):
+    """A sitemap's uncompressed body exceeded the size limit."""
+
+
+class _CappedReader(io.RawIOBase):
+    """Read-only stream that raises SitemapTooLarge once more than ``limit`` bytes were read."""
+
+    def __init__(self, stream: BinaryIO, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        self.bytes_read += len(data)
+        if self.bytes_read > self._limit:
+            raise SitemapTooLarge(f"sitemap larger than {self._limit} bytes")
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def open_sitemap_stream(stream: BinaryIO, max_bytes: int = MAX_BYTES_PER_SITEMAP) -> BinaryIO:
+    """
+    Wrap a binary stream of a sitemap, gunzipping it if it starts with the gzip magic bytes.
+
+    Nothing is read ahead beyond one buffer, so callers can parse it as it downloads.
+    """
+    buffered = io.BufferedReader(stream) if not hasattr(stream, 'peek') else stream
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        buffered = gzip.GzipFile(fileobj=buffered)
+    return io.BufferedReader(_CappedReader(buffered, max_bytes))
+
+
+def iter_sitemap(stream: BinaryIO) -> Iterator[Tuple[str, str]]:
+    """
+    Stream-parse a sitemap, sitemap index or plain-text sitemap.
+
+    Elements are discarded as soon as their ``<loc>`` is read, so memory
+    stays flat however many URLs the file holds.
+
+    Yields:
+        (PAGE, url) for each ``<url>`` and (SITEMAP, url) for each ``<sitemap>`` of an index
+    """
+    head = stream.peek(64).lstrip()
+    if head and not head.startswith(b'<') and not head.startswith(b'\xef\xbb\xbf<'):
+        # Text sitemap: one URL per line
+        for line in io.TextIOWrapper(stream, encoding='utf-8', errors='replace'):
+            url = line.strip()
+            if url:
+                yield PAGE, url
+        return
+
+    root = None
+    loc = None
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            continue
+        name = _local_name(elem.tag)
+        if name == 'loc':
+            # The entry's own <loc> comes first; image:loc and the like follow it
+            if loc is None:
+                loc = (elem.text or '').strip()
+        elif name in ('url', 'sitemap'):
+            if loc:
+                yield (PAGE if name == 'url' else SITEMAP), loc
+            loc = None
+            # Drop the finished entry from the tree
+            root.clear()
+
+
+class SitemapSeeder:
+    def __init__(self, session: requests.Session, timeout: float = 30,
+                 max_sitemaps: int = MAX_SITEMAPS, max_bytes: int = MAX_BYTES_PER_SITEMAP,
+                 throttle: Optional[Callable[[str], Any]] = None):
+        """
+        Read page URLs from sitemaps, to seed a crawl before any page is fetched.
+
+        Sitemaps are downloaded and parsed as a stream, gzip-compressed or not.
+        A sitemap index is followed to its parts, each sitemap read at most once.
+        In local files, an index part that exists next to the index is read
+        from disk instead of downloaded, which is how SitemapWriter leaves them.
+
+        Args:
+            session: Session used to download remote sitemaps
+            timeout: Request timeout in seconds (default: 30)
+            max_sitemaps: Sitemaps read per seeding, index parts included (default: 500)
+            max_bytes: Uncompressed size limit of one sitemap (default: 50 MB)
+            throttle: Called with each sitemap URL before it is downloaded, e.g. to wait
+                      for the host's rate limit (default: None)
+        """
+        self.session = session
+        self.timeout = timeout
+        self.max_sitemaps = max_sitemaps
+        self.max_bytes = max_bytes
+        self.throttle = throttle
+        self.sitemaps_read = 0
+        self.urls_found = 0
+        self.errors = 0
+
+    def _read(self, location: str, local_dir: Optional[str]) -> Iterator[Tuple[str, str]]:
+        """Yield the entries of one sitemap, read from disk or downloaded."""
+        if local_dir is not None:
+            # A sitemap file given directly, or a part next to a local index
+            path = location if os.path.isfile(location) else os.path.join(local_dir, os.path.basename(location))
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    yield from iter_sitemap(open_sitemap_stream(f, self.max_bytes))
+                return
+        if not location.startswith(('http://', 'https://')):
+            raise FileNotFoundError(location)
+
+        if self.throttle is not None:
+            self.throttle(location)
+        with self.session.get(location, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            # Undo Content-Encoding while streaming; a .gz body is gunzipped by open_sitemap_stream
+            response.raw.decode_content = True
+            # Let the io wrappers see EOF instead of a closed file
+            response.raw.auto_close = False
+            yield from iter_sitemap(open_sitemap_stream(response.raw, self.max_bytes))
+
+    def urls(self, remote: Iterable[str] = (), files: Iterable[str] = ()) -> Iterator[str]:
+        """
+        Yield the page URLs of sitemaps, following sitemap indexes breadth-first.
+
+        Args:
+            remote: Sitemap URLs, e.g. from robots.txt ``Sitemap:`` lines
+            files: Paths of local sitemap files, e.g. sitemaps written by earlier crawls
+        """
+        # (location, directory of the local file it came from, or None if remote)
+        pending: Deque[Tuple[str, Optional[str]]] = deque()
+        pending.extend((path, os.path.dirname(path)) for path in files)
+        pending.extend((url, None) for url in remote)
+        visited = set()
+
+        while pending and self.sitemaps_read < self.max_sitemaps:
+            location, local_dir = pending.popleft()
+            if location in visited:
+                continue
+            visited.add(location)
+            self.sitemaps_read += 1
+            found = 0
+            try:
+                for kind, loc in self._read(location, local_dir):
+                    if kind == SITEMAP:
+                        pending.append((loc, local_dir))
+                    else:
+                        found += 1
+                        yield loc
+            except (OSError, EOFError, zlib.error, ET.ParseError, requests.RequestException, Urllib3Error,
+                    SitemapTooLarge) as e:
+                self.errors += 1
+                logger.warning(f"Could not read sitemap {location}: {e}")
+            self.urls_found += found
+            logger.info(f"Read {found} URLs from sitemap {location}")
+
+        if pending:
+            logger.warning(f"Stopped after {self.max_sitemaps} sitemaps; {len(pending)} left unread")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'sitemaps': self.sitemaps_read,
+            'urls': self.urls_found,
+            'errors': self.errors,
+        }
+
+
+def previous_sitemaps(directory: str, root_url: str) -> List[str]:
+    """
+    Return the sitemaps an earlier crawl of ``root_url``'s site wrote to ``directory``, newest first.
+
+    Matches the ``<domain>_<YYYYmmdd_HHMMSS>.xml[.gz]`` names used by app.py.
+    """
+    domain = urlparse(root_url).netloc.replace('.', '_')
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    matches = []
+    for name in names:
+        stem = name[:-len('.gz')] if name.endswith('.gz') else name
+        if not stem.endswith('.xml') or not stem.startswith(f"{domain}_"):
+            continue
+        timestamp = stem[len(domain) + 1:-len('.xml')]
+        if len(timestamp) == 15 and timestamp[8] == '_' and timestamp.replace('_', '').isdigit():
+            matches.append((timestamp, os.path.join(directory, name)))
+    return [path for _, path in sorted(matches, reverse=True)]
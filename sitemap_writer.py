@@ -0,0 +1,251 @@
+import gzip
+import io
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING
+from xml.sax.saxutils import escape, quoteattr
+
+
+if TYPE_CHECKING:
+    from url_rules import UrlRules
+
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+IMAGE_NS = "http://www.google.com/schemas/sitemap-image/1.1"
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+
+# Limits from the sitemaps.org protocol
+MAX_URLS_PER_SITEMAP = 50000
+MAX_BYTES_PER_SITEMAP = 50 * 1024 * 1024
+
+XML_HEADER = b'<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = f'<urlset xmlns="{SITEMAP_NS}" xmlns:image="{IMAGE_NS}" xmlns:xhtml="{XHTML_NS}">\n'.encode('utf-8')
+URLSET_CLOSE = b'</urlset>\n'
+
+# URLs between two entries of a sitemap's offset index (and, compressed, per gzip member)
+URLS_PER_MEMBER = 1000
+INDEX_SUFFIX = '.idx'
+
+
+class SitemapWriter:
+    def __init__(self, output_file: str, compress: bool = False, base_url: Optional[str] = None,
+                 max_urls_per_file: int = MAX_URLS_PER_SITEMAP,
+                 max_bytes_per_file: int = MAX_BYTES_PER_SITEMAP,
+                 compresslevel: int = 6, rules: Optional["UrlRules"] = None,
+                 urls_per_member: int = URLS_PER_MEMBER):
+        """
+        Streaming sitemap writer.
+
+        ``<url>`` entries are written as they are added, so memory use does not
+        grow with the number of URLs. When a file reaches the URL count or
+        uncompressed size limit the writer rolls over to the next part
+        (``sitemap-2.xml``, ``sitemap-3.xml``, ...). On close a single part is
+        renamed to ``output_file``; several parts get a ``sitemapindex``
+        written to ``output_file`` instead.
+
+        Every ``urls_per_member`` URLs the writer notes the byte offset of the
+        next ``<url>`` in a small JSON index next to the file (``<file>.idx``).
+        Compressed files start a new gzip member at each of those offsets, so
+        a reader can seek straight to URL N and decompress from there; the
+        concatenated members are still one valid gzip file.
+
+        Args:
+            output_file: Path of the sitemap (or sitemap index) to produce
+            compress: Write gzip-compressed files; ".gz" is appended if missing (default: False)
+            base_url: URL prefix under which the part files will be published,
+                      used for ``<loc>`` entries in the index (default: None, bare file names)
+            max_urls_per_file: URL limit per part (default: 50,000)
+            max_bytes_per_file: Uncompressed size limit per part (default: 50 MB)
+            compresslevel: gzip compression level (default: 6)
+            rules: Rules supplying priority/changefreq for entries added without them (optional)
+            urls_per_member: URLs per gzip member and offset index entry; 0 writes
+                             neither (default: 1,000)
+        """
+        if compress and not output_file.endswith('.gz'):
+            output_file += '.gz'
+        self.output_file = output_file
+        self.compress = compress
+        self.base_url = base_url
+        self.max_urls_per_file = max_urls_per_file
+        self.max_bytes_per_file = max_bytes_per_file
+        self.compresslevel = compresslevel
+        self.rules = rules
+        self.urls_per_member = urls_per_member
+        self.today = datetime.now().strftime("%Y-%m-%d")
+
+        self.url_count = 0
+        self.parts: List[str] = []
+        self.index_file: Optional[str] = None
+        self._stream = None
+        self._raw = None
+        self._file = None
+        self._offsets: List[int] = []
+        self._part_urls = 0
+        self._part_bytes = 0
+        self._closed = False
+
+    def __enter__(self) -> "SitemapWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_part()
+
+    def _part_path(self, number: int) -> str:
+        directory, name = os.path.split(self.output_file)
+        suffix = '.xml.gz' if name.endswith('.xml.gz') else os.path.splitext(name)[1] or '.xml'
+        stem = name[:-len(suffix)] if name.endswith(suffix) else name
+        return os.path.join(directory, f"{stem}-{number}{suffix}")
+
+    def _open_member(self) -> None:
+        self._raw = gzip.GzipFile(fileobj=self._file, mode='wb', compresslevel=self.compresslevel)
+        # Batch small writes so gzip compresses in large blocks
+        self._stream = io.BufferedWriter(self._raw, buffer_size=64 * 1024)
+
+    def _open(self, path: str) -> None:
+        self._file = open(path, 'wb')
+        if self.compress:
+            self._open_member()
+        else:
+            self._raw = None
+            self._stream = self._file
+
+    def _next_member(self) -> None:
+        """Note where the next URL starts, ending the current gzip member first."""
+        if self.compress:
+            self._stream.flush()
+            self._stream.detach()
+            # Writes the member's trailer but leaves the file open
+            self._raw.close()
+            self._offsets.append(self._file.tell())
+            self._open_member()
+        else:
+            self._offsets.append(self._stream.tell())
+
+    def _close_stream(self) -> None:
+        self._stream.close()
+        if self._raw is not None:
+            self._raw.close()
+            self._file.close()
+        self._stream = None
+        self._raw = None
+        self._file = None
+
+    def _write_offset_index(self, path: str) -> None:
+        if not self.urls_per_member:
+            return
+        index = {'urls': self._part_urls, 'urls_per_member': self.urls_per_member, 'offsets': self._offsets}
+        with open(path + INDEX_SUFFIX, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+
+    def _open_part(self) -> None:
+        path = self._part_path(len(self.parts) + 1)
+        self._open(path)
+        self.parts.append(path)
+        self._stream.write(XML_HEADER)
+        self._stream.write(URLSET_OPEN)
+        # The first member also holds the XML header, so a reader of URL 0 starts at the top
+        self._offsets = [0]
+        self._part_urls = 0
+        self._part_bytes = len(XML_HEADER) + len(URLSET_OPEN)
+
+    def _close_part(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.write(URLSET_CLOSE)
+        self._close_stream()
+        self._write_offset_index(self.parts[-1])
+        logger.info(f"Wrote sitemap part {self.parts[-1]} ({self._part_urls} URLs)")
+
+    def add(self, url: str, lastmod: Optional[str] = None, changefreq: Optional[str] = None,
+            priority: Optional[str] = None, images: Iterable[str] = (),
+            alternates: Iterable[Tuple[str, str]] = ()) -> None:
+        """
+        Append a ``<url>`` entry.
+
+        Args:
+            url: Absolute URL of the page
+            lastmod: W3C date of the last change (default: today)
+            changefreq: Expected change frequency (default: from rules, if any)
+            priority: Priority between 0.0 and 1.0 (default: from rules, if any)
+            images: Image URLs of the page, written as ``<image:image>`` entries (default: none)
+            alternates: (hreflang, URL) pairs of the page's language versions, written as
+                        ``<xhtml:link rel="alternate">`` entries (default: none)
+        """
+        if self._closed:
+            raise ValueError("Cannot add URLs to a closed SitemapWriter")
+
+        if self.rules is not None and (priority is None or changefreq is None):
+            rule_priority, rule_changefreq = self.rules.classify(url)
+            priority = priority or rule_priority
+            changefreq = changefreq or rule_changefreq
+
+        entry = f'  <url>\n    <loc>{escape(url)}</loc>\n    <lastmod>{lastmod or self.today}</lastmod>\n'
+        if changefreq:
+            entry += f'    <changefreq>{changefreq}</changefreq>\n'
+        if priority:
+            entry += f'    <priority>{priority}</priority>\n'
+        for image in images:
+            entry += f'    <image:image>\n      <image:loc>{escape(image)}</image:loc>\n    </image:image>\n'
+        for hreflang, href in alternates:
+            entry += (f'    <xhtml:link rel="alternate" hreflang={quoteattr(hreflang)}'
+                      f' href={quoteattr(href)}/>\n')
+        entry += '  </url>\n'
+        data = entry.encode('utf-8')
+
+        if self._stream is None:
+            self._open_part()
+        elif (self._part_urls >= self.max_urls_per_file
+              or self._part_bytes + len(data) + len(URLSET_CLOSE) > self.max_bytes_per_file):
+            self._close_part()
+            self._open_part()
+        elif self.urls_per_member and self._part_urls % self.urls_per_member == 0:
+            self._next_member()
+
+        self._stream.write(data)
+        self._part_urls += 1
+        self._part_bytes += len(data)
+        self.url_count += 1
+
+    def _write_index(self) -> None:
+        self._open(self.output_file)
+        self._stream.write(XML_HEADER)
+        self._stream.write(f'<sitemapindex xmlns="{SITEMAP_NS}">\n'.encode('utf-8'))
+        for path in self.parts:
+            name = os.path.basename(path)
+            loc = f"{self.base_url.rstrip('/')}/{name}" if self.base_url else name
+            self._stream.write(
+                f'  <sitemap>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{self.today}</lastmod>\n  </sitemap>\n'
+                .encode('utf-8')
+            )
+        self._stream.write(b'</sitemapindex>\n')
+        self._close_stream()
+        self.index_file = self.output_file
+
+    def close(self) -> str:
+        """
+        Finish writing and return the path to the sitemap or sitemap index.
+        """
+        if self._closed:
+            return self.output_file
+        self._closed = True
+
+        if not self.parts:
+            raise ValueError("No URLs provided for sitemap generation")
+
+        self._close_part()
+        if len(self.parts) == 1:
+            os.replace(self.parts[0], self.output_file)
+            if self.urls_per_member:
+                os.replace(self.parts[0] + INDEX_SUFFIX, self.output_file + INDEX_SUFFIX)
+            self.parts = [self.output_file]
+        else:
+            self._write_index()
+            logger.info(f"Wrote sitemap index {self.output_file} ({len(self.parts)} parts)")
+        return self.output_file
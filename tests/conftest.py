@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing sitemap_generator opens app.log in the working directory; keep it out of the checkout
+_cwd = os.getcwd()
+APP_DIR = tempfile.mkdtemp(prefix='sitemap-tests-')
+os.chdir(APP_DIR)
+try:
+    import sitemap_generator  # noqa: F401
+finally:
+    os.chdir(_cwd)
+
+
+class Site:
+    """Pages served by the test server, by path: (status, content type, body, seconds before answering)."""
+
+    def __init__(self):
+        self.pages: Dict[str, Tuple[int, str, bytes, float]] = {}
+        self.requests: List[str] = []
+        self.url = ''
+
+    def add(self, path: str, body: str = '', status: int = 200, content_type: str = 'text/html',
+            delay: float = 0) -> None:
+        self.pages[path] = (status, content_type, body.encode('utf-8'), delay)
+
+    def page(self, path: str, *links: str, status: int = 200, delay: float = 0) -> None:
+        """Serve an HTML page linking to ``links``."""
+        anchors = ''.join(f'<a href="{link}">{link}</a>' for link in links)
+        self.add(path, f'<html><head><title>{path}</title></head><body>{anchors}</body></html>',
+                 status=status, delay=delay)
+
+
+@pytest.fixture
+def site():
+    pages = Site()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            pages.requests.append(self.path)
+            status, content_type, body, delay = pages.pages.get(
+                self.path, (404, 'text/html', b'<html><body>Not found</body></html>', 0))
+            if delay:
+                time.sleep(delay)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    pages.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield pages
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Flask test client; the app's folders are relative to APP_DIR, so the test runs there."""
+    monkeypatch.chdir(APP_DIR)
+    import app
+    # send_file resolves relative paths against the app's root rather than the working directory
+    monkeypatch.setitem(app.app.config, 'UPLOAD_FOLDER', os.path.join(APP_DIR, 'last_work'))
+    return app.app.test_client()
@@ -0,0 +1,48 @@
+import os
+import time
+
+from sitemap_reader import iter_entries
+
+
+def wait_for_job(client, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f'/jobs/{job_id}').get_json()
+        if job['status'] in ('completed', 'failed', 'cancelled') or time.monotonic() > deadline:
+            return job
+
+
+def test_generate_writes_the_sitemap_through_the_generator(client, site):
+    site.page('/', '/blog/post', '/about')
+    site.add('/blog/post', '<html><body><img src="/cover.png"><a href="/">home</a></body></html>')
+    site.page('/about')
+
+    response = client.post('/generate', json={'root_url': site.url, 'delay': 0, 'extensions': True,
+                                              'seed_sitemaps': False, 'seed_previous': False})
+    assert response.status_code == 202
+    job = wait_for_job(client, response.get_json()['job_id'])
+
+    assert job['status'] == 'completed', job
+    path = os.path.join('last_work', job['result']['filename'])
+    entries = {entry['loc']: entry for entry in iter_entries(path)}
+    assert sorted(entries) == sorted([site.url, site.url + '/about', site.url + '/blog/post'])
+    # Priorities and change frequencies come from the crawl's URL rules
+    assert all(entry.get('priority') and entry.get('changefreq') for entry in entries.values())
+    with open(path, encoding='utf-8') as f:
+        assert f'<image:loc>{site.url}/cover.png</image:loc>' in f.read()
+
+
+def test_job_endpoints(client, site):
+    site.page('/', *[f'/slow/{n}' for n in range(10)])
+    for n in range(10):
+        site.page(f'/slow/{n}', delay=0.2)
+
+    assert client.get('/jobs/unknown').status_code == 404
+    job_id = client.post('/generate', json={'root_url': site.url, 'delay': 0, 'max_workers': 1,
+                                            'seed_sitemaps': False, 'seed_previous': False}
+                         ).get_json()['job_id']
+    assert client.get(f'/jobs/{job_id}/result').status_code == 409
+    assert client.post(f'/jobs/{job_id}/cancel').status_code == 200
+
+    assert wait_for_job(client, job_id)['status'] == 'cancelled'
+    assert any(job['job_id'] == job_id for job in client.get('/jobs').get_json()['jobs'])
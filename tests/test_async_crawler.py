@@ -0,0 +1,18 @@
+from async_crawler import AsyncCrawler
+from sitemap_generator import SitemapGenerator
+
+
+def test_waiting_for_a_pooled_connection_does_not_time_out(site, monkeypatch):
+    # One connection for four workers: the last page waits about 1.8s for it, past the timeout
+    paths = [f'/slow/{n}' for n in range(4)]
+    site.page('/', *paths)
+    for path in paths:
+        site.page(path, delay=0.6)
+    monkeypatch.setattr(AsyncCrawler.__init__, '__defaults__', (1.0,))
+    generator = SitemapGenerator(site.url, delay=0, max_workers=4, max_connections_per_host=1,
+                                 engine='async', adaptive_rate=False, seed_sitemaps=False)
+
+    urls = generator.crawl_site()
+
+    assert urls == sorted([site.url] + [site.url + path for path in paths])
+    assert generator.crawl_stats['transport']['retries'] == 0
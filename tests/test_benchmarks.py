@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from bench_crawl import compare, percentile  # noqa: E402
+from sitemap_generator import SitemapGenerator  # noqa: E402
+from synthetic_site import SiteConfig, SyntheticSiteServer, make_handler, render_page  # noqa: E402
+
+
+@pytest.fixture
+def synthetic_site():
+    servers = []
+
+    def start(config):
+        server = SyntheticSiteServer(('127.0.0.1', 0), make_handler(config))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_synthetic_site_is_reproducible():
+    first = SiteConfig(pages=100, error_rate=0.2, disallow_rate=0.2, latency_ms=10, latency_dist='lognormal')
+    second = SiteConfig(pages=100, error_rate=0.2, disallow_rate=0.2, latency_ms=10, latency_dist='lognormal')
+
+    assert [first.page_path(n) for n in range(100)] == [second.page_path(n) for n in range(100)]
+    assert [first.fails_first(n) for n in range(100)] == [second.fails_first(n) for n in range(100)]
+    assert first.latency('/p/3', 1) == second.latency('/p/3', 1)
+    assert render_page(first, 7) == render_page(second, 7)
+    assert first.robots_txt() == b'User-agent: *\nDisallow: /private/\n'
+
+
+def test_crawl_of_a_synthetic_site(synthetic_site):
+    config = SiteConfig(pages=80, fanout=4, error_rate=0.2)
+    base_url = synthetic_site(config)
+    generator = SitemapGenerator(base_url, delay=0, max_urls=config.pages, adaptive_rate=False,
+                                 seed_sitemaps=False, retry_backoff=0.01)
+
+    urls = generator.crawl_site()
+
+    assert len(urls) == config.pages
+    # Every page failing its first request was retried once
+    assert generator.crawl_stats['transport']['retries'] == sum(config.fails_first(n) for n in range(config.pages))
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 0.07) == 7
+    assert percentile(values, 1.0) == 100
+    assert percentile([], 0.5) == 0.0
+
+
+def test_compare_reports_percent_change(tmp_path):
+    baseline = tmp_path / 'bench.json'
+    baseline.write_text(json.dumps({'results': [
+        {'scenario': 'baseline', 'engine': 'threads', 'pages_per_sec': 100.0, 'fetch_p50_ms': 2.0,
+         'fetch_p99_ms': 10.0, 'peak_rss_mb': 50.0, 'write_seconds': 1.0, 'output_bytes': 1000}]}))
+    result = {'scenario': 'baseline', 'engine': 'threads', 'pages_per_sec': 120.0, 'fetch_p50_ms': 3.0,
+              'fetch_p99_ms': 10.0, 'peak_rss_mb': 50.0, 'write_seconds': 1.0, 'output_bytes': 1000}
+
+    [change] = compare([result, dict(result, engine='async')], str(baseline))
+
+    assert change['pages_per_sec'] == {'before': 100.0, 'after': 120.0, 'change_percent': 20.0, 'better': True}
+    assert change['fetch_p50_ms']['better'] is False
@@ -0,0 +1,36 @@
+import pytest
+
+from sitemap_generator import SitemapGenerator
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_only_html_pages_go_into_the_sitemap(site, engine):
+    site.page('/', '/report.pdf', '/data.json', '/page.xhtml', '/big')
+    site.add('/report.pdf', '%PDF-1.4', content_type='application/pdf')
+    site.add('/data.json', '{"a": "<a href=\\"/from-json\\">"}', content_type='application/json')
+    site.add('/page.xhtml', '<html><body><a href="/from-xhtml">x</a></body></html>',
+             content_type='application/xhtml+xml; charset=utf-8')
+    site.page('/from-xhtml')
+    # Links past max_page_bytes are never read
+    site.add('/big', '<html><body><a href="/early">x</a>' + ' ' * 5000 + '<a href="/late">y</a></body></html>')
+    site.page('/early')
+    site.page('/late')
+    generator = SitemapGenerator(site.url, delay=0, engine=engine, adaptive_rate=False,
+                                 seed_sitemaps=False, max_page_bytes=4096)
+
+    urls = generator.crawl_site()
+
+    assert urls == sorted(site.url + path for path in ('', '/page.xhtml', '/from-xhtml', '/big', '/early'))
+    assert '/late' not in site.requests
+
+
+@pytest.mark.parametrize('content_type, html', [
+    (None, True),
+    ('text/html', True),
+    ('Text/HTML; charset=ISO-8859-1', True),
+    ('application/xhtml+xml', True),
+    ('application/pdf', False),
+    ('text/plain', False),
+])
+def test_is_html_content_type(content_type, html):
+    assert SitemapGenerator.is_html_content_type(content_type) is html
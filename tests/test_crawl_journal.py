@@ -0,0 +1,65 @@
+import time
+
+from crawl_journal import CrawlJournal
+from url_store import UrlStore
+
+ROOT = 'https://example.com'
+
+
+def journaled_store(path, resume=False, interval=5.0):
+    store = UrlStore(ROOT)
+    journal = CrawlJournal(str(path), interval)
+    resumed = journal.open(store, ROOT, resume=resume)
+    store.journal = journal
+    return store, journal, resumed
+
+
+def test_restore_requeues_unfinished_pages_and_compacts(tmp_path):
+    path = tmp_path / 'crawl.journal'
+    store, journal, _ = journaled_store(path)
+    store.extend([ROOT, f'{ROOT}/a', f'{ROOT}/b', f'{ROOT}/c.pdf'])
+    for _ in range(3):
+        store.pop()
+    store.add_crawled(ROOT)
+    store.add_crawled(f'{ROOT}/a')
+    store.extend([f'{ROOT}/a', f'{ROOT}/d'])
+    # /b is in flight and /c.pdf and /d are queued when the crawl dies; the last line is torn
+    store.mark_done(f'{ROOT}/c.pdf')
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f'C\t{ROOT}/b')
+    lines_before = path.read_text().count('\n')
+
+    store, journal, resumed = journaled_store(path, resume=True)
+
+    assert resumed
+    assert store.crawled_urls() == [ROOT, f'{ROOT}/a']
+    assert [store.pop() for _ in range(store.pending)] == [f'{ROOT}/b', f'{ROOT}/d']
+    assert not store.add(f'{ROOT}/c.pdf')
+    journal.close()
+    assert path.read_text().count('\n') < lines_before
+
+
+def test_journal_for_another_site_is_not_resumed(tmp_path):
+    path = tmp_path / 'crawl.journal'
+    path.write_text('# sitemap-journal v1 https://other.example\nC\thttps://other.example\n')
+
+    store, journal, resumed = journaled_store(path, resume=True)
+    journal.close()
+
+    assert not resumed
+    assert store.crawled_count == 0
+
+
+def test_records_are_checkpointed_without_further_writes(tmp_path):
+    path = tmp_path / 'crawl.journal'
+    store, journal, _ = journaled_store(path, interval=0.05)
+    store.add(f'{ROOT}/slow')
+
+    deadline = time.monotonic() + 2
+    while not journal.checkpoints and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert journal.checkpoints == 1
+    assert f'S\t{ROOT}/slow\n' in path.read_text()
+    journal.close()
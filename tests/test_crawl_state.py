@@ -0,0 +1,26 @@
+from crawl_state import CrawlState
+from sitemap_generator import SitemapGenerator
+
+
+def test_close_commits_and_reopens_on_use(tmp_path):
+    state = CrawlState(str(tmp_path / 'state.sqlite'))
+    state.put('https://example.com/a', '"v1"', None, 'hash', '2024-01-02', {'https://example.com/b'})
+    state.close()
+    assert state._conn is None
+
+    assert state.get_lastmod('https://example.com/a') == '2024-01-02'
+    state.close()
+    assert CrawlState(str(tmp_path / 'state.sqlite')).get('https://example.com/a').outlinks == ['https://example.com/b']
+
+
+def test_crawl_and_sitemap_leave_the_state_closed(site, tmp_path):
+    site.page('/', '/a')
+    site.page('/a')
+    generator = SitemapGenerator(site.url, delay=0, state_db=str(tmp_path / 'state.sqlite'), seed_sitemaps=False)
+
+    urls = generator.crawl_site()
+    assert generator.crawl_state._conn is None
+
+    generator.generate_sitemap(urls, str(tmp_path / 'sitemap.xml'))
+    assert generator.crawl_state._conn is None
+    assert '<lastmod>' in (tmp_path / 'sitemap.xml').read_text()
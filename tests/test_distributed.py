@@ -0,0 +1,50 @@
+import sqlite3
+import threading
+
+from distributed import CrawlCoordinator, CrawlWorker, SQLiteFrontierBackend, worker_generator
+from sitemap_generator import SitemapGenerator
+from url_rules import DEFAULT_RULES
+
+
+def custom_rules():
+    return dict(DEFAULT_RULES, exclude=['/private'],
+                normalize={'keep_query': ['page'], 'drop_query': [], 'unify_scheme': True})
+
+
+def test_remote_worker_uses_the_coordinators_rules(site, tmp_path):
+    site.page('/', '/a?page=2&ref=x', '/private/x')
+    site.page('/a?page=2', '/b')
+    site.page('/b')
+    site.page('/private/x', '/hidden')
+    site.page('/hidden')
+    db = str(tmp_path / 'frontier.sqlite')
+    coordinator_backend = SQLiteFrontierBackend(db)
+    coordinator = CrawlCoordinator(SitemapGenerator(site.url, delay=0, rules=custom_rules(), seed_sitemaps=False),
+                                   coordinator_backend, poll_interval=0.05)
+    coordinator.seed()
+
+    # A worker on another node only shares the frontier file
+    worker_backend = SQLiteFrontierBackend(db)
+    worker = worker_generator(worker_backend, max_workers=2)
+    assert worker.rules.config == custom_rules()
+    thread = threading.Thread(target=CrawlWorker(worker, worker_backend, poll_interval=0.05).run)
+    thread.start()
+    urls = coordinator.wait()
+    thread.join()
+    coordinator_backend.close()
+    worker_backend.close()
+
+    assert urls == [site.url, f'{site.url}/a?page=2', f'{site.url}/b']
+
+
+def test_frontier_without_stored_rules_falls_back_to_the_defaults(tmp_path):
+    db = str(tmp_path / 'frontier.sqlite')
+    backend = SQLiteFrontierBackend(db)
+    backend.configure('https://example.com', 10, 0.0)
+    backend.close()
+    # As written before the rules were stored with the frontier
+    with sqlite3.connect(db) as conn:
+        conn.execute("DELETE FROM meta WHERE key = 'rules'")
+
+    worker = worker_generator(SQLiteFrontierBackend(db))
+    assert worker.rules.config is DEFAULT_RULES
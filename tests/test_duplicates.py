@@ -0,0 +1,64 @@
+from sitemap_generator import SitemapGenerator
+
+
+def canonical_page(canonical: str, *links: str) -> str:
+    anchors = ''.join(f'<a href="{link}">{link}</a>' for link in links)
+    return (f'<html><head><link rel="canonical" href="{canonical}"></head>'
+            f'<body>{anchors}</body></html>')
+
+
+def test_off_site_canonical_keeps_the_page(site):
+    # An apex crawl whose pages declare www. canonicals
+    site.add('/', canonical_page('https://www.example.com/', '/a', '/b'))
+    site.add('/a', canonical_page('https://www.example.com/a'))
+    site.add('/b', canonical_page('https://www.example.com/b'))
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False)
+
+    urls = generator.crawl_site()
+
+    assert urls == sorted([site.url, site.url + '/a', site.url + '/b'])
+    assert generator.crawl_stats['duplicates']['canonical'] == 0
+    assert not any('example.com' in path for path in site.requests)
+
+
+def test_on_site_canonical_is_left_out_and_crawled(site):
+    site.page('/', '/print/a')
+    site.add('/print/a', canonical_page(site.url + '/a'))
+    site.page('/a')
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False)
+
+    urls = generator.crawl_site()
+
+    assert urls == sorted([site.url, site.url + '/a'])
+    assert generator.crawl_stats['duplicates']['canonical'] == 1
+
+
+def test_pages_with_little_text_are_not_near_duplicates(site):
+    # Script-rendered shells: no text, or the same few words on every page
+    site.add('/', '<html><body><div id="app"></div><a href="/a">a</a> <a href="/b">b</a>'
+                  '<a href="/c">c</a> <a href="/d">d</a></body></html>')
+    site.add('/a', '<html><body><div id="app"></div><script>render()</script></body></html>')
+    site.add('/b', '<html><body><div id="app"></div><script>render()</script></body></html>')
+    site.add('/c', '<html><body><noscript>Enable JavaScript to run this app.</noscript></body></html>')
+    site.add('/d', '<html><body><noscript>Enable JavaScript to run this app.</noscript></body></html>')
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False,
+                                 dedupe_content=True)
+
+    urls = generator.crawl_site()
+
+    assert urls == sorted([site.url] + [site.url + path for path in ('/a', '/b', '/c', '/d')])
+    assert generator.crawl_stats['duplicates']['content'] == 0
+
+
+def test_near_duplicate_text_is_left_out(site):
+    article = ' '.join(f'word{n}' for n in range(60))
+    site.page('/', '/one', '/two')
+    site.add('/one', f'<html><body><p>{article}</p><p>Updated Monday</p></body></html>')
+    site.add('/two', f'<html><body><p>{article}</p><p>Updated Tuesday</p></body></html>')
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False,
+                                 dedupe_content=True, max_workers=1)
+
+    urls = generator.crawl_site()
+
+    assert len(urls) == 2
+    assert generator.crawl_stats['duplicates']['content'] == 1
@@ -0,0 +1,57 @@
+import threading
+
+import events
+from events import EventHub
+from sitemap_generator import SitemapGenerator
+
+
+def test_late_subscribers_get_recent_history():
+    hub = EventHub(history_size=2)
+    for n in range(3):
+        hub.publish('job', events.PROGRESS, {'n': n})
+
+    subscription = hub.subscribe('job')
+
+    assert [subscription.get(0).data['n'] for _ in range(2)] == [1, 2]
+    assert subscription.get(0) is None
+
+
+def test_slow_subscriber_drops_oldest_events():
+    hub = EventHub(buffer_size=2)
+    subscription = hub.subscribe('job')
+    for n in range(5):
+        hub.publish('job', events.PROGRESS, {'n': n})
+
+    assert subscription.dropped == 3
+    assert [subscription.get(0).data['n'] for _ in range(2)] == [3, 4]
+
+
+def test_stream_ends_when_the_topic_closes():
+    hub = EventHub()
+    subscription = hub.subscribe('job')
+    threading.Timer(0.05, hub.close_topic, ('job',)).start()
+    hub.publish('job', events.ERROR, {'message': 'boom'})
+
+    received = [event.type for event in subscription.events(timeout=1) if event is not None]
+
+    assert received == [events.ERROR, events.END]
+    assert subscription.closed
+
+
+def test_generator_publishes_crawl_events(site):
+    site.page('/', '/a')
+    site.page('/a')
+    hub = EventHub()
+    subscription = hub.subscribe('crawl')
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False,
+                                 event_sink=lambda event_type, data: hub.publish('crawl', event_type, data))
+
+    generator.crawl_site()
+    hub.close_topic('crawl')
+    received = [event for event in subscription.events(timeout=1) if event is not None]
+
+    types = [event.type for event in received]
+    assert types[0] == events.CRAWL_STARTED
+    assert types[-2:] == [events.CRAWL_FINISHED, events.END]
+    assert types.count(events.PAGE_FETCHED) == 2
+    assert received[-2].data['urls_found'] == 2
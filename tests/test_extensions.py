@@ -0,0 +1,49 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from sitemap_generator import SitemapGenerator
+from sitemap_writer import IMAGE_NS, SITEMAP_NS, XHTML_NS
+
+PAGE = '''<html><head>
+<link rel="alternate" hreflang="en" href="/">
+<link rel="alternate" hreflang="DE" href="/de/">
+<link rel="alternate" hreflang="de" href="/de/duplicate">
+</head><body>
+<a href="/de/">Deutsch</a>
+<img src="/img/a.png#zoom"><img src="/img/a.png"><img src="data:image/gif;base64,R0" data-src="/img/lazy.png">
+<img src="https://cdn.example.net/b.jpg"><img src="mailto:x@example.com">
+</body></html>'''
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_images_and_alternates_reach_the_sitemap(site, tmp_path, engine):
+    site.add('/', PAGE)
+    site.page('/de/')
+    generator = SitemapGenerator(site.url, delay=0, engine=engine, adaptive_rate=False, seed_sitemaps=False,
+                                 extensions=True)
+
+    urls = generator.crawl_site()
+    images, alternates = generator.get_page_media(site.url)
+
+    assert images == (site.url + '/img/a.png', site.url + '/img/lazy.png', 'https://cdn.example.net/b.jpg')
+    assert alternates == (('en', site.url), ('de', site.url + '/de'))
+    assert generator.get_page_media(site.url + '/de') == ((), ())
+    assert generator.crawl_stats['extensions'] == {'pages_with_images': 1, 'images': 3, 'pages_with_alternates': 1}
+
+    path = generator.generate_sitemap(urls, str(tmp_path / 'sitemap.xml'))
+    root = ET.parse(path).getroot()
+    [home] = [url for url in root.iter(f'{{{SITEMAP_NS}}}url') if url.find(f'{{{SITEMAP_NS}}}loc').text == site.url]
+    assert [loc.text for loc in home.iter(f'{{{IMAGE_NS}}}loc')] == list(images)
+    assert [(link.get('hreflang'), link.get('href')) for link in home.iter(f'{{{XHTML_NS}}}link')] == list(alternates)
+
+
+def test_extensions_are_off_by_default(site):
+    site.add('/', PAGE)
+    site.page('/de/')
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False)
+
+    generator.crawl_site()
+
+    assert generator.get_page_media(site.url) == ((), ())
+    assert 'extensions' not in generator.crawl_stats
@@ -0,0 +1,35 @@
+import pytest
+
+from sitemap_generator import SitemapGenerator
+
+
+@pytest.fixture
+def pages(site):
+    paths = [f'/page/{n}' for n in range(10)]
+    site.page('/', *paths)
+    for path in paths:
+        site.page(path)
+    return sorted([site.url] + [site.url + path for path in paths])
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_generator_crawls_again_after_early_close(site, pages, engine):
+    generator = SitemapGenerator(site.url, delay=0, engine=engine, adaptive_rate=False,
+                                 seed_sitemaps=False)
+
+    records = generator.iter_crawl(buffer=1)
+    next(records)
+    records.close()
+
+    assert not generator.cancelled
+    assert generator.crawl_site() == pages
+    assert sorted(record.url for record in generator.iter_crawl()) == pages
+
+
+def test_generator_crawls_again_after_cancel(site, pages):
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False)
+
+    generator.cancel()
+    assert generator.crawl_site() == []
+
+    assert generator.crawl_site() == pages
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from jobs import CANCELLED, COMPLETED, FAILED, FINISHED_STATES, JobConflict, JobManager, JobQueueFull
+
+
+def wait_finished(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.status not in FINISHED_STATES and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.status
+
+
+def test_jobs_with_the_same_key_do_not_overlap():
+    manager = JobManager(max_concurrent=2)
+    release = threading.Event()
+    first = manager.submit({'root_url': 'https://example.com'}, lambda job: release.wait(5) and {},
+                           key='crawl_state/example_com.journal')
+
+    with pytest.raises(JobConflict) as conflict:
+        manager.submit({'root_url': 'https://example.com'}, lambda job: {}, key='crawl_state/example_com.journal')
+    assert conflict.value.job is first
+    other = manager.submit({'root_url': 'https://example.org'}, lambda job: {}, key='crawl_state/example_org.journal')
+
+    release.set()
+    assert wait_finished(first) == COMPLETED
+    assert wait_finished(other) == COMPLETED
+
+
+def test_a_finished_job_frees_its_key():
+    manager = JobManager()
+    assert wait_finished(manager.submit({}, lambda job: {}, key='journal')) == COMPLETED
+
+    assert wait_finished(manager.submit({}, lambda job: {}, key='journal')) == COMPLETED
+
+
+def test_job_result_error_and_status_changes():
+    statuses = []
+    manager = JobManager(status_listener=lambda job: statuses.append((job.id, job.status)))
+
+    done = manager.submit({}, lambda job: {'url_count': 3})
+    failed = manager.submit({}, lambda job: 1 / 0)
+
+    assert wait_finished(done) == COMPLETED
+    assert done.url_count == 3
+    assert wait_finished(failed) == FAILED
+    assert failed.error == 'division by zero'
+    assert [status for job_id, status in statuses if job_id == done.id] == ['queued', 'running', 'completed']
+
+
+def test_cancel_queued_and_running_jobs():
+    manager = JobManager(max_concurrent=1)
+    running = manager.submit({}, lambda job: job.cancel_event.wait(5) and {})
+    queued = manager.submit({}, lambda job: {})
+
+    manager.cancel(queued.id)
+    manager.cancel(running.id)
+
+    assert wait_finished(running) == CANCELLED
+    assert wait_finished(queued) == CANCELLED
+    assert queued.started_at is None
+
+
+def test_full_queue_rejects_jobs():
+    manager = JobManager(max_concurrent=1, max_queued=1)
+    release = threading.Event()
+    running = manager.submit({}, lambda job: release.wait(5) and {})
+    while running.status != 'running':
+        time.sleep(0.01)
+    manager.submit({}, lambda job: {})
+
+    with pytest.raises(JobQueueFull):
+        manager.submit({}, lambda job: {})
+    release.set()
@@ -0,0 +1,50 @@
+import pytest
+
+from link_extractors import EXTRACTORS, decode_html, get_link_extractor
+
+PAGE = b'''<!DOCTYPE html>
+<html><head>
+<base href="/docs/">
+<link rel="canonical" href="https://example.com/docs/">
+<link rel="alternate" hreflang="de" href="/de/docs/">
+<style>a { background: url("/style.css") }</style>
+<script>var html = '<a href="/in-script">x</a>';</script>
+</head><body>
+<!-- <a href="/in-comment">x</a> -->
+<A HREF="/upper">Upper</A>
+<a class="nav" href='single?a=1&amp;b=2'>Single quotes, entity</a>
+<a href=unquoted>Unquoted</a>
+<a name="anchor-only">No href</a>
+<img src="data:image/png;base64,AAAA" data-src="/lazy.png">
+<img src="/photo.jpg" alt="">
+<a href="/caf\xc3\xa9">Caf\xc3\xa9</a>
+</body></html>'''
+
+
+@pytest.mark.parametrize('name', sorted(EXTRACTORS))
+def test_extractors_agree(name):
+    extracted = get_link_extractor(name).extract(PAGE, 'utf-8', extensions=True)
+
+    assert extracted.hrefs == ['/upper', 'single?a=1&b=2', 'unquoted', '/café']
+    assert extracted.base == '/docs/'
+    assert extracted.canonical == 'https://example.com/docs/'
+    assert extracted.images == ['/lazy.png', '/photo.jpg']
+    assert extracted.alternates == [('de', '/de/docs/')]
+
+
+@pytest.mark.parametrize('name', sorted(EXTRACTORS))
+def test_images_and_alternates_need_extensions(name):
+    extracted = get_link_extractor(name).extract(PAGE, 'utf-8')
+
+    assert extracted.images == [] and extracted.alternates == []
+
+
+def test_unknown_extractor():
+    with pytest.raises(ValueError):
+        get_link_extractor('regex')
+
+
+def test_decode_html_prefers_utf8():
+    assert decode_html('café'.encode('utf-8'), 'iso-8859-1') == 'café'
+    assert decode_html('café'.encode('latin-1'), None) == 'café'
+    assert decode_html('café'.encode('latin-1'), 'no-such-codec') == 'café'
@@ -0,0 +1,56 @@
+import re
+
+from metrics import Counter, CrawlMetrics, Histogram, MetricsRegistry
+from sitemap_generator import SitemapGenerator
+
+
+def sample(text, name):
+    match = re.search(rf'^{re.escape(name)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram('latency_seconds', "Latency.", ('phase',), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, ('fetch',))
+
+    text = registry.render()
+
+    assert '# TYPE latency_seconds histogram' in text
+    assert sample(text, 'latency_seconds_bucket{phase="fetch",le="0.1"}') == 1
+    assert sample(text, 'latency_seconds_bucket{phase="fetch",le="1"}') == 3
+    assert sample(text, 'latency_seconds_bucket{phase="fetch",le="+Inf"}') == 4
+    assert sample(text, 'latency_seconds_count{phase="fetch"}') == 4
+    assert sample(text, 'latency_seconds_sum{phase="fetch"}') == 4.05
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter('things_total', "Things.", ('name',)))
+    counter.inc(2, ('say "hi"\\\n',))
+
+    assert 'things_total{name="say \\"hi\\"\\\\\\n"} 2' in registry.render()
+
+
+def test_crawl_is_instrumented(site):
+    site.page('/', '/a', '/file.pdf', '/missing')
+    site.page('/a')
+    site.add('/file.pdf', '%PDF', content_type='application/pdf')
+    metrics = CrawlMetrics()
+    # Rules without the default skip_extensions, so the PDF is fetched and gated on its Content-Type
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False,
+                                 metrics=metrics, rules={'normalize': {}})
+
+    generator.crawl_site()
+    text = metrics.render()
+
+    assert sample(text, 'sitemap_pages_crawled_total') == 2
+    assert sample(text, 'sitemap_responses_total{status="200"}') == 3
+    assert sample(text, 'sitemap_responses_total{status="404"}') == 1
+    assert sample(text, 'sitemap_skipped_total{reason="content_type"}') == 1
+    assert sample(text, 'sitemap_skipped_total{reason="status"}') == 1
+    assert sample(text, 'sitemap_phase_seconds_count{phase="ttfb"}') == 4
+    assert sample(text, 'sitemap_phase_seconds_count{phase="parse"}') == 2
+    assert sample(text, 'sitemap_in_flight_requests') == 0
+    assert sample(text, 'sitemap_running_crawls') == 0
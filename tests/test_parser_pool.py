@@ -0,0 +1,41 @@
+from link_extractors import get_link_extractor
+from page_parser import ParserPool, parse_links
+from sitemap_generator import SitemapGenerator
+from url_rules import UrlRules
+
+ROOT = 'https://example.com'
+PAGE = ('<html><head><link rel="canonical" href="/a?utm_source=x">'
+        '<link rel="alternate" hreflang="fr" href="/fr/a"></head><body>'
+        + ' '.join(f'word{n}' for n in range(40))
+        + '<a href="/b#top">b</a><a href="https://other.org/">x</a><a href="/logo.png">l</a>'
+        '<img src="/cover.jpg"></body></html>').encode('utf-8')
+
+
+def test_pool_parses_like_the_crawl_threads():
+    rules = UrlRules.load(None, ROOT)
+    expected = parse_links(ROOT + '/a', PAGE, 'utf-8', get_link_extractor('fast'), rules,
+                           fingerprint=True, extensions=True)
+    pool = ParserPool(1, 'fast', rules, fingerprint=True, extensions=True)
+    try:
+        parsed = pool.parse(ROOT + '/a', PAGE, 'utf-8')
+    finally:
+        pool.shutdown()
+
+    assert parsed.links == expected.links == {ROOT + '/b'}
+    assert parsed.rejected == expected.rejected == 2
+    assert parsed.canonical == expected.canonical == ROOT + '/a'
+    assert parsed.fingerprint == expected.fingerprint is not None
+    assert parsed.images == expected.images == (ROOT + '/cover.jpg',)
+    assert parsed.alternates == expected.alternates == (('fr', ROOT + '/fr/a'),)
+
+
+def test_crawl_with_parse_workers(site):
+    paths = [f'/page/{n}' for n in range(6)]
+    site.page('/', *paths)
+    for path in paths:
+        site.page(path, '/')
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False,
+                                 parse_workers=2)
+
+    assert generator.crawl_site() == sorted([site.url] + [site.url + path for path in paths])
+    assert generator.parser_pool is None
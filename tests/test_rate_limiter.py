@@ -0,0 +1,39 @@
+import pytest
+
+from rate_limiter import AdaptiveRateController
+from sitemap_generator import SitemapGenerator
+
+URL = 'https://example.com/page'
+
+
+@pytest.mark.parametrize('delay, max_rate', [(0, 5), (0.1, 2)])
+def test_max_rate_caps_a_shorter_delay(site, delay, max_rate):
+    generator = SitemapGenerator(site.url, delay=delay, max_rate=max_rate)
+    controller = generator.rate_controller
+    url = site.url + '/page'
+
+    assert controller.interval(url) == 1 / max_rate
+    for _ in range(50):
+        controller.observe(url, 200, 0.01)
+    assert controller.interval(url) == 1 / max_rate
+    assert generator.request_interval(url) == 1 / max_rate
+
+
+def test_healthy_responses_raise_the_rate_up_to_the_ceiling():
+    controller = AdaptiveRateController(1.0, min_interval=0.25, window=10)
+
+    for _ in range(20):
+        controller.observe(URL, 200, 0.01)
+    assert controller.interval(URL) == 1 / 3
+    for _ in range(100):
+        controller.observe(URL, 200, 0.01)
+    assert controller.interval(URL) == 0.25
+
+
+def test_overload_halves_the_rate():
+    controller = AdaptiveRateController(0.5, min_interval=0.5)
+
+    controller.observe(URL, 503)
+
+    assert controller.interval(URL) == 1.0
+    assert controller.stats()['https://example.com']['reasons'] == {'503': 1}
@@ -0,0 +1,33 @@
+import requests
+
+import robots_cache
+from robots_cache import RobotsCache
+
+
+def test_server_error_disallows_host_until_refetched(site, monkeypatch):
+    site.add('/robots.txt', 'unavailable', status=503, content_type='text/plain')
+    cache = RobotsCache(requests.Session(), 'TestBot')
+
+    assert not cache.can_fetch(f"{site.url}/page")
+    assert site.requests.count('/robots.txt') == 1
+
+    site.add('/robots.txt', 'User-agent: *\nDisallow: /private\n', content_type='text/plain')
+    # Still within UNREACHABLE_TTL: the cached disallow-all applies
+    assert not cache.can_fetch(f"{site.url}/page")
+    assert site.requests.count('/robots.txt') == 1
+
+    now = robots_cache.time.monotonic()
+    monkeypatch.setattr(robots_cache.time, 'monotonic', lambda: now + robots_cache.UNREACHABLE_TTL + 1)
+    assert cache.can_fetch(f"{site.url}/page")
+    assert not cache.can_fetch(f"{site.url}/private/x")
+    assert site.requests.count('/robots.txt') == 2
+
+
+def test_unreachable_host_is_disallowed():
+    cache = RobotsCache(requests.Session(), 'TestBot', timeout=1)
+    assert not cache.can_fetch("http://127.0.0.1:9/page")
+
+
+def test_missing_robots_allows_everything(site):
+    cache = RobotsCache(requests.Session(), 'TestBot')
+    assert cache.can_fetch(f"{site.url}/anything")
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from rate_limiter import HostRateLimiter, TokenBucket
+from sitemap_generator import SitemapGenerator
+
+
+def tree(site, pages=20):
+    paths = [f'/section/{n}' for n in range(pages)]
+    site.page('/', *paths[:4])
+    for n, path in enumerate(paths):
+        site.page(path, *paths[4 * n + 4:4 * n + 8])
+    return sorted([site.url] + [site.url + path for path in paths])
+
+
+@pytest.mark.parametrize('scheduler', ['queue', 'batch'])
+def test_schedulers_crawl_every_page(site, scheduler):
+    urls = tree(site)
+    generator = SitemapGenerator(site.url, delay=0, scheduler=scheduler, adaptive_rate=False,
+                                 seed_sitemaps=False)
+
+    assert generator.crawl_site() == urls
+
+
+def test_queue_scheduler_stops_submitting_at_max_urls(site):
+    tree(site)
+    generator = SitemapGenerator(site.url, delay=0, max_urls=7, max_workers=4, adaptive_rate=False,
+                                 seed_sitemaps=False)
+
+    assert len(generator.crawl_site()) == 7
+    assert len([path for path in site.requests if path != '/robots.txt']) == 7
+
+
+def test_token_bucket_spaces_requests():
+    bucket = TokenBucket(0.05)
+
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[0] == 0
+    assert waits[1:] == pytest.approx([0.05, 0.1, 0.15], abs=0.01)
+
+
+def test_hosts_have_separate_buckets():
+    limiter = HostRateLimiter(10.0)
+
+    start = time.monotonic()
+    limiter.acquire('https://a.example.com/1')
+    limiter.acquire('https://b.example.com/1')
+
+    assert time.monotonic() - start < 1
+    assert limiter.bucket('https://A.example.com/2') is limiter.bucket('https://a.example.com/3')
@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from sitemap_catalog import SitemapCatalog
+from sitemap_writer import SitemapWriter
+
+
+def write(directory, filename, count, **options):
+    with SitemapWriter(str(directory / filename), **options) as writer:
+        for n in range(count):
+            writer.add(f'https://example.com/page/{n}')
+    return writer
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    directory = tmp_path / 'sitemaps'
+    directory.mkdir()
+    catalog = SitemapCatalog(str(directory), str(tmp_path / 'catalog.sqlite'))
+    yield catalog
+    catalog.close()
+
+
+def test_lists_sitemaps_found_in_the_directory(catalog, tmp_path):
+    directory = tmp_path / 'sitemaps'
+    write(directory, 'example_com_20240101_120000.xml', 5)
+    write(directory, 'example_com_20240301_120000.xml.gz', 30, compress=True, max_urls_per_file=10)
+    write(directory, 'example_org_20240201_120000.xml', 7)
+
+    entries, total = catalog.list()
+
+    assert total == 3
+    assert [entry['filename'] for entry in entries] == [
+        'example_com_20240301_120000.xml.gz', 'example_org_20240201_120000.xml', 'example_com_20240101_120000.xml']
+    split = entries[0]
+    assert (split['domain'], split['url_count'], split['parts'], split['compressed']) == ('example.com', 30, 3, True)
+    assert catalog.domains() == [('example.com', 2), ('example.org', 1)]
+
+
+def test_pages_sorting_and_domain_filter(catalog, tmp_path):
+    directory = tmp_path / 'sitemaps'
+    for day in range(1, 8):
+        write(directory, f'example_com_202401{day:02d}_120000.xml', day)
+
+    first, total = catalog.list(sort='urls', descending=False, page=1, per_page=3)
+    last, _ = catalog.list(sort='urls', descending=False, page=3, per_page=3)
+
+    assert total == 7
+    assert [entry['url_count'] for entry in first] == [1, 2, 3]
+    assert [entry['url_count'] for entry in last] == [7]
+    assert catalog.list(domain='example.org') == ([], 0)
+    with pytest.raises(ValueError):
+        catalog.list(sort='bytes; DROP TABLE sitemaps')
+
+
+def test_recorded_sitemaps_skip_the_directory_listing(catalog, tmp_path):
+    directory = tmp_path / 'sitemaps'
+    catalog.sync()
+    writer = write(directory, 'example_com_20240101_120000.xml', 25, max_urls_per_file=10)
+
+    catalog.record('example_com_20240101_120000.xml', 'example.com', '20240101_120000', 25,
+                   parts=len(writer.parts))
+
+    assert not catalog.sync()
+    entry = catalog.get('example_com_20240101_120000.xml')
+    assert entry['parts'] == 3
+    assert entry['bytes'] == sum(os.path.getsize(directory / name) for name in os.listdir(directory)
+                                 if not name.endswith('.idx'))
+
+
+def test_removed_files_leave_the_catalogue(catalog, tmp_path):
+    directory = tmp_path / 'sitemaps'
+    write(directory, 'example_com_20240101_120000.xml', 5)
+    assert catalog.list()[1] == 1
+
+    os.remove(directory / 'example_com_20240101_120000.xml')
+    os.remove(directory / 'example_com_20240101_120000.xml.idx')
+
+    assert catalog.list() == ([], 0)
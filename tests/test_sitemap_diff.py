@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+
+import pytest
+
+from sitemap_diff import SitemapDiff
+from sitemap_writer import SitemapWriter
+
+
+def write_sitemap(path, entries, **options):
+    with SitemapWriter(str(path), **options) as writer:
+        for url, priority in entries:
+            writer.add(url, priority=priority)
+    return writer.output_file
+
+
+@pytest.mark.parametrize('memory_budget', [64 * 1024 * 1024, 2000])
+def test_diff_of_split_sitemaps(tmp_path, caplog, memory_budget):
+    old = {f'https://example.com/page/{n}': '0.5' for n in range(300)}
+    new = {url: priority for url, priority in old.items() if not url.endswith(('/1', '/7'))}
+    new['https://example.com/page/42'] = '0.8'
+    new['https://example.com/new'] = '0.3'
+    # Written in different orders and splits; a small budget sorts through several runs
+    old_file = write_sitemap(tmp_path / 'old.xml', sorted(old.items(), reverse=True),
+                             max_urls_per_file=70)
+    new_file = write_sitemap(tmp_path / 'new.xml.gz', new.items(), compress=True,
+                             max_urls_per_file=120)
+
+    caplog.set_level(logging.INFO, logger='sitemap_diff')
+    diff = SitemapDiff(old_file, new_file, memory_budget=memory_budget, temp_dir=str(tmp_path))
+    changes = list(diff.changes())
+
+    assert changes == [
+        {'change': 'added', 'url': 'https://example.com/new', 'priority': '0.3'},
+        {'change': 'removed', 'url': 'https://example.com/page/1', 'priority': '0.5'},
+        {'change': 'changed', 'url': 'https://example.com/page/42',
+         'old_priority': '0.5', 'new_priority': '0.8'},
+        {'change': 'removed', 'url': 'https://example.com/page/7', 'priority': '0.5'},
+    ]
+    assert diff.stats() == {'added': 1, 'removed': 2, 'changed': 1, 'unchanged': 297}
+    assert ('sorted runs' in caplog.text) == (memory_budget < 64 * 1024 * 1024)
+    assert not any(path.name.startswith('sitemap-diff-') for path in tmp_path.iterdir())
+
+
+def test_diff_endpoint_compares_a_domains_two_newest_sitemaps(client):
+    old_name = 'diff_example_com_20240101_120000.xml'
+    new_name = 'diff_example_com_20240201_120000.xml.gz'
+    paths = [write_sitemap(os.path.join('last_work', old_name), [('https://diff.example.com/a', '0.5'),
+                                                                  ('https://diff.example.com/b', '0.5')]),
+             write_sitemap(os.path.join('last_work', new_name), [('https://diff.example.com/b', '0.9'),
+                                                                  ('https://diff.example.com/c', '0.5')],
+                           compress=True)]
+    try:
+        response = client.get('/api/sitemaps/diff?domain=diff.example.com')
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    finally:
+        for path in paths:
+            os.remove(path)
+            os.remove(path + '.idx')
+
+    assert response.mimetype == 'application/x-ndjson'
+    assert lines == [
+        {'old': old_name, 'new': new_name},
+        {'change': 'removed', 'url': 'https://diff.example.com/a', 'priority': '0.5'},
+        {'change': 'changed', 'url': 'https://diff.example.com/b', 'old_priority': '0.5', 'new_priority': '0.9'},
+        {'change': 'added', 'url': 'https://diff.example.com/c', 'priority': '0.5'},
+        {'summary': {'added': 1, 'removed': 1, 'changed': 1, 'unchanged': 0}},
+    ]
+    assert client.get('/api/sitemaps/diff').status_code == 400
@@ -0,0 +1,26 @@
+import pytest
+
+from sitemap_generator import SitemapGenerator
+
+
+@pytest.mark.parametrize('engine', ['threads', 'async'])
+def test_pages_gone_since_the_previous_sitemap_are_dropped(site, tmp_path, engine):
+    site.page('/', '/about')
+    site.page('/about')
+    site.page('/orphan')
+    site.add('/down', '<html><body>Maintenance</body></html>', status=500)
+    previous = tmp_path / 'sitemap.xml'
+    previous.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        + ''.join(f'<url><loc>{site.url}{path}</loc></url>\n'
+                  for path in ('/', '/about', '/orphan', '/gone-page', '/down'))
+        + '</urlset>\n')
+    generator = SitemapGenerator(site.url, delay=0, engine=engine, adaptive_rate=False,
+                                 seed_sitemaps=False, seed_files=[str(previous)],
+                                 max_retries=0)
+
+    urls = generator.crawl_site()
+
+    assert urls == sorted(site.url + path for path in ('', '/about', '/orphan'))
+    assert '/gone-page' in site.requests and '/down' in site.requests
@@ -0,0 +1,63 @@
+import gzip
+import os
+
+import pytest
+
+from sitemap_writer import SitemapWriter
+
+NAME = 'views_example_com_20240101_120000.xml.gz'
+
+
+@pytest.fixture
+def saved_sitemap(client):
+    """A gzipped sitemap of 250 URLs in the app's upload folder."""
+    with SitemapWriter(os.path.join('last_work', NAME), compress=True, urls_per_member=30) as writer:
+        for n in range(250):
+            writer.add(f'https://views.example.com/page/{n}', lastmod='2024-01-01')
+    yield os.path.join('last_work', NAME)
+    for path in (writer.output_file, writer.output_file + '.idx'):
+        os.remove(path)
+
+
+def test_download_is_conditional_and_range_capable(client, saved_sitemap):
+    with open(saved_sitemap, 'rb') as f:
+        stored = f.read()
+
+    response = client.get(f'/download/{NAME}')
+    assert response.status_code == 200 and response.data == stored
+    etag = response.headers['ETag']
+
+    assert client.get(f'/download/{NAME}', headers={'If-None-Match': etag}).status_code == 304
+    partial = client.get(f'/download/{NAME}', headers={'Range': 'bytes=10-19'})
+    assert partial.status_code == 206 and partial.data == stored[10:20]
+
+
+def test_view_sends_gzip_as_stored_or_decompressed(client, saved_sitemap):
+    with open(saved_sitemap, 'rb') as f:
+        stored = f.read()
+
+    compressed = client.get(f'/view/{NAME}/x', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.data == stored
+
+    plain = client.get(f'/view/{NAME}/x', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Accept-Ranges'] == 'none'
+    assert plain.data == gzip.decompress(stored)
+    assert client.get(f'/view/{NAME}/x', headers={'Accept-Encoding': 'identity',
+                                                  'If-None-Match': plain.headers['ETag']}).status_code == 304
+
+
+def test_url_pages(client, saved_sitemap):
+    body = client.get(f'/api/sitemaps/{NAME}/urls?start=95&count=10').get_json()
+
+    assert body['total'] == 250
+    assert [entry['loc'] for entry in body['urls']] == [f'https://views.example.com/page/{n}' for n in range(95, 105)]
+    assert client.get(f'/api/sitemaps/{NAME}/urls?count=5000').status_code == 400
+    assert client.get(f'/sitemaps/{NAME}/urls?start=240').status_code == 200
+
+
+@pytest.mark.parametrize('path', ['/download/..%2Fapp.py', '/download/missing.xml', '/view/app.py/x',
+                                  '/api/sitemaps/missing.xml/urls'])
+def test_unknown_files_are_not_served(client, path):
+    assert client.get(path).status_code == 404
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from sitemap_reader import count_urls, index_parts, iter_entries, read_urls
+from sitemap_seeds import SITEMAP, iter_sitemap, open_sitemap_stream
+from sitemap_writer import SitemapWriter
+
+
+def urls(count: int):
+    return [f'https://example.com/page/{n}' for n in range(count)]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_split_sitemap_round_trip(tmp_path, compress):
+    writer = SitemapWriter(str(tmp_path / 'sitemap.xml'), compress=compress,
+                           base_url='https://example.com/sitemaps', max_urls_per_file=100,
+                           urls_per_member=30)
+    for n, url in enumerate(urls(250)):
+        writer.add(url, lastmod='2024-01-01', priority=f'0.{n % 10}')
+    path = writer.close()
+
+    assert path.endswith('.xml.gz' if compress else '.xml')
+    assert writer.index_file == path
+    assert len(writer.parts) == 3
+    assert index_parts(path) == writer.parts
+    with open(path, 'rb') as f:
+        locs = [loc for kind, loc in iter_sitemap(open_sitemap_stream(f)) if kind == SITEMAP]
+    assert locs == ['https://example.com/sitemaps/' + os.path.basename(part) for part in writer.parts]
+    assert count_urls(path) == (250, 3)
+    assert [count_urls(part)[0] for part in writer.parts] == [100, 100, 50]
+
+    entries = list(iter_entries(path))
+    assert [entry['loc'] for entry in entries] == urls(250)
+    assert entries[42] == {'loc': urls(250)[42], 'lastmod': '2024-01-01', 'priority': '0.2'}
+    # Across a part boundary and from the middle of a gzip member
+    assert [entry['loc'] for entry in read_urls(path, 95, 10)] == urls(250)[95:105]
+    assert [entry['loc'] for entry in read_urls(path, 245, 10)] == urls(250)[245:]
+
+
+def test_single_part_is_written_under_the_output_name(tmp_path):
+    with SitemapWriter(str(tmp_path / 'sitemap.xml'), max_urls_per_file=100, urls_per_member=30) as writer:
+        for url in urls(100):
+            writer.add(url)
+
+    assert writer.parts == [str(tmp_path / 'sitemap.xml')]
+    assert writer.index_file is None
+    assert index_parts(writer.output_file) is None
+    assert sorted(os.listdir(tmp_path)) == ['sitemap.xml', 'sitemap.xml.idx']
+    assert count_urls(writer.output_file) == (100, 1)
+    assert [entry['loc'] for entry in read_urls(writer.output_file, 61, 5)] == urls(100)[61:66]
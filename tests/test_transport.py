@@ -0,0 +1,20 @@
+from sitemap_generator import SitemapGenerator
+
+
+def test_reused_generator_counts_each_crawls_own_requests(site):
+    paths = [f'/page/{n}' for n in range(5)]
+    site.page('/', *paths)
+    for path in paths:
+        site.page(path)
+    generator = SitemapGenerator(site.url, delay=0, adaptive_rate=False, seed_sitemaps=False)
+
+    generator.crawl_site()
+    first = generator.crawl_stats['transport']
+    generator.crawl_site()
+    second = generator.crawl_stats['transport']
+
+    # The first crawl also fetched robots.txt, which stays cached for the second
+    assert first['requests'] == 7
+    assert second['requests'] == 6
+    assert second['connections_opened'] + second['connections_reused'] == 6
+    assert second['connections_opened'] <= first['connections_opened']
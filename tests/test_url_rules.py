@@ -0,0 +1,94 @@
+import random
+import re
+from urllib.parse import urlsplit
+
+import pytest
+
+from url_rules import PrefixTrie, UrlRules
+
+ROOT = 'https://example.com'
+
+
+def reference_match(config, url):
+    """First rule, in config order, that matches ``url`` (the rule engine's documented semantics)."""
+    lowered = url.lower()
+    for index, rule in enumerate(config['rules']):
+        if 'prefix' in rule:
+            prefix = rule['prefix'].lower()
+            target = lowered if '://' in prefix else urlsplit(lowered).path
+            if target.startswith(prefix):
+                return index
+        elif re.search(rule['pattern'], url, re.IGNORECASE):
+            return index
+    return None
+
+
+def test_compiled_rules_match_in_config_order():
+    rng = random.Random(7)
+    words = ['shop', 'shoes', 'sh', 'blog', 'Blog', 'item', 'items', 'a', 'ab']
+    rules = []
+    for n in range(40):
+        path = '/' + '/'.join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+        kind = rng.random()
+        if kind < 0.4:
+            rules.append({'prefix': path, 'priority': str(n)})
+        elif kind < 0.7:
+            rules.append({'prefix': ROOT + path, 'priority': str(n)})
+        else:
+            rules.append({'pattern': re.escape(path) + '($|/)', 'priority': str(n)})
+    config = {'rules': rules, 'normalize': {'keep_query': []}}
+    compiled = UrlRules(config, ROOT)
+
+    for _ in range(2000):
+        url = ROOT + '/' + '/'.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        assert compiled.match(url) == reference_match(config, url), url
+
+
+def test_classify_root_default_and_rules():
+    rules = UrlRules({
+        'root': {'priority': '1.0', 'changefreq': 'daily'},
+        'rules': [{'pattern': '/product/', 'priority': '0.8', 'changefreq': 'monthly'}],
+        'default': {'priority': '0.5', 'changefreq': 'weekly'},
+    }, ROOT)
+
+    assert rules.classify(rules.root_url) == ('1.0', 'daily')
+    assert rules.classify(ROOT + '/product/1') == ('0.8', 'monthly')
+    assert rules.classify(ROOT + '/about') == ('0.5', 'weekly')
+
+
+@pytest.mark.parametrize('url, allowed', [
+    (ROOT + '/page', True),
+    ('https://other.com/page', False),
+    ('ftp://example.com/file', False),
+    (ROOT + '/logo.PNG', False),
+    (ROOT + '/admin/users', False),
+    (ROOT + '/blog/post', True),
+    (ROOT + '/shop/item', False),
+])
+def test_filters(url, allowed):
+    rules = UrlRules({'skip_extensions': ['png'], 'exclude': ['/admin/'], 'include': ['/blog/', '/page$']},
+                     ROOT)
+
+    assert rules.is_allowed(url) is allowed
+
+
+def test_include_never_filters_the_root():
+    rules = UrlRules({'include': ['/blog/']}, ROOT)
+
+    assert rules.is_allowed(rules.root_url)
+
+
+def test_rule_without_prefix_or_pattern_is_rejected():
+    with pytest.raises(ValueError):
+        UrlRules({'rules': [{'priority': '0.5'}]}, ROOT)
+
+
+def test_prefix_trie_returns_the_lowest_value_of_all_matching_prefixes():
+    trie = PrefixTrie()
+    trie.add('/shop/shoes', 0)
+    trie.add('/shop', 2)
+    trie.add('/sh', 1)
+
+    assert trie.best_match('/shop/shoes/red') == 0
+    assert trie.best_match('/shop/hats') == 1
+    assert trie.best_match('/blog') is None
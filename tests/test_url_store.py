@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from url_store import HashSet, ScalableBloomFilter, UrlFrontier, UrlList, UrlStore, url_digest
+
+ROOT = 'https://example.com'
+
+
+def test_hash_set_is_exact_across_resizes():
+    seen = HashSet(capacity=16)
+    digests = [url_digest(f'{ROOT}/page/{n}') for n in range(20000)]
+
+    assert all(seen.add(digest) for digest in digests)
+    assert not any(seen.add(digest) for digest in digests)
+    assert len(seen) == 20000
+    assert url_digest(ROOT + '/other') not in seen
+
+
+def test_scalable_bloom_filter_stays_near_its_error_rate():
+    bloom = ScalableBloomFilter(error_rate=1e-3, initial_capacity=1000)
+    for n in range(10000):
+        bloom.add(url_digest(f'{ROOT}/page/{n}'))
+
+    assert all(url_digest(f'{ROOT}/page/{n}') in bloom for n in range(10000))
+    false_positives = sum(url_digest(f'{ROOT}/other/{n}') in bloom for n in range(20000))
+    assert false_positives / 20000 < 2e-3
+
+
+def test_frontier_keeps_fifo_order_through_the_spill_file(tmp_path):
+    frontier = UrlFrontier(memory_budget=256, spill_dir=str(tmp_path), prefix=ROOT)
+    rng = random.Random(3)
+    urls = [f'{ROOT}/page/{n}' if n % 5 else f'https://cdn.example.net/{n}' for n in range(500)]
+    expected = []
+    popped = []
+    for url in urls:
+        frontier.append(url)
+        expected.append(url)
+        # Interleave pops so reads and spill writes overlap
+        if rng.random() < 0.3:
+            popped.append(frontier.popleft())
+    while frontier:
+        popped.append(frontier.popleft())
+
+    assert popped == expected
+    assert frontier.spilled > 0
+    with pytest.raises(IndexError):
+        frontier.popleft()
+    frontier.close()
+
+
+def test_url_list_stores_origin_relative_urls():
+    urls = UrlList(ROOT)
+    for url in (ROOT, ROOT + '/a', 'https://example.com.evil.org/x', 'https://other.org/'):
+        urls.append(url)
+
+    assert list(urls) == [ROOT, ROOT + '/a', 'https://example.com.evil.org/x', 'https://other.org/']
+    assert urls.nbytes < sum(len(url) + 1 for url in urls)
+
+
+@pytest.mark.parametrize('seen_filter', ['exact', 'bloom'])
+def test_store_queues_each_url_once(seen_filter):
+    store = UrlStore(ROOT, seen_filter=seen_filter)
+
+    assert store.extend([ROOT, ROOT + '/a', ROOT + '/a', ROOT + '/b']) == 3
+    assert not store.add(ROOT + '/b')
+    store.add_crawled(store.pop())
+    store.mark_done(store.pop())
+
+    assert store.pending == 1
+    assert store.crawled_urls() == [ROOT]
+    assert store.stats()['seen'] == 3
+
+
+def test_unknown_seen_filter():
+    with pytest.raises(ValueError):
+        UrlStore(ROOT, seen_filter='cuckoo')
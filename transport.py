@@ -0,0 +1,289 @@
+import random
+import threading
+import time
+import logging
+import weakref
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Collection, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import MaxRetryError
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+
+logger = logging.getLogger(__name__)
+
+# Transient statuses worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Every encoding urllib3 can decode here: gzip and deflate, plus br/zstd when their packages are installed
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding'].replace(',', ', ')
+
+
+class RetryPolicy:
+    def __init__(self, retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30.0,
+                 statuses: Collection[int] = RETRY_STATUSES, max_retry_after: float = 120.0):
+        """
+        When and how long to wait before retrying a failed request.
+
+        The n-th retry waits ``backoff_factor * 2 ** (n - 1)`` seconds, capped
+        at ``max_backoff``, of which a random half is jitter so that workers
+        that failed together do not retry together. A ``Retry-After`` header
+        on the response replaces the backoff, up to ``max_retry_after``.
+
+        Args:
+            retries: Retries after the first attempt (default: 3, 0 disables retries)
+            backoff_factor: Base backoff in seconds (default: 0.5)
+            max_backoff: Longest backoff in seconds (default: 30)
+            statuses: Response statuses that are retried (default: RETRY_STATUSES)
+            max_retry_after: Longest Retry-After wait honoured, in seconds (default: 120)
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to wait before the ``retry``-th retry (1-based)."""
+        ceiling = min(self.max_backoff, self.backoff_factor * 2 ** (retry - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header (seconds or an HTTP date) into a capped wait, or None."""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            seconds = float(value)
+        else:
+            try:
+                when = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            seconds = (when - datetime.now(timezone.utc)).total_seconds()
+        return min(max(seconds, 0.0), self.max_retry_after)
+
+
+class TransportStats:
+    def __init__(self):
+        """Thread-safe counters of retries and connection reuse, shared by every request of a crawl."""
+        self._lock = threading.Lock()
+        # Requests and connections of each connection pool that are counted already
+        self._pool_counts: "weakref.WeakKeyDictionary[Any, Tuple[int, int]]" = weakref.WeakKeyDictionary()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero the counters for a new crawl; pool usage recorded so far is not counted again."""
+        with self._lock:
+            self.retries = 0
+            self.retries_by_reason: Dict[str, int] = {}
+            self.retry_after_waits = 0
+            self.retry_wait_seconds = 0.0
+            self.gave_up = 0
+            self.connections_opened = 0
+            self.connections_reused = 0
+
+    def record_retry(self, reason: str) -> None:
+        with self._lock:
+            self.retries += 1
+            self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+
+    def record_wait(self, seconds: float, retry_after: bool) -> None:
+        with self._lock:
+            self.retry_wait_seconds += seconds
+            if retry_after:
+                self.retry_after_waits += 1
+
+    def record_gave_up(self) -> None:
+        with self._lock:
+            self.gave_up += 1
+
+    def record_connections(self, opened: int, reused: int) -> None:
+        with self._lock:
+            self.connections_opened += opened
+            self.connections_reused += reused
+
+    def record_pool(self, pool, requests_sent: int, connections: int) -> None:
+        """Count a connection pool's cumulative requests and connections since it was last recorded."""
+        with self._lock:
+            counted_requests, counted_connections = self._pool_counts.get(pool, (0, 0))
+            self._pool_counts[pool] = (requests_sent, connections)
+            opened = connections - counted_connections
+            self.connections_opened += opened
+            self.connections_reused += requests_sent - counted_requests - opened
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            requests_sent = self.connections_opened + self.connections_reused
+            return {
+                'requests': requests_sent,
+                'connections_opened': self.connections_opened,
+                'connections_reused': self.connections_reused,
+                'reuse_rate': round(self.connections_reused / requests_sent, 3) if requests_sent else 0.0,
+                'retries': self.retries,
+                'retries_by_reason': dict(self.retries_by_reason),
+                'retry_after_waits': self.retry_after_waits,
+                'retry_wait_seconds': round(self.retry_wait_seconds, 2),
+                'gave_up': self.gave_up,
+            }
+
+
+def _pool_origin(pool) -> str:
+    """scheme://host[:port] of a urllib3 connection pool, without the scheme's default port."""
+    if pool.port is None or pool.port == DEFAULT_PORTS.get(pool.scheme):
+        return f"{pool.scheme}://{pool.host}"
+    return f"{pool.scheme}://{pool.host}:{pool.port}"
+
+
+def _reason(response, error) -> str:
+    if response is not None and response.status:
+        return str(response.status)
+    return type(error).__name__ if error is not None else 'unknown'
+
+
+class CountingRetry(Retry):
+    """urllib3 Retry that uses a RetryPolicy for its waits and records every retry in TransportStats."""
+
+    policy: RetryPolicy
+    stats: TransportStats
+    on_retry: Optional[Callable[[str, Optional[int]], None]] = None
+
+    @classmethod
+    def from_policy(cls, policy: RetryPolicy, stats: TransportStats,
+                    on_retry: Optional[Callable[[str, Optional[int]], None]] = None) -> "CountingRetry":
+        retry = cls(
+            total=policy.retries,
+            status_forcelist=policy.statuses,
+            backoff_factor=policy.backoff_factor,
+            # Give up with the last response so callers see the real status
+            raise_on_status=False,
+        )
+        retry.policy = policy
+        retry.stats = stats
+        retry.on_retry = on_retry
+        return retry
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.policy = self.policy
+        retry.stats = self.stats
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        try:
+            retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        except MaxRetryError:
+            self.stats.record_gave_up()
+            raise
+        if self.on_retry is not None and _pool is not None:
+            self.on_retry(_pool_origin(_pool), response.status if response is not None else None)
+        self.stats.record_retry(_reason(response, error))
+        logger.info(f"Retrying {url} ({_reason(response, error)}), attempt {len(retry.history) + 1}")
+        return retry
+
+    def get_backoff_time(self) -> float:
+        return self.policy.backoff(len(self.history)) if self.history else 0.0
+
+    def get_retry_after(self, response) -> Optional[float]:
+        return self.policy.retry_after(response.headers.get('Retry-After'))
+
+    def sleep(self, response=None) -> None:
+        wait = None
+        if response is not None and self.respect_retry_after_header:
+            wait = self.get_retry_after(response)
+        from_header = wait is not None
+        if wait is None:
+            wait = self.get_backoff_time()
+        self.stats.record_wait(wait, from_header)
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _timed_connection(connection_cls, on_connect: Callable[[float], None]):
+    class TimedConnection(connection_cls):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            on_connect(time.perf_counter() - start)
+
+    return TimedConnection
+
+
+class CrawlAdapter(HTTPAdapter):
+    def __init__(self, on_connect: Optional[Callable[[float], None]] = None, **kwargs):
+        """HTTPAdapter that reports how long each new connection took to open (DNS, TCP and TLS)."""
+        self.on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        if self.on_connect is not None:
+            self.poolmanager.pool_classes_by_scheme = {
+                'http': type('TimedHTTPConnectionPool', (HTTPConnectionPool,), {
+                    'ConnectionCls': _timed_connection(HTTPConnection, self.on_connect)}),
+                'https': type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,), {
+                    'ConnectionCls': _timed_connection(HTTPSConnection, self.on_connect)}),
+            }
+
+
+def create_session(user_agent: str, pool_size: int, per_host_connections: int,
+                   policy: RetryPolicy, stats: TransportStats,
+                   on_retry: Optional[Callable[[str, Optional[int]], None]] = None,
+                   on_connect: Optional[Callable[[float], None]] = None) -> requests.Session:
+    """
+    Build a keep-alive requests session for crawling.
+
+    Args:
+        user_agent: User-Agent header
+        pool_size: Number of hosts whose connection pools are kept open
+        per_host_connections: Open connections per host; further requests wait for one
+        policy: Retry policy for connection errors and transient statuses
+        stats: Collects retry counts
+        on_retry: Called with the origin URL and the status (None for a connection
+                  error) of every failed attempt that is retried
+        on_connect: Called with the seconds each new connection took to open
+    """
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': user_agent,
+        'Accept': 'text/html,application/xhtml+xml',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': ACCEPT_ENCODING,
+    })
+    adapter = CrawlAdapter(
+        on_connect=on_connect,
+        pool_connections=pool_size,
+        pool_maxsize=per_host_connections,
+        # Wait for a free connection instead of opening one that is thrown away afterwards
+        pool_block=True,
+        max_retries=CountingRetry.from_policy(policy, stats, on_retry),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def record_session_connections(session: requests.Session, stats: TransportStats) -> None:
+    """
+    Add the requests and connections of a session's still-open connection pools to ``stats``.
+
+    Only what the pools did since they were last recorded is added, so a
+    session that outlives a crawl is not counted twice.
+    """
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                stats.record_pool(pool, pool.num_requests, pool.num_connections)
@@ -0,0 +1,169 @@
+import re
+from fnmatch import fnmatchcase
+from urllib.parse import quote, unquote_plus, urlsplit
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Query parameters that never change a page's content: campaign tags, click ids and session ids
+TRACKING_PARAMS = ("utm_*", "gclid", "dclid", "fbclid", "msclkid", "yclid", "mc_cid", "mc_eid", "_ga", "_gl",
+                   "sessionid", "sid", "phpsessid", "jsessionid", "aspsessionid*", "cfid", "cftoken")
+
+_UNRESERVED = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+_ESCAPE_RE = re.compile(r'%([0-9A-Fa-f]{2})')
+_STRAY_PERCENT_RE = re.compile(r'%(?![0-9A-Fa-f]{2})')
+_ESCAPED_CLEAN_RE = re.compile(r"(?:[A-Za-z0-9/:@!$&'()*+,;=\-._~]|%[0-9A-Fa-f]{2})*")
+# Session ids carried as path parameters, e.g. /cart;jsessionid=0A1B
+_PATH_SESSION_RE = re.compile(r';(?:jsessionid|phpsessid|sid)=[^/]*', re.IGNORECASE)
+# Characters that may appear unescaped in a path (RFC 3986 pchar and "/") or a query parameter
+_PATH_SAFE = "/:@!$&'()*+,;=-._~%"
+_QUERY_SAFE = "/?:@!$'()*+,;=-._~%"
+_PATH_CLEAN_RE = re.compile(r"[A-Za-z0-9/:@!$&'()*+,;=\-._~]*")
+# Escapes that normalization changes: lower-case hex digits, or an unreserved character
+_ESCAPE_FIX_RE = re.compile(r'%(?:[0-9A-Fa-f][a-f]|[a-f][0-9A-F]|2[DE]|3[0-9]|4[1-9A-F]|5[0-9AF]|6[1-9A-F]|7[0-9AE])')
+
+
+def _unescape(match: "re.Match") -> str:
+    value = int(match.group(1), 16)
+    return chr(value) if value in _UNRESERVED else '%' + match.group(1).upper()
+
+
+def normalize_escapes(component: str, safe: str) -> str:
+    """
+    Bring a path or query component to one percent-encoded form.
+
+    Escapes of unreserved characters are decoded, all other escapes get
+    upper-case hex, and characters that must be escaped (spaces, non-ASCII
+    text, a ``%`` not starting an escape) are UTF-8 percent-encoded.
+    """
+    if _PATH_CLEAN_RE.fullmatch(component):
+        return component
+    if _ESCAPED_CLEAN_RE.fullmatch(component) and not _ESCAPE_FIX_RE.search(component):
+        # Only well-formed escapes, all in normal form already
+        return component
+    component = _STRAY_PERCENT_RE.sub('%25', component)
+    component = quote(component, safe=safe)
+    return _ESCAPE_RE.sub(_unescape, component)
+
+
+def remove_dot_segments(path: str) -> str:
+    """Resolve ``.`` and ``..`` segments of an absolute path (RFC 3986, section 5.2.4)."""
+    if '.' not in path:
+        return path
+    segments = path.split('/')
+    if '.' not in segments and '..' not in segments:
+        return path
+    output = []
+    for segment in segments[1:]:
+        if segment == '..':
+            if output:
+                output.pop()
+        elif segment != '.':
+            output.append(segment)
+    if segments[-1] in ('.', '..'):
+        output.append('')
+    return '/' + '/'.join(output)
+
+
+class UrlNormalizer:
+    def __init__(self, root_url: Optional[str] = None, keep_query: Iterable[str] = (),
+                 drop_query: Iterable[str] = TRACKING_PARAMS, unify_scheme: bool = True):
+        """
+        Reduce the aliases of a page's URL to one form, so duplicates are caught before they are fetched.
+
+        Lower-cases the scheme and host, drops default ports, the fragment,
+        session path parameters, ``.``/``..`` segments and the trailing slash,
+        and brings percent-encoding to one form. Query parameters are kept
+        only if they match ``keep_query`` and not ``drop_query`` (shell-style
+        patterns, case-insensitive), then sorted, so parameter order does not
+        create aliases either.
+
+        Args:
+            root_url: Root URL of the crawl; with ``unify_scheme`` its host is always given
+                      the root's scheme, so http and https copies of a page are one URL
+                      (default: None)
+            keep_query: Patterns of query parameters that select different content, e.g.
+                        "page" or "*" for all (default: none, every query is dropped)
+            drop_query: Patterns of query parameters dropped even if kept by ``keep_query``
+                        (default: TRACKING_PARAMS)
+            unify_scheme: Map http and https URLs of the root's host to the root's scheme
+                          (default: True)
+        """
+        self.keep_query = tuple(pattern.lower() for pattern in keep_query)
+        self.drop_query = tuple(pattern.lower() for pattern in drop_query)
+        self.root_host: Optional[str] = None
+        self.root_scheme: Optional[str] = None
+        if root_url is not None and unify_scheme:
+            root_scheme, root_host, _, _ = self._split(root_url)
+            if root_scheme in DEFAULT_PORTS:
+                self.root_scheme = root_scheme
+                self.root_host = root_host
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], root_url: Optional[str] = None) -> "UrlNormalizer":
+        """Build a normalizer from the ``normalize`` section of a URL rules config."""
+        return cls(root_url,
+                   keep_query=config.get("keep_query", ()),
+                   drop_query=config.get("drop_query", TRACKING_PARAMS),
+                   unify_scheme=config.get("unify_scheme", True))
+
+    @staticmethod
+    def _split(url: str) -> Tuple[str, str, str, str]:
+        """Return the normalized scheme and netloc, and the raw path and query of ``url``."""
+        parsed = urlsplit(url.strip())
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc
+        if not netloc:
+            return scheme, '', parsed.path, parsed.query
+
+        userinfo, _, hostport = netloc.rpartition('@')
+        host, port = hostport, ''
+        if not hostport.endswith(']') and ':' in hostport:
+            host, _, port = hostport.rpartition(':')
+        host = host.lower().rstrip('.')
+        if not host.isascii():
+            try:
+                host = host.encode('idna').decode('ascii')
+            except UnicodeError:
+                pass
+        if port and (not port.isdigit() or int(port) == DEFAULT_PORTS.get(scheme)):
+            port = ''
+        netloc = f"{userinfo}@{host}" if userinfo else host
+        if port:
+            netloc += f":{int(port)}"
+        return scheme, netloc, parsed.path, parsed.query
+
+    def _keeps(self, name: str) -> bool:
+        name = unquote_plus(name).lower()
+        if not any(fnmatchcase(name, pattern) for pattern in self.keep_query):
+            return False
+        return not any(fnmatchcase(name, pattern) for pattern in self.drop_query)
+
+    def normalize_query(self, query: str) -> str:
+        """Return the kept parameters of a query string, normalized and sorted."""
+        if not query or not self.keep_query:
+            return ''
+        params = []
+        for param in query.split('&'):
+            if not param:
+                continue
+            name = param.split('=', 1)[0]
+            if self._keeps(name):
+                params.append(normalize_escapes(param, _QUERY_SAFE))
+        params.sort()
+        return '&'.join(params)
+
+    def normalize(self, url: str) -> str:
+        """Return the normalized form of an absolute URL."""
+        scheme, netloc, path, query = self._split(url)
+        if self.root_host is not None and netloc == self.root_host and scheme in DEFAULT_PORTS:
+            scheme = self.root_scheme
+
+        if ';' in path:
+            path = _PATH_SESSION_RE.sub('', path)
+        path = remove_dot_segments(normalize_escapes(path, _PATH_SAFE)).rstrip('/')
+        query = self.normalize_query(query)
+        if query:
+            return f"{scheme}://{netloc}{path}?{query}"
+        return f"{scheme}://{netloc}{path}"
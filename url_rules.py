@@ -0,0 +1,238 @@
+import json
+import re
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from url_normalizer import TRACKING_PARAMS, UrlNormalizer
+
+
+# Rules matching the crawler's previous hard-coded behaviour
+DEFAULT_RULES: Dict[str, Any] = {
+    "skip_extensions": ["jpg", "jpeg", "png", "gif", "pdf", "css", "js", "woff", "woff2",
+                        "ttf", "ico", "svg", "zip", "mp4", "mp3"],
+    "include": [],
+    "exclude": [],
+    # Query parameters are dropped unless listed in keep_query (see url_normalizer.UrlNormalizer)
+    "normalize": {"keep_query": [], "drop_query": list(TRACKING_PARAMS), "unify_scheme": True},
+    "root": {"priority": "1.0", "changefreq": "daily"},
+    "rules": [
+        {"prefix": "https://elghazawy.com/ar/", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/mobile-tablet", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/computing", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/home-appliances", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/health-beauty", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/electronics", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/televisions", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/kitchen-home", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/stationery", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/toys-baby", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/fitness-supplies", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/maintenance-tools", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/electricity-connectors", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/bags", "priority": "1.0", "changefreq": "daily"},
+        {"prefix": "https://elghazawy.com/ar/sub-category/Fashion-", "priority": "1.0", "changefreq": "daily"},
+        {"pattern": "/sub-category/|/category/", "priority": "0.9", "changefreq": "weekly"},
+        {"pattern": "/product/|/item/", "priority": "0.8", "changefreq": "monthly"},
+    ],
+    "default": {"priority": "0.6", "changefreq": "monthly"},
+}
+
+
+class _TrieNode:
+    __slots__ = ('edges', 'value')
+
+    def __init__(self):
+        # first character -> (edge label, child node)
+        self.edges: Dict[str, Tuple[str, "_TrieNode"]] = {}
+        self.value: Optional[int] = None
+
+
+class PrefixTrie:
+    """
+    Compressed (radix) trie mapping literal prefixes to the lowest rule
+    index that owns them. Lookups step over whole edge labels, so the cost
+    grows with the number of branching points rather than URL length.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self.size = 0
+
+    def add(self, prefix: str, value: int) -> None:
+        node = self._root
+        pos = 0
+        while pos < len(prefix):
+            edge = node.edges.get(prefix[pos])
+            if edge is None:
+                child = _TrieNode()
+                node.edges[prefix[pos]] = (prefix[pos:], child)
+                node = child
+                pos = len(prefix)
+                break
+            label, child = edge
+            # Length of the common part of the label and the remaining prefix
+            common = 0
+            limit = min(len(label), len(prefix) - pos)
+            while common < limit and label[common] == prefix[pos + common]:
+                common += 1
+            if common < len(label):
+                # Split the edge at the point where they diverge
+                middle = _TrieNode()
+                middle.edges[label[common]] = (label[common:], child)
+                node.edges[prefix[pos]] = (label[:common], middle)
+                child = middle
+            node = child
+            pos += common
+
+        if node.value is None or value < node.value:
+            node.value = value
+        self.size += 1
+
+    def best_match(self, text: str) -> Optional[int]:
+        """Return the lowest value among all prefixes of ``text`` in the trie."""
+        node = self._root
+        best = node.value
+        pos = 0
+        length = len(text)
+        while pos < length:
+            edge = node.edges.get(text[pos])
+            if edge is None:
+                break
+            label, node = edge
+            if not text.startswith(label, pos):
+                break
+            pos += len(label)
+            value = node.value
+            if value is not None and (best is None or value < best):
+                best = value
+        return best
+
+
+def _compile_ordered(patterns: List[Tuple[int, str]]) -> Optional[re.Pattern]:
+    """
+    Compile (index, pattern) pairs into one regex that reports the first
+    pattern, in rule order, that ``re.search`` would find in the URL.
+
+    Each alternative is a lookahead anchored at the start of the string, so
+    alternatives are tried in order and ``lastgroup`` names the winner.
+    """
+    if not patterns:
+        return None
+    alternatives = [f"(?=.*?(?:{pattern}))(?P<r{index}>)" for index, pattern in patterns]
+    return re.compile('^(?:' + '|'.join(alternatives) + ')', re.IGNORECASE | re.DOTALL)
+
+
+def _compile_any(patterns: List[str]) -> Optional[re.Pattern]:
+    if not patterns:
+        return None
+    return re.compile('|'.join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+class UrlRules:
+    def __init__(self, config: Dict[str, Any], root_url: str):
+        """
+        Compiled URL filters and priority/changefreq rules.
+
+        Literal ``prefix`` rules go into prefix tries (full URLs if they
+        contain ``://``, otherwise paths), ``pattern`` rules into a single
+        ordered alternation regex. Rules are evaluated in config order and
+        the first match wins; matching is case-insensitive. The ``normalize``
+        section configures how URLs are normalized before they are filtered.
+
+        Args:
+            config: Rules in the format of DEFAULT_RULES
+            root_url: Root URL of the crawl
+        """
+        # Kept so the same rules can be rebuilt elsewhere, e.g. by distributed workers
+        self.config = config
+        self.normalizer = UrlNormalizer.from_config(config.get("normalize", {}), root_url)
+        self.root_url = self.normalizer.normalize(root_url)
+        parsed_root = urlsplit(self.root_url)
+        self.root_netloc = parsed_root.netloc
+
+        extensions = config.get("skip_extensions", [])
+        self._skip_re = (
+            re.compile(r'\.(?:' + '|'.join(re.escape(e) for e in extensions) + r')$', re.IGNORECASE)
+            if extensions else None
+        )
+        self._include_re = _compile_any(config.get("include", []))
+        self._exclude_re = _compile_any(config.get("exclude", []))
+
+        default = config.get("default", {})
+        self.default = (default.get("priority"), default.get("changefreq"))
+        root = config.get("root")
+        self.root = (root.get("priority"), root.get("changefreq")) if root else None
+
+        self._results: List[Tuple[Optional[str], Optional[str]]] = []
+        self._url_trie = PrefixTrie()
+        self._path_trie = PrefixTrie()
+        patterns = []
+        for index, rule in enumerate(config.get("rules", [])):
+            self._results.append((rule.get("priority"), rule.get("changefreq")))
+            if "prefix" in rule:
+                prefix = rule["prefix"].lower()
+                trie = self._url_trie if "://" in prefix else self._path_trie
+                trie.add(prefix, index)
+            elif "pattern" in rule:
+                patterns.append((index, rule["pattern"]))
+            else:
+                raise ValueError(f"Rule {index} needs a 'prefix' or 'pattern': {rule}")
+        self._pattern_re = _compile_ordered(patterns)
+
+    @classmethod
+    def load(cls, rules: Union["UrlRules", str, Dict[str, Any], None], root_url: str) -> "UrlRules":
+        """Build rules from a JSON file path, a config dict, or DEFAULT_RULES when None."""
+        if isinstance(rules, UrlRules):
+            return rules
+        if rules is None:
+            return cls(DEFAULT_RULES, root_url)
+        if isinstance(rules, str):
+            with open(rules, 'r', encoding='utf-8') as f:
+                rules = json.load(f)
+        return cls(rules, root_url)
+
+    def normalize(self, url: str) -> str:
+        """Return the normalized form of an absolute URL (see url_normalizer.UrlNormalizer)."""
+        return self.normalizer.normalize(url)
+
+    def is_allowed(self, url: str, parsed=None) -> bool:
+        """Check domain, scheme, extension and include/exclude filters for a URL."""
+        if parsed is None:
+            parsed = urlsplit(url)
+
+        if parsed.netloc != self.root_netloc:
+            return False
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        if self._skip_re is not None and self._skip_re.search(parsed.path):
+            return False
+        if self._exclude_re is not None and self._exclude_re.search(url):
+            return False
+        if self._include_re is not None and url != self.root_url and not self._include_re.search(url):
+            return False
+        return True
+
+    def match(self, url: str) -> Optional[int]:
+        """Return the index of the first rule matching ``url``, or None."""
+        lowered = url.lower()
+        best = self._url_trie.best_match(lowered) if self._url_trie.size else None
+        if self._path_trie.size:
+            path_best = self._path_trie.best_match(urlsplit(lowered).path)
+            if path_best is not None and (best is None or path_best < best):
+                best = path_best
+        if self._pattern_re is not None:
+            m = self._pattern_re.match(url)
+            if m is not None:
+                index = int(m.lastgroup[1:])
+                if best is None or index < best:
+                    best = index
+        return best
+
+    def classify(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (priority, changefreq) for ``url``."""
+        if self.root is not None and url == self.root_url:
+            return self.root
+        index = self.match(url)
+        if index is None:
+            return self.default
+        return self._results[index]
@@ -0,0 +1,416 @@
+import array
+import hashlib
+import math
+import tempfile
+import logging
+from urllib.parse import urlsplit
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from crawl_journal import CrawlJournal
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+def url_digest(url: str) -> bytes:
+    """Stable 128-bit fingerprint of a URL, shared by the seen filters."""
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+
+class HashSet:
+    _MAX_LOAD = 0.7
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Exact set of 64-bit URL fingerprints in an open-addressing table.
+
+        Each entry costs 8 bytes of array storage (12-16 bytes with the load
+        factor) instead of a URL string in a Python set. Two URLs share a
+        fingerprint with probability of about n²/2^65, roughly one in 10^7
+        at a million URLs.
+
+        Args:
+            capacity: Entries to size the table for before the first resize (default: 1024)
+        """
+        size = 1 << max(10, int(capacity / self._MAX_LOAD).bit_length())
+        self._table = array.array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _slot(self, fingerprint: int) -> int:
+        table = self._table
+        mask = self._mask
+        i = fingerprint & mask
+        while True:
+            value = table[i]
+            if value == 0 or value == fingerprint:
+                return i
+            i = (i + 1) & mask
+
+    @staticmethod
+    def _fingerprint(digest: bytes) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(digest[:8], 'little') or 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        fingerprint = self._fingerprint(digest)
+        return self._table[self._slot(fingerprint)] == fingerprint
+
+    def add(self, digest: bytes) -> bool:
+        """Add a URL digest; return False if it was already present."""
+        fingerprint = int.from_bytes(digest[:8], 'little') or 1
+        # Probe inline rather than through _slot: this runs for every discovered link
+        table = self._table
+        mask = self._mask
+        i = fingerprint & mask
+        value = table[i]
+        while value:
+            if value == fingerprint:
+                return False
+            i = (i + 1) & mask
+            value = table[i]
+        table[i] = fingerprint
+        self._count += 1
+        if self._count > self._MAX_LOAD * len(table):
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old = self._table
+        self._table = array.array('Q', bytes(16 * len(old)))
+        self._mask = len(self._table) - 1
+        for fingerprint in old:
+            if fingerprint:
+                self._table[self._slot(fingerprint)] = fingerprint
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._table) * self._table.itemsize
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Fixed-size Bloom filter over URL digests.
+
+        Args:
+            capacity: Number of entries the false-positive rate is sized for
+            error_rate: Target false-positive rate at capacity
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, digest: bytes) -> List[int]:
+        # Double hashing: k positions from two 64-bit halves of the digest
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, digest: bytes) -> bool:
+        bits = self._bits
+        for p in self._positions(digest):
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def add(self, digest: bytes) -> bool:
+        """Add a URL digest; return False if it was (probably) already present."""
+        bits = self._bits
+        added = False
+        for p in self._positions(digest):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class ScalableBloomFilter:
+    def __init__(self, error_rate: float = 1e-4, initial_capacity: int = 100000,
+                 growth: int = 2, tightening: float = 0.5):
+        """
+        Bloom filter that grows by chaining filters of increasing capacity.
+
+        Each new filter gets a tighter error rate so the combined
+        false-positive rate stays below ``error_rate`` however many URLs
+        are added. A false positive means a new URL is treated as already
+        seen and is not crawled.
+
+        Args:
+            error_rate: Upper bound on the overall false-positive rate (default: 1e-4)
+            initial_capacity: Capacity of the first filter (default: 100,000)
+            growth: Capacity multiplier for each new filter (default: 2)
+            tightening: Error rate multiplier for each new filter (default: 0.5)
+        """
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self._filters = [BloomFilter(initial_capacity, error_rate * (1 - tightening))]
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self._filters)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return any(digest in f for f in reversed(self._filters))
+
+    def add(self, digest: bytes) -> bool:
+        """Add a URL digest; return False if it was (probably) already present."""
+        for bloom in self._filters[:-1]:
+            if digest in bloom:
+                return False
+        current = self._filters[-1]
+        if current.count >= current.capacity:
+            if digest in current:
+                return False
+            current = BloomFilter(current.capacity * self.growth, current.error_rate * self.tightening)
+            self._filters.append(current)
+        # Setting the bits also tells whether they were all set already
+        return current.add(digest)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(f.nbytes for f in self._filters)
+
+
+def _pack(url: str, prefix: str) -> bytes:
+    """Encode a URL, dropping ``prefix`` (the crawl origin) when it has it."""
+    if prefix and url.startswith(prefix) and url[len(prefix):len(prefix) + 1] in ('', '/'):
+        url = url[len(prefix):]
+    return url.encode('utf-8')
+
+
+def _unpack(data: bytes, prefix: str) -> str:
+    url = data.decode('utf-8')
+    # Packed entries are either an origin-relative path ("" or "/...") or a full URL
+    if not url or url[0] == '/':
+        return prefix + url
+    return url
+
+
+class UrlList:
+    def __init__(self, prefix: str = ''):
+        """
+        Append-only list of URLs stored as newline-separated UTF-8 bytes.
+
+        Args:
+            prefix: Origin shared by most URLs, stored only once (default: '')
+        """
+        self.prefix = prefix
+        self._buffer = bytearray()
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        buffer = self._buffer
+        start = 0
+        for _ in range(self._count):
+            end = buffer.index(b'\n', start)
+            yield _unpack(bytes(buffer[start:end]), self.prefix)
+            start = end + 1
+
+    def append(self, url: str) -> None:
+        self._buffer += _pack(url, self.prefix)
+        self._buffer += b'\n'
+        self._count += 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+
+class UrlFrontier:
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, spill_dir: Optional[str] = None,
+                 prefix: str = ''):
+        """
+        FIFO queue of URLs kept as newline-separated UTF-8 in a bytearray.
+
+        Once more than ``memory_budget`` bytes are queued, new entries are
+        appended to a temporary file instead and read back in order when the
+        in-memory part drains.
+
+        Args:
+            memory_budget: Queued bytes kept in memory before spilling to disk (default: 64 MB)
+            spill_dir: Directory for the spill file (default: None, the system temp dir)
+            prefix: Origin shared by most URLs, stored only once (default: '')
+        """
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.prefix = prefix
+        self.spilled = 0
+        self._buffer = bytearray()
+        self._offset = 0
+        self._count = 0
+        self._spill = None
+        self._spill_read = 0
+        self._spill_write = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def _spilling(self) -> bool:
+        return self._spill_write > self._spill_read
+
+    def append(self, url: str) -> None:
+        data = _pack(url, self.prefix) + b'\n'
+        if self._spilling() or len(self._buffer) - self._offset + len(data) > self.memory_budget:
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(prefix='frontier-', dir=self.spill_dir)
+                logger.info(f"Frontier exceeded {self.memory_budget} bytes; spilling to disk")
+            self._spill.seek(self._spill_write)
+            self._spill.write(data)
+            self._spill_write += len(data)
+            self.spilled += 1
+        else:
+            self._buffer += data
+        self._count += 1
+
+    def popleft(self) -> str:
+        if not self._count:
+            raise IndexError("pop from an empty UrlFrontier")
+        if self._offset >= len(self._buffer):
+            self._refill()
+
+        end = self._buffer.index(b'\n', self._offset)
+        data = bytes(self._buffer[self._offset:end])
+        self._offset = end + 1
+        self._count -= 1
+        # Drop consumed bytes once they make up most of the buffer
+        if self._offset > 64 * 1024 and self._offset * 2 > len(self._buffer):
+            del self._buffer[:self._offset]
+            self._offset = 0
+        return _unpack(data, self.prefix)
+
+    def _refill(self) -> None:
+        self._spill.seek(self._spill_read)
+        size = min(self._spill_write - self._spill_read, max(self.memory_budget // 4, 64 * 1024))
+        chunk = self._spill.read(size)
+        # Finish the last, partially read entry
+        if not chunk.endswith(b'\n'):
+            chunk += self._spill.readline()
+        self._spill_read += len(chunk)
+        self._buffer = bytearray(chunk)
+        self._offset = 0
+        if self._spill_read >= self._spill_write:
+            # Spill file drained: reuse it from the start
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spill_read = self._spill_write = 0
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+
+class UrlStore:
+    def __init__(self, root_url: str, seen_filter: str = "exact", error_rate: float = 1e-4,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, spill_dir: Optional[str] = None):
+        """
+        Compact crawl state: the seen filter, the FIFO frontier and the list of crawled URLs.
+
+        Replaces Python sets of full URL strings. URLs on the crawl's origin
+        are stored without it, the seen set keeps fixed-width fingerprints and
+        the frontier spills to disk past ``memory_budget``.
+
+        Args:
+            root_url: Root URL of the crawl; its origin is stored only once
+            seen_filter: "exact" for a 64-bit fingerprint set, "bloom" for a scalable
+                         Bloom filter (default: "exact")
+            error_rate: False-positive rate of the Bloom filter (default: 1e-4)
+            memory_budget: Frontier bytes kept in memory before spilling to disk (default: 64 MB)
+            spill_dir: Directory for the frontier spill file (default: None, the system temp dir)
+        """
+        if seen_filter not in ("exact", "bloom"):
+            raise ValueError(f"Unknown seen filter: {seen_filter}")
+        parsed = urlsplit(root_url)
+        prefix = f"{parsed.scheme}://{parsed.netloc}"
+        self.seen_filter = seen_filter
+        self.seen: Union[HashSet, ScalableBloomFilter] = (
+            HashSet() if seen_filter == "exact" else ScalableBloomFilter(error_rate)
+        )
+        self.frontier = UrlFrontier(memory_budget, spill_dir, prefix)
+        self.crawled = UrlList(prefix)
+        # Set once the store is restored; records every change from then on
+        self.journal: Optional["CrawlJournal"] = None
+
+    def mark_seen(self, url: str) -> bool:
+        """Record a URL as seen; return False if it was seen before."""
+        return self.seen.add(url_digest(url))
+
+    def add(self, url: str) -> bool:
+        """Queue a URL unless it was seen before; return True if it was queued."""
+        if not self.mark_seen(url):
+            return False
+        self.frontier.append(url)
+        if self.journal is not None:
+            self.journal.record_seen(url)
+        return True
+
+    def extend(self, urls: Iterable[str]) -> int:
+        """Queue every URL not seen before; return how many were queued."""
+        return sum(1 for url in urls if self.add(url))
+
+    def pop(self) -> str:
+        return self.frontier.popleft()
+
+    @property
+    def pending(self) -> int:
+        return len(self.frontier)
+
+    def add_crawled(self, url: str) -> None:
+        self.crawled.append(url)
+        if self.journal is not None:
+            self.journal.record_crawled(url)
+
+    def mark_done(self, url: str) -> None:
+        """Record that a popped URL was handled without being added to the sitemap."""
+        if self.journal is not None:
+            self.journal.record_done(url)
+
+    @property
+    def crawled_count(self) -> int:
+        return len(self.crawled)
+
+    def crawled_urls(self) -> List[str]:
+        return sorted(self.crawled)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'seen_filter': self.seen_filter,
+            'seen': len(self.seen),
+            'pending': self.pending,
+            'crawled': self.crawled_count,
+            'spilled': self.frontier.spilled,
+            'memory_bytes': self.seen.nbytes + self.frontier.nbytes + self.crawled.nbytes,
+        }
+
+    def close(self) -> None:
+        self.frontier.close()
+        if self.journal is not None:
+            self.journal.close()